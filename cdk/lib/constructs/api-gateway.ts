@@ -3,6 +3,7 @@ import * as apigateway from 'aws-cdk-lib/aws-apigateway';
 import * as lambda from 'aws-cdk-lib/aws-lambda';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as s3 from 'aws-cdk-lib/aws-s3';
+import * as s3n from 'aws-cdk-lib/aws-s3-notifications';
 import * as stepfunctions from 'aws-cdk-lib/aws-stepfunctions';
 import * as path from 'path';
 import { Construct } from 'constructs';
@@ -42,6 +43,19 @@ export class ApiGateway extends Construct {
       })
     );
 
+    // シナリオ一覧インデックスの書き込み権限
+    uiHandlerRole.addToPolicy(
+      new iam.PolicyStatement({
+        effect: iam.Effect.ALLOW,
+        actions: [
+          's3:PutObject',
+        ],
+        resources: [
+          `${props.templateBucket.bucketArn}/index/scenarios.json`,
+        ],
+      })
+    );
+
     // Step Functions 読み取り権限
     uiHandlerRole.addToPolicy(
       new iam.PolicyStatement({
@@ -76,6 +90,7 @@ export class ApiGateway extends Construct {
           'logs:DescribeLogGroups',
           'logs:DescribeLogStreams',
           'logs:GetLogEvents',
+          'logs:FilterLogEvents',
         ],
         resources: ['*'],
       })
@@ -95,10 +110,21 @@ export class ApiGateway extends Construct {
       },
     });
 
+    // シナリオの保存・削除時にレスポンスキャッシュを無効化し、シナリオインデックスを更新
+    for (const eventType of [s3.EventType.OBJECT_CREATED, s3.EventType.OBJECT_REMOVED]) {
+      props.templateBucket.addEventNotification(
+        eventType,
+        new s3n.LambdaDestination(this.uiHandlerLambda),
+        { prefix: 'scenarios/', suffix: '.json' }
+      );
+    }
+
     // API Gateway の作成
     this.api = new apigateway.RestApi(this, 'UiApi', {
       restApiName: 'Chaos Engineering UI API',
       description: 'API for Chaos Engineering UI',
+      // UI Handler が圧縮して Base64 で返すレスポンスをバイナリとして返す
+      binaryMediaTypes: ['*/*'],
       defaultCorsPreflightOptions: {
         allowOrigins: apigateway.Cors.ALL_ORIGINS,
         allowMethods: apigateway.Cors.ALL_METHODS,
@@ -123,6 +149,10 @@ export class ApiGateway extends Construct {
     const scenariosResource = this.api.root.addResource('scenarios');
     scenariosResource.addMethod('GET', lambdaIntegration);
 
+    // /scenarios/batch
+    const scenarioBatchResource = scenariosResource.addResource('batch');
+    scenarioBatchResource.addMethod('GET', lambdaIntegration);
+
     // /scenarios/{id}
     const scenarioDetailResource = scenariosResource.addResource('{id}');
     scenarioDetailResource.addMethod('GET', lambdaIntegration);
@@ -136,6 +166,10 @@ export class ApiGateway extends Construct {
     const experimentDetailResource = experimentsResource.addResource('{id}');
     experimentDetailResource.addMethod('GET', lambdaIntegration);
 
+    // /fis/experiments/{id}/logs/tail
+    const experimentLogsTailResource = experimentDetailResource.addResource('logs').addResource('tail');
+    experimentLogsTailResource.addMethod('GET', lambdaIntegration);
+
     // /executions
     const executionsResource = this.api.root.addResource('executions');
     executionsResource.addMethod('GET', lambdaIntegration);
@@ -144,6 +178,17 @@ export class ApiGateway extends Construct {
     const healthResource = this.api.root.addResource('health');
     healthResource.addMethod('GET', lambdaIntegration);
 
+    // binaryMediaTypes が */* のため、CORS プリフライト（MOCK 統合）の応答テンプレートが
+    // バイナリとして扱われて 500 になる。OPTIONS の統合はテキストに変換して返す
+    for (const method of this.api.methods) {
+      if (method.httpMethod === 'OPTIONS') {
+        (method.node.defaultChild as apigateway.CfnMethod).addPropertyOverride(
+          'Integration.ContentHandling',
+          apigateway.ContentHandling.CONVERT_TO_TEXT
+        );
+      }
+    }
+
     // 使用量プランの作成（レート制限）
     const plan = this.api.addUsagePlan('UiApiUsagePlan', {
       name: 'UI API Usage Plan',
@@ -5,6 +5,8 @@ import * as lambda from 'aws-cdk-lib/aws-lambda';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import * as s3 from 'aws-cdk-lib/aws-s3';
 import * as s3deploy from 'aws-cdk-lib/aws-s3-deployment';
+import * as events from 'aws-cdk-lib/aws-events';
+import * as eventsTargets from 'aws-cdk-lib/aws-events-targets';
 import * as path from 'path';
 import { Construct } from 'constructs';
 
@@ -15,8 +17,12 @@ export interface StepFunctionScenarioGenProps extends cdk.StackProps {
 export class StepFunctionScenarioGen extends Construct {
   public readonly stateMachine: stepfunctions.StateMachine;
   public readonly scenarioGeneratorLambda: lambda.Function;
+  public readonly batchScenarioGeneratorLambda: lambda.Function;
   public readonly scenarioAnalyzerLambda: lambda.Function;
   public readonly deployerLambda: lambda.Function;
+  public readonly deployStatusLambda: lambda.Function;
+  public readonly deployOrchestratorLambda: lambda.Function;
+  public readonly stackReaperLambda: lambda.Function;
   public readonly templateBucket: s3.Bucket;
 
   constructor(scope: Construct, id: string, props?: StepFunctionScenarioGenProps) {
@@ -52,6 +58,7 @@ export class StepFunctionScenarioGen extends Construct {
         effect: iam.Effect.ALLOW,
         actions: [
           'bedrock:InvokeModel',
+          'bedrock:InvokeModelWithResponseStream',
         ],
         resources: [
           `arn:aws:bedrock:*::foundation-model/anthropic.claude-3-haiku-20240307-v1:0`,
@@ -75,6 +82,20 @@ export class StepFunctionScenarioGen extends Construct {
       })
     );
 
+    // S3書き込み権限（生成キャッシュ・バッチ生成結果用）
+    lambdaExecutionRole.addToPolicy(
+      new iam.PolicyStatement({
+        effect: iam.Effect.ALLOW,
+        actions: [
+          's3:PutObject',
+        ],
+        resources: [
+          `${this.templateBucket.bucketArn}/generation-cache/*`,
+          `${this.templateBucket.bucketArn}/scenarios/*`,
+        ],
+      })
+    );
+
     // Lambda関数の作成
     this.scenarioGeneratorLambda = new lambda.Function(this, 'ScenarioGeneratorLambda', {
       runtime: lambda.Runtime.PYTHON_3_9,
@@ -89,6 +110,23 @@ export class StepFunctionScenarioGen extends Construct {
       },
     });
 
+    // バッチ生成用の Lambda 関数の作成
+    // 既定の 10 件・同時実行数 4 では Bedrock の応答待ち（最大 120 秒）が 3 巡するため、
+    // リトライを含めて収まるよう最大のタイムアウトを設定する（残り時間で開始できない分は呼び出し元に返す）
+    this.batchScenarioGeneratorLambda = new lambda.Function(this, 'BatchScenarioGeneratorLambda', {
+      runtime: lambda.Runtime.PYTHON_3_9,
+      handler: 'handler.batch_handler',
+      code: lambda.Code.fromAsset(path.join(__dirname, '../../../lambdas/scenario-generator')),
+      timeout: cdk.Duration.minutes(15),
+      memorySize: 512,
+      role: lambdaExecutionRole,
+      environment: {
+        BUCKET_NAME: this.templateBucket.bucketName,
+        TEMPLATE_KEY: 'templates/scenario-template.json',
+        BATCH_MAX_CONCURRENCY: '4',
+      },
+    });
+
     // Scenario Analyzer Lambda 関数の IAM ロール
     const scenarioAnalyzerRole = new iam.Role(this, 'ScenarioAnalyzerRole', {
       assumedBy: new iam.ServicePrincipal('lambda.amazonaws.com'),
@@ -161,6 +199,19 @@ export class StepFunctionScenarioGen extends Construct {
       })
     );
 
+    // デプロイのリソース別タイムラインをテンプレートと同じ場所に保存する権限
+    deployerRole.addToPolicy(
+      new iam.PolicyStatement({
+        effect: iam.Effect.ALLOW,
+        actions: [
+          's3:PutObject',
+        ],
+        resources: [
+          `${this.templateBucket.bucketArn}/*.timeline.json`,
+        ],
+      })
+    );
+
     // CloudFormation デプロイ権限
     deployerRole.addToPolicy(
       new iam.PolicyStatement({
@@ -174,13 +225,31 @@ export class StepFunctionScenarioGen extends Construct {
           'cloudformation:DescribeStackResources',
           'cloudformation:ValidateTemplate',
           'cloudformation:ListStacks',
+          'cloudformation:CreateChangeSet',
+          'cloudformation:DescribeChangeSet',
+          'cloudformation:ExecuteChangeSet',
+          'cloudformation:DeleteChangeSet',
         ],
         resources: [
           `arn:aws:cloudformation:*:${cdk.Aws.ACCOUNT_ID}:stack/chaos-engineering-*/*`,
+          `arn:aws:cloudformation:*:${cdk.Aws.ACCOUNT_ID}:changeSet/chaos-*/*`,
         ],
       })
     );
 
+    // TTL リーパー用の権限（タグ付きのスタック一覧、削除済みスタックの一覧と削除前のリソース一覧）
+    deployerRole.addToPolicy(
+      new iam.PolicyStatement({
+        effect: iam.Effect.ALLOW,
+        actions: [
+          'cloudformation:DescribeStacks',
+          'cloudformation:ListStacks',
+          'cloudformation:ListStackResources',
+        ],
+        resources: ['*'],
+      })
+    );
+
     // FIS 関連の権限
     deployerRole.addToPolicy(
       new iam.PolicyStatement({
@@ -223,7 +292,7 @@ export class StepFunctionScenarioGen extends Construct {
       runtime: lambda.Runtime.PYTHON_3_9,
       handler: 'handler.lambda_handler',
       code: lambda.Code.fromAsset(path.join(__dirname, '../../../lambdas/deployer')),
-      timeout: cdk.Duration.minutes(30), // CloudFormation デプロイは時間がかかる可能性があるため
+      timeout: cdk.Duration.minutes(30), // 同期モード（async_deploy: false）で直接呼び出す場合の待機時間を考慮
       memorySize: 512,
       role: deployerRole,
       environment: {
@@ -231,6 +300,52 @@ export class StepFunctionScenarioGen extends Construct {
       },
     });
 
+    // デプロイ状態確認 Lambda 関数の作成（Step Functions の待機ループから呼び出す）
+    this.deployStatusLambda = new lambda.Function(this, 'DeployStatusLambda', {
+      runtime: lambda.Runtime.PYTHON_3_9,
+      handler: 'handler.check_status',
+      code: lambda.Code.fromAsset(path.join(__dirname, '../../../lambdas/deployer')),
+      timeout: cdk.Duration.seconds(30),
+      memorySize: 256,
+      role: deployerRole,
+      environment: {
+        BUCKET_NAME: this.templateBucket.bucketName,
+      },
+    });
+
+    // 複数スタック並列デプロイ Lambda 関数の作成
+    this.deployOrchestratorLambda = new lambda.Function(this, 'DeployOrchestratorLambda', {
+      runtime: lambda.Runtime.PYTHON_3_9,
+      handler: 'handler.orchestrate',
+      code: lambda.Code.fromAsset(path.join(__dirname, '../../../lambdas/deployer')),
+      timeout: cdk.Duration.minutes(15),
+      memorySize: 512,
+      role: deployerRole,
+      environment: {
+        BUCKET_NAME: this.templateBucket.bucketName,
+      },
+    });
+
+    // TTL を過ぎたカオス環境のスタックを削除する Lambda 関数の作成
+    this.stackReaperLambda = new lambda.Function(this, 'StackReaperLambda', {
+      runtime: lambda.Runtime.PYTHON_3_9,
+      handler: 'handler.reap',
+      code: lambda.Code.fromAsset(path.join(__dirname, '../../../lambdas/deployer')),
+      // 削除の完了は待たない（次回の実行で確認する）ため短いタイムアウトで十分
+      timeout: cdk.Duration.minutes(5),
+      memorySize: 256,
+      role: deployerRole,
+      environment: {
+        REAPER_TTL_HOURS: '24',
+      },
+    });
+
+    // 1 時間ごとに TTL リーパーを実行
+    new events.Rule(this, 'StackReaperSchedule', {
+      schedule: events.Schedule.rate(cdk.Duration.hours(1)),
+      targets: [new eventsTargets.LambdaFunction(this.stackReaperLambda)],
+    });
+
     // Step Functions State Machineの定義
     const scenarioGeneratorTask = new stepfunctionsTasks.LambdaInvoke(this, 'InvokeScenarioGenerator', {
       lambdaFunction: this.scenarioGeneratorLambda,
@@ -262,15 +377,40 @@ export class StepFunctionScenarioGen extends Construct {
         'codegen_key': 'codegen-output/cloudformation-template.json',
         'stack_name.$': '$.stack_name',
         'parameters.$': '$.parameters',
+        'async_deploy': true,
+        'use_change_set': true,
+        'stream_events': true,
+        'fail_fast': true,
+        'cleanup_failed_stack': true,
       }),
       retryOnServiceExceptions: true,
     });
 
+    // デプロイ状態確認タスクの定義
+    const deployStatusTask = new stepfunctionsTasks.LambdaInvoke(this, 'CheckDeployStatus', {
+      lambdaFunction: this.deployStatusLambda,
+      outputPath: '$.Payload',
+      payload: stepfunctions.TaskInput.fromObject({
+        'body.$': '$.body',
+      }),
+      retryOnServiceExceptions: true,
+    });
+
+    // 次回の状態確認まで待機（待機秒数は check_status が返す）
+    const waitForDeployment = new stepfunctions.Wait(this, 'WaitForDeployment', {
+      time: stepfunctions.WaitTime.secondsPath('$.body.waitSeconds'),
+    });
+
     // 成功処理
     const successState = new stepfunctions.Succeed(this, 'ScenarioAnalysisSuccess', {
       comment: 'シナリオ生成と分析が成功しました',
     });
 
+    // 変更セットのプレビューのみ（デプロイは行っていない）
+    const previewState = new stepfunctions.Succeed(this, 'ChangeSetPreviewReady', {
+      comment: '変更セットのプレビューを作成しました（デプロイは行っていません）',
+    });
+
     // 失敗処理
     const failState = new stepfunctions.Fail(this, 'ScenarioProcessingFailed', {
       comment: 'シナリオ生成または分析が失敗しました',
@@ -315,11 +455,32 @@ export class StepFunctionScenarioGen extends Construct {
       resultPath: '$.errorInfo',
     });
 
-    // State Machineの定義（シナリオ生成 → 分析 → デプロイ → 成功）
+    deployStatusTask.addRetry({
+      errors: ['Lambda.ServiceException', 'Lambda.AWSLambdaException', 'Lambda.SdkClientException'],
+      interval: cdk.Duration.seconds(5),
+      maxAttempts: 3,
+      backoffRate: 2.0,
+    });
+
+    deployStatusTask.addCatch(failState, {
+      errors: ['States.TaskFailed'],
+      resultPath: '$.errorInfo',
+    });
+
+    // デプロイ状態による分岐（進行中の場合は待機して再確認）
+    const deploymentStatusChoice = new stepfunctions.Choice(this, 'IsDeploymentComplete')
+      .when(stepfunctions.Condition.stringEquals('$.body.status', 'SUCCEEDED'), successState)
+      .when(stepfunctions.Condition.stringEquals('$.body.status', 'PREVIEW'), previewState)
+      .when(stepfunctions.Condition.stringEquals('$.body.status', 'IN_PROGRESS'),
+        waitForDeployment.next(deployStatusTask))
+      .otherwise(failState);
+    deployStatusTask.next(deploymentStatusChoice);
+
+    // State Machineの定義（シナリオ生成 → 分析 → デプロイ開始 → 完了まで状態確認 → 成功）
     const definition = scenarioGeneratorTask
       .next(scenarioAnalyzerTask)
       .next(deployerTask)
-      .next(successState);
+      .next(deploymentStatusChoice);
 
     // State Machineの作成
     this.stateMachine = new stepfunctions.StateMachine(this, 'ScenarioGeneratorStateMachine', {
@@ -339,6 +500,11 @@ export class StepFunctionScenarioGen extends Construct {
       description: 'Scenario Generator Lambda Function ARN',
     });
 
+    new cdk.CfnOutput(this, 'BatchScenarioGeneratorLambdaArn', {
+      value: this.batchScenarioGeneratorLambda.functionArn,
+      description: 'Batch Scenario Generator Lambda Function ARN',
+    });
+
     new cdk.CfnOutput(this, 'ScenarioAnalyzerLambdaArn', {
       value: this.scenarioAnalyzerLambda.functionArn,
       description: 'Scenario Analyzer Lambda Function ARN',
@@ -349,6 +515,21 @@ export class StepFunctionScenarioGen extends Construct {
       description: 'Deployer Lambda Function ARN',
     });
 
+    new cdk.CfnOutput(this, 'DeployStatusLambdaArn', {
+      value: this.deployStatusLambda.functionArn,
+      description: 'Deploy Status Lambda Function ARN',
+    });
+
+    new cdk.CfnOutput(this, 'DeployOrchestratorLambdaArn', {
+      value: this.deployOrchestratorLambda.functionArn,
+      description: 'Deploy Orchestrator Lambda Function ARN',
+    });
+
+    new cdk.CfnOutput(this, 'StackReaperLambdaArn', {
+      value: this.stackReaperLambda.functionArn,
+      description: 'Stack Reaper Lambda Function ARN',
+    });
+
     new cdk.CfnOutput(this, 'TemplateBucketName', {
       value: this.templateBucket.bucketName,
       description: 'Template S3 Bucket Name',
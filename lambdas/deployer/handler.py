@@ -1,18 +1,131 @@
 import json
+import hashlib
 import boto3
 import os
 import logging
 import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import quote
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from orchestrator import ThrottleRetryingClient, is_throttling_error, run_stack_deployments
+from stack_events import StackEventTracker, ResourceTimeline, timeline_key
+from template_validator import (
+    validate_template_text,
+    parse_resource_types,
+    DEFAULT_ALLOWED_RESOURCE_TYPES,
+    MAX_REPORTED_ERRORS
+)
+from reaper import (
+    REAPER_TAGS,
+    MAX_DELETE_ATTEMPTS,
+    select_expired_stacks,
+    select_deleting_stacks,
+    select_recently_deleted,
+    summarize_reclaimed
+)
 
 # ロギングの設定
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# デプロイ済みテンプレートの内容ハッシュを記録するスタックタグ
+CONTENT_HASH_TAG = 'ChaosContentHash'
+
+# 更新不要と判断できるスタックの状態
+STABLE_STACK_STATUSES = {'CREATE_COMPLETE', 'UPDATE_COMPLETE'}
+
+# デプロイ成功とみなすスタックの状態
+SUCCEEDED_STACK_STATUSES = {'CREATE_COMPLETE', 'UPDATE_COMPLETE'}
+
+# デプロイ失敗とみなすスタックの状態（これ以上変化しない）
+FAILED_STACK_STATUSES = {
+    'CREATE_FAILED',
+    'ROLLBACK_COMPLETE',
+    'ROLLBACK_FAILED',
+    'UPDATE_ROLLBACK_COMPLETE',
+    'UPDATE_ROLLBACK_FAILED',
+    'UPDATE_FAILED',
+    'DELETE_COMPLETE',
+    'DELETE_FAILED',
+}
+
+# 非同期デプロイの状態確認の間隔（秒）と既定のタイムアウト
+POLL_BASE_DELAY = 5
+POLL_MAX_DELAY = 60
+DEFAULT_DEPLOY_TIMEOUT = 1800
+
+# TemplateBody で渡せるテンプレートの最大サイズ（バイト）。超える場合は TemplateURL を使う
+INLINE_TEMPLATE_MAX_BYTES = 51200
+
+# テンプレートを S3 から読み込む際のチャンクサイズ（バイト）
+TEMPLATE_CHUNK_BYTES = 64 * 1024
+
+# 複数スタックの並列デプロイの同時実行数（既定値と上限）
+DEFAULT_ORCHESTRATOR_CONCURRENCY = 3
+MAX_ORCHESTRATOR_CONCURRENCY = 10
+
+# 並列デプロイで結果を返すために残しておく Lambda の実行時間（秒）
+ORCHESTRATOR_RESERVED_SECONDS = 60
+
+# スタックイベントの初回読み込みで遡る範囲（デプロイ開始時刻からの許容誤差、秒）
+EVENT_CLOCK_SKEW_SECONDS = 300
+
+# TTL リーパーの既定値（経過時間、同時に削除を開始するスタック数、削除完了を報告する期間）
+DEFAULT_REAPER_TTL_HOURS = 24
+DEFAULT_REAPER_CONCURRENCY = 5
+REAPER_CONFIRM_WINDOW_HOURS = 2
+
+# 変更セットの作成完了を待つ最大秒数
+CHANGE_SET_TIMEOUT = 300
+
+# 変更がないために変更セットの作成が失敗した場合の StatusReason
+EMPTY_CHANGE_SET_REASONS = (
+    "didn't contain changes",
+    'No updates are to be performed',
+)
+
+# テンプレート検証結果のキャッシュの最大件数
+TEMPLATE_VALIDATION_CACHE_MAX_ENTRIES = 128
+
+# (テンプレートのハッシュ, 許可するリソースタイプ) ごとの検証結果（ウォームなコンテナ内で再利用する LRU）
+# errors: ローカル検証のエラー、remote_validated: CloudFormation での検証が成功済みか
+_template_validation_cache: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+
+class StackWaitTimeout(ValueError):
+    """
+    スタックが終了状態になる前に待機時間を過ぎた
+    """
+
+    def __init__(self, stack_status: str):
+        super().__init__(f"Stack operation timed out: {stack_status}")
+        self.stack_status = stack_status
+
 # AWS クライアントの初期化
 s3_client = boto3.client('s3')
-cloudformation_client = boto3.client('cloudformation')
+# 複数スタックの並列デプロイ時はスレッド間で共有する。スロットリング時は adaptive モードで
+# クライアント側の流量を抑えて再試行し（最大 3 回）、それでも失敗した呼び出しだけを
+# ジッター付きで 1 回だけ再試行する（1 回の呼び出しで最大 6 回、追加の待機は最大 2 秒）
+cloudformation_client = ThrottleRetryingClient(
+    boto3.client('cloudformation', config=Config(
+        max_pool_connections=MAX_ORCHESTRATOR_CONCURRENCY * 2,
+        retries={'total_max_attempts': 3, 'mode': 'adaptive'}
+    )),
+    max_attempts=2,
+    base_delay=2.0,
+    max_delay=2.0
+)
+# check_status 用（Step Functions から繰り返し呼び出されるため、スロットリング時は
+# Lambda 内で待たずに次回の確認までの間隔を広げる。再試行は 1 回のみ）
+cloudformation_status_client = boto3.client('cloudformation', config=Config(
+    connect_timeout=5,
+    read_timeout=10,
+    retries={'total_max_attempts': 2, 'mode': 'standard'}
+))
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -25,6 +138,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Returns:
         デプロイ結果
     """
+    timeline = None
     try:
         logger.info(f"Received event: {json.dumps(event)}")
         
@@ -35,24 +149,108 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         if not bucket_name:
             raise ValueError("bucket_name is required")
+        # fail_fast はスタックイベントで失敗を検知するため、イベントの読み込みも有効にする
+        fail_fast = event.get('fail_fast', False)
+        stream_events = event.get('stream_events', False) or fail_fast
+        cleanup_failed_stack = event.get('cleanup_failed_stack', False)
         
-        # S3からCodeGen出力を取得
+        # S3からCodeGen出力を取得（サイズに応じて TemplateBody / TemplateURL を切り替え）
         logger.info(f"Getting CodeGen output from S3: {bucket_name}/{codegen_key}")
-        template_body = get_codegen_output_from_s3(bucket_name, codegen_key)
+        parameters = event.get('parameters', [])
+        template = load_template_source(
+            bucket_name, codegen_key, parameters, event.get('template_source', 'auto')
+        )
+        template_body, template_url = template['template_body'], template['template_url']
+        content_hash = template['content_hash']
+        started_at = time.time()
         
-        # CloudFormationテンプレートのバリデーション
-        validate_template(template_body)
+        # 前回デプロイ時と内容が同じ場合はバリデーションと更新を省略
+        up_to_date_stack = None if event.get('force_deploy', False) else get_up_to_date_stack(stack_name, content_hash)
+        if up_to_date_stack:
+            logger.info(f"Stack is up to date, skipping deployment: {stack_name}")
+            deployment_result = {
+                'stack_id': up_to_date_stack['StackId'],
+                'operation_type': 'NO_CHANGE',
+                'deployment_time': time.time(),
+                'wait_for_completion': False
+            }
+        else:
+            # CloudFormationテンプレートのバリデーション
+            validate_template(
+                template_body,
+                template_url,
+                template['template_text'],
+                template['template_hash'],
+                resolve_allowed_resource_types(event)
+            )
+            
+            # CloudFormationデプロイの実行
+            deployment_result = deploy_cloudformation_stack(
+                stack_name=stack_name,
+                template_body=template_body,
+                parameters=parameters,
+                content_hash=content_hash,
+                use_change_set=event.get('use_change_set', False),
+                preview=event.get('change_set_preview', False),
+                template_url=template_url,
+                cleanup_failed_stack=cleanup_failed_stack
+            )
         
-        # CloudFormationデプロイの実行
-        deployment_result = deploy_cloudformation_stack(
-            stack_name=stack_name,
-            template_body=template_body,
-            parameters=event.get('parameters', [])
-        )
+        # 非同期モードでは完了を待たずに返し、check_status で状態を確認する
+        if event.get('async_deploy', False):
+            started = deployment_result.get('wait_for_completion', True)
+            preview = deployment_result.get('operation_type') == 'PREVIEW'
+            logger.info(f"CloudFormation deployment started asynchronously: {stack_name}")
+            if started:
+                message, status = 'Deployment started', 'IN_PROGRESS'
+            elif preview:
+                # 変更セットを確認しただけでデプロイはしていないため、SUCCEEDED と区別する
+                message, status = 'Change set preview created', 'PREVIEW'
+            else:
+                message, status = 'Deployment completed successfully', 'SUCCEEDED'
+            body = {
+                'message': message,
+                'status': status,
+                'stackName': stack_name,
+                'stackId': deployment_result.get('stack_id'),
+                'operationType': deployment_result.get('operation_type'),
+                'deploymentTime': deployment_result.get('deployment_time'),
+                'contentHash': content_hash,
+                'changeSet': deployment_result.get('change_set'),
+                'attempt': 0,
+                'waitSeconds': next_poll_delay(0),
+                'timeoutSeconds': event.get('timeout_seconds', DEFAULT_DEPLOY_TIMEOUT)
+            }
+            if stream_events and started:
+                # check_status でイベントを差分読み込みし、終了時にタイムラインを保存する
+                body.update({
+                    'streamEvents': True,
+                    'failFast': fail_fast,
+                    'eventsSince': started_at - EVENT_CLOCK_SKEW_SECONDS,
+                    'eventCursor': None,
+                    'resourceTimeline': {},
+                    'bucketName': bucket_name,
+                    'codegenKey': codegen_key
+                })
+            return {'statusCode': 202 if started else 200, 'body': body}
         
         # デプロイ完了まで待機
         if deployment_result.get('wait_for_completion', True):
-            wait_for_deployment_completion(stack_name, deployment_result['operation_type'])
+            if stream_events:
+                tracker = StackEventTracker(
+                    cloudformation_client, deployment_result.get('stack_id') or stack_name, since=started_at - EVENT_CLOCK_SKEW_SECONDS
+                )
+                try:
+                    wait_for_stack(
+                        deployment_result.get('stack_id') or stack_name,
+                        event.get('timeout_seconds', DEFAULT_DEPLOY_TIMEOUT),
+                        tracker,
+                        fail_fast
+                    )
+                finally:
+                    timeline = save_timeline(bucket_name, codegen_key, stack_name, tracker.timeline)
+            else:
+                wait_for_deployment_completion(stack_name, deployment_result['operation_type'])
         
         logger.info("CloudFormation deployment completed successfully")
         
@@ -63,7 +261,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'stackName': stack_name,
                 'stackId': deployment_result.get('stack_id'),
                 'operationType': deployment_result.get('operation_type'),
-                'deploymentTime': deployment_result.get('deployment_time')
+                'deploymentTime': deployment_result.get('deployment_time'),
+                'contentHash': content_hash,
+                'changeSet': deployment_result.get('change_set'),
+                'timeline': timeline
             }
         }
         
@@ -73,48 +274,698 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'statusCode': 500,
             'body': {
                 'error': str(e),
-                'message': 'CloudFormation deployment failed'
+                'message': 'CloudFormation deployment failed',
+                'timeline': timeline
             }
         }
 
-def get_codegen_output_from_s3(bucket_name: str, key: str) -> str:
+def orchestrate(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    複数スタックの並列デプロイ用 Lambda ハンドラー
+    
+    Args:
+        event: bucket_name、stacks（stack_name, codegen_key, parameters, depends_on を含むリスト）、
+            max_concurrency、use_change_set、force_deploy、fail_fast、cleanup_failed_stack、
+            allowed_resource_types を含むイベント
+        context: Lambda コンテキスト
+        
+    Returns:
+        スタックごとのデプロイ結果と集計。Lambda の実行時間内に完了しなかったスタックは
+        IN_PROGRESS（stack_id を含む）、開始できなかったスタックは NOT_STARTED として返す
+    """
+    try:
+        bucket_name = event.get('bucket_name') or os.environ.get('BUCKET_NAME')
+        stacks = event.get('stacks') or []
+        if not bucket_name:
+            raise ValueError("bucket_name is required")
+        if not stacks:
+            raise ValueError("stacks is required")
+        
+        max_concurrency = min(
+            MAX_ORCHESTRATOR_CONCURRENCY,
+            max(1, int(event.get('max_concurrency', DEFAULT_ORCHESTRATOR_CONCURRENCY)))
+        )
+        defaults = {
+            'use_change_set': event.get('use_change_set', False),
+            'force_deploy': event.get('force_deploy', False),
+            'template_source': event.get('template_source', 'auto'),
+            'stream_events': event.get('stream_events', False),
+            'fail_fast': event.get('fail_fast', False),
+            'cleanup_failed_stack': event.get('cleanup_failed_stack', False),
+            'allowed_resource_types': event.get('allowed_resource_types'),
+            'timeout_seconds': event.get('timeout_seconds', DEFAULT_DEPLOY_TIMEOUT)
+        }
+        
+        # Lambda のタイムアウトで集計結果が失われないよう、待機は残りの実行時間内に収める
+        deadline = None
+        if context is not None:
+            deadline = time.time() + context.get_remaining_time_in_millis() / 1000 - ORCHESTRATOR_RESERVED_SECONDS
+        
+        logger.info(f"Deploying {len(stacks)} stacks with concurrency {max_concurrency}")
+        outcome = run_stack_deployments(
+            [{**defaults, **stack} for stack in stacks],
+            lambda spec: deploy_stack_and_wait(bucket_name, spec, deadline),
+            max_concurrency=max_concurrency,
+            deadline=deadline
+        )
+        
+        summary = outcome['summary']
+        if summary['succeeded'] == len(stacks):
+            status_code = 200
+        elif summary['failed'] == 0 and summary['skipped'] == 0:
+            # 未完了のスタックは check_status で確認を続けられる
+            status_code = 202
+        else:
+            status_code = 500
+        return {
+            'statusCode': status_code,
+            'body': outcome
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in CloudFormation orchestration: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': {
+                'error': str(e),
+                'message': 'CloudFormation orchestration failed'
+            }
+        }
+
+def deploy_stack_and_wait(
+    bucket_name: str,
+    spec: Dict[str, Any],
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    1 スタックをデプロイし、完了まで describe_stacks で状態を確認しながら待機
+    
+    Args:
+        bucket_name: S3バケット名
+        spec: stack_name、codegen_key、parameters などを含むスタック定義
+        deadline: 待機を打ち切る期限（エポック秒）。期限までに完了しない場合は status: IN_PROGRESS を返す
+        
+    Returns:
+        デプロイ結果（失敗時は ValueError）
+    """
+    stack_name = spec['stack_name']
+    codegen_key = spec.get('codegen_key', 'codegen-output/cloudformation-template.json')
+    parameters = spec.get('parameters', [])
+    template = load_template_source(
+        bucket_name,
+        codegen_key,
+        parameters,
+        spec.get('template_source', 'auto')
+    )
+    
+    up_to_date_stack = None if spec.get('force_deploy') else get_up_to_date_stack(stack_name, template['content_hash'])
+    if up_to_date_stack:
+        logger.info(f"Stack is up to date, skipping deployment: {stack_name}")
+        return {
+            'stack_id': up_to_date_stack['StackId'],
+            'operation_type': 'NO_CHANGE',
+            'content_hash': template['content_hash']
+        }
+    
+    validate_template(
+        template['template_body'],
+        template['template_url'],
+        template['template_text'],
+        template['template_hash'],
+        resolve_allowed_resource_types(spec)
+    )
+    started_at = time.time()
+    deployment_result = deploy_cloudformation_stack(
+        stack_name=stack_name,
+        template_body=template['template_body'],
+        parameters=parameters,
+        content_hash=template['content_hash'],
+        use_change_set=spec.get('use_change_set', False),
+        template_url=template['template_url'],
+        cleanup_failed_stack=spec.get('cleanup_failed_stack', False)
+    )
+    
+    stack_status = None
+    timeline = None
+    in_progress = False
+    if deployment_result.get('wait_for_completion', True):
+        stack_id = deployment_result.get('stack_id') or stack_name
+        tracker = None
+        if spec.get('stream_events') or spec.get('fail_fast'):
+            tracker = StackEventTracker(cloudformation_client, stack_id, since=started_at - EVENT_CLOCK_SKEW_SECONDS)
+        timeout_seconds = spec.get('timeout_seconds', DEFAULT_DEPLOY_TIMEOUT)
+        limited_by_deadline = deadline is not None and deadline - time.time() < timeout_seconds
+        if limited_by_deadline:
+            timeout_seconds = max(0, deadline - time.time())
+        try:
+            stack_status = wait_for_stack(stack_id, timeout_seconds, tracker, spec.get('fail_fast', False))
+        except StackWaitTimeout as e:
+            if not limited_by_deadline:
+                raise
+            # Lambda の実行時間が足りないだけのため失敗にはせず、未完了として返す
+            logger.warning(f"Stack still in progress at orchestrator deadline: {stack_name} {e.stack_status}")
+            stack_status = e.stack_status
+            in_progress = True
+        finally:
+            if tracker:
+                timeline = save_timeline(bucket_name, codegen_key, stack_name, tracker.timeline)
+    
+    result = {
+        'stack_id': deployment_result.get('stack_id'),
+        'operation_type': deployment_result.get('operation_type'),
+        'stack_status': stack_status,
+        'content_hash': template['content_hash'],
+        'change_set': deployment_result.get('change_set'),
+        'timeline': timeline
+    }
+    if in_progress:
+        result['status'] = 'IN_PROGRESS'
+    return result
+
+def reap(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    TTL を過ぎたカオス環境のスタックを削除する Lambda ハンドラー
+    
+    chaos-engineering-* で Project=ChaosEngineering タグの付いたスタックのうち、
+    最終更新から ttl_hours を過ぎたものの削除を並列度を制限して開始する。
+    RDS や NAT ゲートウェイの削除は長時間かかるため完了は待たず、次回の実行で
+    削除中（deleting）・削除完了（confirmed_deleted）として報告する。
+    削除に MAX_DELETE_ATTEMPTS 回失敗したスタックは再試行せず abandoned として報告する
+    
+    Args:
+        event: ttl_hours、max_concurrency、dry_run（削除せず対象のみ返す）を含むイベント
+        context: Lambda コンテキスト
+        
+    Returns:
+        スタックごとの削除開始結果と削除対象のリソースの集計
+    """
+    try:
+        ttl_hours = float(event.get('ttl_hours') or os.environ.get('REAPER_TTL_HOURS', DEFAULT_REAPER_TTL_HOURS))
+        if ttl_hours <= 0:
+            raise ValueError("ttl_hours must be positive")
+        max_concurrency = min(
+            MAX_ORCHESTRATOR_CONCURRENCY,
+            max(1, int(event.get('max_concurrency', DEFAULT_REAPER_CONCURRENCY)))
+        )
+        
+        now = datetime.now(timezone.utc)
+        stacks = list_all_stacks()
+        expired = []
+        abandoned = []
+        for stack in select_expired_stacks(stacks, now, ttl_hours * 3600):
+            if stack['stack_status'] == 'DELETE_FAILED':
+                stack['delete_attempts'] = count_delete_attempts(stack['stack_id'], stack['stack_name'])
+                if stack['delete_attempts'] >= MAX_DELETE_ATTEMPTS:
+                    abandoned.append(stack)
+                    continue
+            expired.append(stack)
+        logger.info(f"Found {len(expired)} stacks older than {ttl_hours} hours ({len(abandoned)} abandoned)")
+        
+        if event.get('dry_run', False):
+            return {
+                'statusCode': 200,
+                'body': {'dry_run': True, 'ttl_hours': ttl_hours, 'expired': expired, 'abandoned': abandoned}
+            }
+        
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            results = list(executor.map(start_stack_deletion, expired))
+        
+        body = {
+            'ttl_hours': ttl_hours,
+            'results': results,
+            'deleting': select_deleting_stacks(stacks),
+            'confirmed_deleted': select_recently_deleted(
+                list_deleted_stacks(), now, REAPER_CONFIRM_WINDOW_HOURS * 3600
+            ),
+            'abandoned': abandoned,
+            'reclaimed': summarize_reclaimed(results),
+            'summary': {
+                'expired': len(expired),
+                'deletion_started': sum(1 for result in results if result['status'] == 'DELETING'),
+                'failed': sum(1 for result in results if result['status'] == 'FAILED'),
+                'abandoned': len(abandoned)
+            }
+        }
+        logger.info(f"Reaper summary: {json.dumps(body['summary'])}, reclaimed: {json.dumps(body['reclaimed'])}")
+        if abandoned:
+            logger.warning(f"Stacks need manual cleanup: {[stack['stack_name'] for stack in abandoned]}")
+        
+        return {
+            'statusCode': 200 if body['summary']['failed'] == 0 else 500,
+            'body': body
+        }
+        
+    except Exception as e:
+        logger.error(f"Error in stack reaper: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': {
+                'error': str(e),
+                'message': 'Stack reaper failed'
+            }
+        }
+
+def list_all_stacks() -> list:
+    """
+    削除済みを除く全スタックを取得（タグを含むため list_stacks ではなく describe_stacks を使う）
+    """
+    stacks = []
+    next_token = None
+    while True:
+        params = {'NextToken': next_token} if next_token else {}
+        response = cloudformation_client.describe_stacks(**params)
+        stacks.extend(response.get('Stacks', []))
+        next_token = response.get('NextToken')
+        if not next_token:
+            return stacks
+
+def list_deleted_stacks() -> list:
+    """
+    削除済み（DELETE_COMPLETE）のスタックの概要を取得
+    """
+    summaries = []
+    next_token = None
+    while True:
+        params = {'StackStatusFilter': ['DELETE_COMPLETE']}
+        if next_token:
+            params['NextToken'] = next_token
+        response = cloudformation_client.list_stacks(**params)
+        summaries.extend(response.get('StackSummaries', []))
+        next_token = response.get('NextToken')
+        if not next_token:
+            return summaries
+
+def count_delete_attempts(stack_id: str, stack_name: str) -> int:
+    """
+    スタックイベントから削除に失敗した回数（スタック自体の DELETE_FAILED）を数える
+    """
+    attempts = 0
+    next_token = None
+    while True:
+        params = {'StackName': stack_id}
+        if next_token:
+            params['NextToken'] = next_token
+        response = cloudformation_client.describe_stack_events(**params)
+        attempts += sum(
+            1 for event in response.get('StackEvents', [])
+            if event['LogicalResourceId'] == stack_name and event['ResourceStatus'] == 'DELETE_FAILED'
+        )
+        next_token = response.get('NextToken')
+        if not next_token:
+            return attempts
+
+def list_stack_resources(stack_id: str) -> list:
+    """
+    スタックに残っているリソースの一覧を取得
+    """
+    resources = []
+    next_token = None
+    while True:
+        params = {'StackName': stack_id}
+        if next_token:
+            params['NextToken'] = next_token
+        response = cloudformation_client.list_stack_resources(**params)
+        resources.extend(
+            {
+                'logical_id': summary['LogicalResourceId'],
+                'physical_id': summary.get('PhysicalResourceId'),
+                'resource_type': summary['ResourceType']
+            }
+            for summary in response.get('StackResourceSummaries', [])
+            if summary.get('ResourceStatus') != 'DELETE_COMPLETE'
+        )
+        next_token = response.get('NextToken')
+        if not next_token:
+            return resources
+
+def start_stack_deletion(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    1 スタックの削除を開始（完了は待たない）
+    
+    Args:
+        spec: stack_name、stack_id を含む削除対象
+        
+    Returns:
+        status（DELETING / FAILED）と削除対象のリソースの一覧
+    """
+    try:
+        resources = list_stack_resources(spec['stack_id'])
+        logger.info(
+            f"Deleting expired stack: {spec['stack_name']} ({len(resources)} resources, {spec['age_hours']} hours old)"
+        )
+        cloudformation_client.delete_stack(StackName=spec['stack_id'])
+        return {
+            **spec,
+            'status': 'DELETING',
+            'resource_count': len(resources),
+            'resources': resources
+        }
+    except ClientError as e:
+        logger.error(f"Error deleting stack {spec['stack_name']}: {str(e)}")
+        return {**spec, 'status': 'FAILED', 'error': str(e)}
+
+def wait_for_stack(
+    stack_name: str,
+    timeout_seconds: int = DEFAULT_DEPLOY_TIMEOUT,
+    tracker: Optional[StackEventTracker] = None,
+    fail_fast: bool = False
+) -> str:
+    """
+    スタックが終了状態になるまで待機
+    
+    Args:
+        stack_name: スタック名またはスタック ID
+        timeout_seconds: 最大待機秒数
+        tracker: 指定した場合は確認のたびにスタックイベントを差分読み込みする
+        fail_fast: リソースの作成・更新の失敗イベントを検知した時点で、ロールバックの完了を待たずに失敗とする
+        
+    Returns:
+        成功時のスタックの状態（失敗時は ValueError、タイムアウト時は StackWaitTimeout）
+    """
+    deadline = time.time() + timeout_seconds
+    attempt = 0
+    while True:
+        stack = get_stack(stack_name)
+        if tracker:
+            poll_stack_events(tracker)
+        stack_status = stack['StackStatus'] if stack else 'DELETE_COMPLETE'
+        status = classify_stack_status(stack_status)
+        if status == 'SUCCEEDED':
+            return stack_status
+        failure = tracker.timeline.first_failure() if tracker else None
+        if status == 'FAILED':
+            reason = (stack or {}).get('StackStatusReason', '')
+            if failure:
+                reason = f"{reason} ({describe_failure(failure)})"
+            raise ValueError(f"Stack operation failed: {stack_status} {reason}".strip())
+        if fail_fast and failure:
+            logger.warning(f"Failing fast on resource failure, stack is {stack_status}: {stack_name}")
+            raise ValueError(f"Stack operation failed: {describe_failure(failure)}")
+        if time.time() > deadline:
+            raise StackWaitTimeout(stack_status)
+        time.sleep(min(next_poll_delay(attempt), max(0, deadline - time.time())))
+        attempt += 1
+
+def check_status(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    非同期デプロイの状態確認用 Lambda ハンドラー
+
+    Step Functions の待機・確認ループから呼び出す。describe_stacks を 1 回だけ呼び出し、
+    終了状態であればその結果を、進行中であれば次回確認までの待機秒数を返す
+    
+    Args:
+        event: lambda_handler（async_deploy）または前回の check_status の body
+        context: Lambda コンテキスト
+        
+    Returns:
+        デプロイ状態（status: IN_PROGRESS / SUCCEEDED / FAILED / PREVIEW）
+    """
+    body = dict(event.get('body', event))
+    stack_name = body['stackName']
+    attempt = body.get('attempt', 0) + 1
+    elapsed = time.time() - body.get('deploymentTime', time.time())
+    timeout_seconds = body.get('timeoutSeconds', DEFAULT_DEPLOY_TIMEOUT)
+    body['attempt'] = attempt
+    
+    if body.get('status') == 'PREVIEW' or body.get('operationType') == 'PREVIEW':
+        body['status'] = 'PREVIEW'
+        return {'statusCode': 200, 'body': body}
+    if body.get('status') == 'SUCCEEDED' or body.get('operationType') == 'NO_CHANGE':
+        body['status'] = 'SUCCEEDED'
+        return {'statusCode': 200, 'body': body}
+    
+    try:
+        stack = get_stack(body.get('stackId') or stack_name, cloudformation_status_client)
+    except ClientError as e:
+        if not is_throttling_error(e):
+            raise
+        # スロットリング時は失敗にせず、間隔を広げて再確認する
+        logger.warning(f"describe_stacks throttled, backing off: {stack_name}")
+        stack = {'StackStatus': body.get('stackStatus', 'UNKNOWN')}
+        attempt += 1
+    
+    tracker = None
+    if body.get('streamEvents'):
+        # 前回までに読み込んだイベント以降だけを読み込み、タイムラインを body に引き継ぐ
+        tracker = StackEventTracker(
+            cloudformation_status_client,
+            body.get('stackId') or stack_name,
+            cursor=body.get('eventCursor'),
+            since=body.get('eventsSince'),
+            resources=body.get('resourceTimeline')
+        )
+        poll_stack_events(tracker)
+        body['eventCursor'] = tracker.cursor
+        body['resourceTimeline'] = tracker.timeline.resources
+    
+    stack_status = stack['StackStatus'] if stack else 'DELETE_COMPLETE'
+    status = classify_stack_status(stack_status)
+    if status == 'IN_PROGRESS' and elapsed > timeout_seconds:
+        status = 'FAILED'
+        body['error'] = f"Stack operation timed out after {int(elapsed)} seconds: {stack_status}"
+    elif status == 'FAILED':
+        body['error'] = f"Stack operation failed: {stack_status} {(stack or {}).get('StackStatusReason', '')}".strip()
+    
+    failure = tracker.timeline.first_failure() if tracker else None
+    if failure:
+        body['failedResource'] = failure
+        if status == 'IN_PROGRESS' and body.get('failFast'):
+            # ロールバックの完了を待たずに失敗とし、Step Functions の待機ループを終える
+            status = 'FAILED'
+            body['error'] = f"Stack operation failed: {describe_failure(failure)}"
+    
+    body.update({
+        'status': status,
+        'stackStatus': stack_status,
+        'elapsedSeconds': round(elapsed, 1),
+        'waitSeconds': next_poll_delay(attempt)
+    })
+    if tracker and status != 'IN_PROGRESS':
+        # 保存後は S3 から参照できるため、Step Functions の状態からは除く
+        body['timeline'] = save_timeline(body['bucketName'], body['codegenKey'], stack_name, tracker.timeline)
+        body.pop('resourceTimeline', None)
+    logger.info(f"Stack status: {stack_name} {stack_status} ({status}, attempt {body['attempt']})")
+    
+    return {
+        'statusCode': 500 if status == 'FAILED' else 200,
+        'body': body
+    }
+
+def classify_stack_status(stack_status: str) -> str:
     """
-    S3からCodeGen出力を取得
+    スタックの状態をデプロイ状態（IN_PROGRESS / SUCCEEDED / FAILED）に分類
+    """
+    if stack_status in SUCCEEDED_STACK_STATUSES:
+        return 'SUCCEEDED'
+    if stack_status in FAILED_STACK_STATUSES:
+        return 'FAILED'
+    return 'IN_PROGRESS'
+
+def next_poll_delay(attempt: int) -> int:
+    """
+    次回の状態確認までの待機秒数（ジッター付き指数バックオフ）
+
+    デプロイ直後は短い間隔で確認し、長引くほど間隔を広げる。
+    並列実行中の確認が同時に集中しないよう、上限の半分から上限の間でばらつかせる
+    """
+    delay = min(POLL_MAX_DELAY, POLL_BASE_DELAY * (2 ** attempt))
+    return random.randint(max(1, delay // 2), delay)
+
+def describe_failure(failure: Dict[str, Any]) -> str:
+    """
+    失敗したリソースと理由をエラーメッセージ用の文字列にする
+    """
+    return f"{failure['logical_id']} {failure['status']}: {failure['reason']}".strip()
+
+def poll_stack_events(tracker: StackEventTracker) -> None:
+    """
+    スタックイベントを差分読み込み（失敗してもデプロイの待機は継続する）
+    """
+    try:
+        tracker.poll()
+    except ClientError as e:
+        logger.warning(f"Error reading stack events: {str(e)}")
+
+def save_timeline(bucket_name: str, codegen_key: str, stack_name: str, timeline: ResourceTimeline) -> Dict[str, Any]:
+    """
+    リソース別タイムラインをテンプレートと同じ場所に保存し、処理時間の長いリソースを返す
+    
+    Returns:
+        保存先のキー（保存に失敗した場合は None）、処理時間の長いリソース、失敗したリソース
+    """
+    key = timeline_key(codegen_key, stack_name)
+    try:
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=key,
+            Body=timeline.to_json(stack_name).encode('utf-8'),
+            ContentType='application/json'
+        )
+    except ClientError as e:
+        logger.warning(f"Error saving deployment timeline: {str(e)}")
+        key = None
+    return {
+        's3Key': key,
+        'slowestResources': timeline.slowest(),
+        'failedResources': timeline.failed()
+    }
+
+def load_template_source(
+    bucket_name: str,
+    key: str,
+    parameters: list,
+    mode: str = 'auto'
+) -> Dict[str, Any]:
+    """
+    S3 のテンプレートを TemplateBody / TemplateURL のどちらで渡すか決定
+    
+    テンプレートはチャンク単位で読み込みながら内容ハッシュを計算する。
+    本文を保持するのは INLINE_TEMPLATE_MAX_BYTES 以下の場合のみで、それより大きい
+    テンプレートはメモリに載せずにハッシュだけ計算する（template_text は None となり、
+    ローカル検証は省略して CloudFormation の検証のみ行う）
     
     Args:
         bucket_name: S3バケット名
         key: S3オブジェクトキー
+        parameters: スタックパラメータ（内容ハッシュに含める）
+        mode: 'auto'（サイズで自動選択）/ 'inline' / 'url'
         
     Returns:
-        CloudFormationテンプレートの内容
+        template_body または template_url、template_text（大きい場合は None）、サイズ、
+        内容ハッシュ（パラメータを含む）、テンプレートのハッシュ
     """
     try:
         response = s3_client.get_object(Bucket=bucket_name, Key=key)
-        template_body = response['Body'].read().decode('utf-8')
-        logger.info(f"Successfully retrieved template from S3: {len(template_body)} characters")
-        return template_body
-        
     except ClientError as e:
         if e.response['Error']['Code'] == 'NoSuchKey':
             raise ValueError(f"CodeGen output not found in S3: {bucket_name}/{key}")
         else:
             raise ValueError(f"Error retrieving CodeGen output from S3: {str(e)}")
+    
+    size = response['ContentLength']
+    use_url = mode == 'url' or (mode == 'auto' and size > INLINE_TEMPLATE_MAX_BYTES)
+    if mode == 'inline' and size > INLINE_TEMPLATE_MAX_BYTES:
+        raise ValueError(f"Template is too large for TemplateBody: {size} bytes")
+    
+    digest = hashlib.sha256()
+    chunks = []
+    read_bytes = 0
+    body = response['Body']
+    for chunk in iter(lambda: body.read(TEMPLATE_CHUNK_BYTES), b''):
+        digest.update(chunk)
+        read_bytes += len(chunk)
+        if read_bytes > INLINE_TEMPLATE_MAX_BYTES:
+            chunks = None
+        elif chunks is not None:
+            chunks.append(chunk)
+    template_hash = digest.hexdigest()
+    digest.update(serialize_parameters(parameters))
+    template_text = b''.join(chunks).decode('utf-8') if chunks is not None else None
+    
+    if use_url:
+        logger.info(f"Template is {size} bytes, deploying from TemplateURL")
+        return {
+            'template_body': None,
+            'template_url': build_template_url(bucket_name, key),
+            'template_text': template_text,
+            'size': size,
+            'content_hash': digest.hexdigest(),
+            'template_hash': template_hash
+        }
+    
+    logger.info(f"Template is {size} bytes, deploying from TemplateBody")
+    return {
+        'template_body': template_text,
+        'template_url': None,
+        'template_text': template_text,
+        'size': size,
+        'content_hash': digest.hexdigest(),
+        'template_hash': template_hash
+    }
 
-def validate_template(template_body: str) -> None:
+def resolve_allowed_resource_types(event: Dict[str, Any]) -> Tuple[str, ...]:
+    """
+    デプロイを許可するリソースタイプを決定
+    
+    イベントの allowed_resource_types、環境変数 ALLOWED_RESOURCE_TYPES（カンマ区切り）、
+    既定の一覧の順に優先する
+    """
+    return (
+        parse_resource_types(event.get('allowed_resource_types'))
+        or parse_resource_types(os.environ.get('ALLOWED_RESOURCE_TYPES'))
+        or DEFAULT_ALLOWED_RESOURCE_TYPES
+    )
+
+def build_template_url(bucket_name: str, key: str) -> str:
+    """
+    CloudFormation に渡すテンプレートの S3 URL を作成
+    """
+    region = os.environ.get('AWS_REGION', 'us-east-1')
+    return f"https://{bucket_name}.s3.{region}.amazonaws.com/{quote(key)}"
+
+def validate_template(
+    template_body: Optional[str],
+    template_url: Optional[str] = None,
+    template_text: Optional[str] = None,
+    template_hash: Optional[str] = None,
+    allowed_resource_types: Tuple[str, ...] = DEFAULT_ALLOWED_RESOURCE_TYPES
+) -> None:
     """
     CloudFormationテンプレートのバリデーション
     
+    先にローカルで構造・参照先・リソースタイプを検証し、問題がなければ CloudFormation で検証する。
+    結果はテンプレートのハッシュごとに保持し、検証済みのテンプレートは CloudFormation を呼び出さない
+    
     Args:
         template_body: CloudFormationテンプレートの内容
+        template_url: テンプレートの S3 URL（指定時は template_body より優先）
+        template_text: ローカル検証に使うテンプレートの内容（None の場合はローカル検証を省略）
+        template_hash: 検証結果のキャッシュキー
+        allowed_resource_types: デプロイを許可するリソースタイプ（プレフィックス）
     """
+    cache_key = (template_hash, allowed_resource_types)
+    result = _template_validation_cache.get(cache_key) if template_hash else None
+    if result is None:
+        local_errors = (
+            validate_template_text(template_text, allowed_resource_types) if template_text is not None else None
+        )
+        result = {'errors': local_errors or [], 'remote_validated': False}
+        if template_hash:
+            _template_validation_cache[cache_key] = result
+            if len(_template_validation_cache) > TEMPLATE_VALIDATION_CACHE_MAX_ENTRIES:
+                _template_validation_cache.popitem(last=False)
+        if local_errors is None:
+            logger.info("Local template validation skipped (large template or unsupported format)")
+    else:
+        _template_validation_cache.move_to_end(cache_key)
+    
+    if result['errors']:
+        errors = result['errors']
+        omitted = f" (and {len(errors) - MAX_REPORTED_ERRORS} more)" if len(errors) > MAX_REPORTED_ERRORS else ''
+        raise ValueError(f"Template validation failed: {'; '.join(errors[:MAX_REPORTED_ERRORS])}{omitted}")
+    
+    if result['remote_validated']:
+        logger.info("Template validation skipped (already validated)")
+        return
+    
     try:
-        cloudformation_client.validate_template(TemplateBody=template_body)
+        cloudformation_client.validate_template(**template_argument(template_body, template_url))
+        result['remote_validated'] = True
         logger.info("Template validation successful")
         
     except ClientError as e:
         raise ValueError(f"Template validation failed: {str(e)}")
 
-def deploy_cloudformation_stack(stack_name: str, template_body: str, parameters: list) -> Dict[str, Any]:
+def deploy_cloudformation_stack(
+    stack_name: str,
+    template_body: str,
+    parameters: list,
+    content_hash: Optional[str] = None,
+    use_change_set: bool = False,
+    preview: bool = False,
+    template_url: Optional[str] = None,
+    cleanup_failed_stack: bool = False
+) -> Dict[str, Any]:
     """
     CloudFormationスタックのデプロイ
     
@@ -122,30 +973,63 @@ def deploy_cloudformation_stack(stack_name: str, template_body: str, parameters:
         stack_name: スタック名
         template_body: CloudFormationテンプレートの内容
         parameters: スタックパラメータ
+        content_hash: テンプレートとパラメータの内容ハッシュ（スタックタグに記録）
+        use_change_set: 変更セットを作成し、変更がある場合のみ実行する
+        preview: 変更セットの差分のみを返し、実行しない（use_change_set 時のみ有効）
+        template_url: テンプレートの S3 URL（指定時は template_body より優先）
+        cleanup_failed_stack: 作成に失敗した（ROLLBACK_COMPLETE の）スタックを削除する。
+            既存のスタックは削除してから作成し直し、新規作成が失敗した場合は CloudFormation に削除させる
         
     Returns:
         デプロイ結果
     """
     try:
         # スタックの存在確認
-        stack_exists = check_stack_exists(stack_name)
+        stack = get_stack(stack_name)
+        
+        # 既存のタグを引き継ぎ、内容ハッシュのタグだけを更新
+        tags = [tag for tag in (stack or {}).get('Tags', []) if tag['Key'] != CONTENT_HASH_TAG]
+        if content_hash:
+            tags.append({'Key': CONTENT_HASH_TAG, 'Value': content_hash})
+        # TTL リーパーの対象として識別できるよう、プロジェクトのタグを付ける
+        for key, value in REAPER_TAGS.items():
+            if not any(tag['Key'] == key for tag in tags):
+                tags.append({'Key': key, 'Value': value})
+        
+        # ROLLBACK_COMPLETE のスタックは更新できず、削除するまで同じ名前で作成できない
+        if stack and stack.get('StackStatus') == 'ROLLBACK_COMPLETE':
+            if not cleanup_failed_stack:
+                raise ValueError(
+                    f"Stack {stack_name} is in ROLLBACK_COMPLETE and must be deleted before it can be recreated"
+                )
+            delete_rolled_back_stack(stack['StackId'])
+            stack = None
+        
+        if use_change_set:
+            return deploy_with_change_set(
+                stack_name, template_body, parameters, tags, stack, content_hash, preview, template_url,
+                cleanup_failed_stack
+            )
         
-        if stack_exists:
+        if stack:
             logger.info(f"Updating existing stack: {stack_name}")
             response = cloudformation_client.update_stack(
                 StackName=stack_name,
-                TemplateBody=template_body,
+                **template_argument(template_body, template_url),
                 Parameters=parameters,
-                Capabilities=['CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM']
+                Capabilities=['CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM'],
+                Tags=tags
             )
             operation_type = 'UPDATE'
         else:
             logger.info(f"Creating new stack: {stack_name}")
             response = cloudformation_client.create_stack(
                 StackName=stack_name,
-                TemplateBody=template_body,
+                **template_argument(template_body, template_url),
                 Parameters=parameters,
-                Capabilities=['CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM']
+                Capabilities=['CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM'],
+                Tags=tags,
+                OnFailure='DELETE' if cleanup_failed_stack else 'ROLLBACK'
             )
             operation_type = 'CREATE'
         
@@ -168,25 +1052,272 @@ def deploy_cloudformation_stack(stack_name: str, template_body: str, parameters:
         else:
             raise ValueError(f"CloudFormation deployment failed: {str(e)}")
 
-def check_stack_exists(stack_name: str) -> bool:
+def deploy_with_change_set(
+    stack_name: str,
+    template_body: str,
+    parameters: list,
+    tags: list,
+    stack: Optional[Dict[str, Any]],
+    content_hash: Optional[str] = None,
+    preview: bool = False,
+    template_url: Optional[str] = None,
+    cleanup_failed_stack: bool = False
+) -> Dict[str, Any]:
     """
-    スタックの存在確認
+    変更セットを使ったデプロイ
+    
+    変更セットでリソース単位の差分を確認し、変更がある場合のみ実行する。
+    変更がない変更セットとプレビュー用の変更セットは削除する。新規作成の変更セットを
+    実行しない場合は、変更セットの作成時にできた REVIEW_IN_PROGRESS のスタックも削除する
     
     Args:
         stack_name: スタック名
+        template_body: CloudFormationテンプレートの内容
+        parameters: スタックパラメータ
+        tags: スタックタグ
+        stack: 既存のスタック情報（存在しない場合は None）
+        content_hash: テンプレートとパラメータの内容ハッシュ（変更セット名に使用）
+        preview: 差分のみを返し、変更セットを実行しない
+        template_url: テンプレートの S3 URL（指定時は template_body より優先）
+        cleanup_failed_stack: 新規作成が失敗した場合にスタックを削除させる
         
     Returns:
-        スタックが存在するかどうか
+        デプロイ結果（change_set に差分の概要を含む）
     """
+    # 変更セットで作成途中のスタック（REVIEW_IN_PROGRESS）は新規作成として扱う
+    is_create = not stack or stack.get('StackStatus') == 'REVIEW_IN_PROGRESS'
+    change_set_type = 'CREATE' if is_create else 'UPDATE'
+    change_set_name = f"chaos-{(content_hash or '')[:16] or 'deploy'}-{int(time.time())}"
+    
+    # 作成失敗時の動作は CREATE の変更セットでのみ指定できる
+    on_stack_failure = {'OnStackFailure': 'DELETE'} if is_create and cleanup_failed_stack else {}
+    
+    logger.info(f"Creating {change_set_type} change set: {stack_name}/{change_set_name}")
+    response = cloudformation_client.create_change_set(
+        StackName=stack_name,
+        ChangeSetName=change_set_name,
+        ChangeSetType=change_set_type,
+        **template_argument(template_body, template_url),
+        Parameters=parameters,
+        Capabilities=['CAPABILITY_IAM', 'CAPABILITY_NAMED_IAM'],
+        Tags=tags,
+        **on_stack_failure
+    )
+    change_set_id = response['Id']
+    
     try:
-        cloudformation_client.describe_stacks(StackName=stack_name)
-        return True
+        change_set = wait_for_change_set(change_set_id)
+    except ValueError:
+        if is_create:
+            delete_review_stack(response.get('StackId'))
+        raise
+    if change_set['Status'] == 'FAILED':
+        reason = change_set.get('StatusReason', '')
+        delete_change_set(change_set_id)
+        if is_create:
+            delete_review_stack(response.get('StackId'))
+        if any(empty_reason in reason for empty_reason in EMPTY_CHANGE_SET_REASONS):
+            logger.info(f"No changes in change set, skipping execution: {stack_name}")
+            return {
+                'stack_id': response.get('StackId'),
+                'operation_type': 'NO_CHANGE',
+                'deployment_time': time.time(),
+                'wait_for_completion': False,
+                'change_set': summarize_changes([])
+            }
+        raise ValueError(f"Change set creation failed: {reason}")
+    
+    summary = summarize_changes(change_set['Changes'])
+    logger.info(f"Change set summary: {json.dumps(summary)}")
+    
+    if preview:
+        delete_change_set(change_set_id)
+        if is_create:
+            delete_review_stack(response.get('StackId'))
+        return {
+            'stack_id': response.get('StackId'),
+            'operation_type': 'PREVIEW',
+            'deployment_time': time.time(),
+            'wait_for_completion': False,
+            'change_set': summary
+        }
+    
+    cloudformation_client.execute_change_set(ChangeSetName=change_set_id)
+    return {
+        'stack_id': response.get('StackId'),
+        'operation_type': change_set_type,
+        'deployment_time': time.time(),
+        'wait_for_completion': True,
+        'change_set': summary
+    }
+
+def wait_for_change_set(change_set_id: str) -> Dict[str, Any]:
+    """
+    変更セットの作成完了（CREATE_COMPLETE / FAILED）まで待機し、全ての変更を取得
+    
+    変更がない場合は FAILED になるため、ウェイターではなく状態を直接確認する
+    
+    Args:
+        change_set_id: 変更セットの ID
+        
+    Returns:
+        Status, StatusReason, Changes（全ページ分）を含む変更セット情報
+    """
+    deadline = time.time() + CHANGE_SET_TIMEOUT
+    delay = 1
+    while True:
+        response = cloudformation_client.describe_change_set(ChangeSetName=change_set_id)
+        if response['Status'] in ('CREATE_COMPLETE', 'FAILED'):
+            break
+        if time.time() > deadline:
+            delete_change_set(change_set_id)
+            raise ValueError(f"Change set creation timed out: {change_set_id}")
+        time.sleep(delay)
+        delay = min(delay * 2, 10)
+    
+    changes = list(response.get('Changes', []))
+    next_token = response.get('NextToken')
+    while next_token:
+        page = cloudformation_client.describe_change_set(ChangeSetName=change_set_id, NextToken=next_token)
+        changes.extend(page.get('Changes', []))
+        next_token = page.get('NextToken')
+    
+    return {
+        'Status': response['Status'],
+        'StatusReason': response.get('StatusReason', ''),
+        'Changes': changes
+    }
+
+def summarize_changes(changes: list) -> Dict[str, Any]:
+    """
+    変更セットの変更をリソースの追加・変更・置換・削除に分類
+    
+    Args:
+        changes: describe_change_set の Changes
+        
+    Returns:
+        分類ごとの論理 ID の一覧と件数
+    """
+    summary = {'added': [], 'modified': [], 'replaced': [], 'conditionally_replaced': [], 'removed': []}
+    for change in changes:
+        resource_change = change.get('ResourceChange', {})
+        action = resource_change.get('Action')
+        resource = f"{resource_change.get('LogicalResourceId')} ({resource_change.get('ResourceType')})"
+        if action == 'Add':
+            summary['added'].append(resource)
+        elif action == 'Remove':
+            summary['removed'].append(resource)
+        elif resource_change.get('Replacement') == 'True':
+            summary['replaced'].append(resource)
+        elif resource_change.get('Replacement') == 'Conditional':
+            summary['conditionally_replaced'].append(resource)
+        else:
+            summary['modified'].append(resource)
+    
+    summary['total'] = len(changes)
+    return summary
+
+def delete_change_set(change_set_id: str) -> None:
+    """
+    変更セットの削除（失敗しても処理は継続）
+    
+    Args:
+        change_set_id: 変更セットの ID
+    """
+    try:
+        cloudformation_client.delete_change_set(ChangeSetName=change_set_id)
+    except ClientError as e:
+        logger.warning(f"Error deleting change set {change_set_id}: {str(e)}")
+
+def delete_review_stack(stack_id: Optional[str]) -> None:
+    """
+    変更セットの作成時にできた REVIEW_IN_PROGRESS のスタックを削除（失敗しても処理は継続）
+    
+    リソースを持たないため削除はすぐに完了し、完了は待たない
+    
+    Args:
+        stack_id: スタック ID
+    """
+    if not stack_id:
+        return
+    try:
+        stack = get_stack(stack_id)
+        if stack and stack['StackStatus'] == 'REVIEW_IN_PROGRESS':
+            logger.info(f"Deleting placeholder stack left by change set: {stack_id}")
+            cloudformation_client.delete_stack(StackName=stack_id)
+    except ClientError as e:
+        logger.warning(f"Error deleting placeholder stack {stack_id}: {str(e)}")
+
+def delete_rolled_back_stack(stack_id: str) -> None:
+    """
+    作成に失敗して ROLLBACK_COMPLETE になったスタックを削除し、削除完了まで待機
+    
+    ロールバック済みのためリソースは残っておらず、削除はすぐに完了する
+    
+    Args:
+        stack_id: スタック ID
+    """
+    logger.info(f"Deleting rolled back stack: {stack_id}")
+    cloudformation_client.delete_stack(StackName=stack_id)
+    waiter = cloudformation_client.get_waiter('stack_delete_complete')
+    waiter.wait(
+        StackName=stack_id,
+        WaiterConfig={
+            'Delay': 5,
+            'MaxAttempts': 60
+        }
+    )
+    logger.info(f"Rolled back stack deleted: {stack_id}")
+
+def get_stack(stack_name: str, client: Any = None) -> Optional[Dict[str, Any]]:
+    """
+    スタック情報の取得
+    
+    Args:
+        stack_name: スタック名
+        client: 使用する CloudFormation クライアント（省略時は cloudformation_client）
+        
+    Returns:
+        スタック情報（存在しない場合は None）
+    """
+    try:
+        response = (client or cloudformation_client).describe_stacks(StackName=stack_name)
+        return response['Stacks'][0]
     except ClientError as e:
         if e.response['Error']['Code'] == 'ValidationError':
-            return False
+            return None
         else:
             raise
 
+def serialize_parameters(parameters: list) -> bytes:
+    """
+    内容ハッシュ計算用にスタックパラメータを正規化
+    """
+    return json.dumps(parameters, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+def template_argument(template_body: Optional[str], template_url: Optional[str]) -> Dict[str, str]:
+    """
+    CloudFormation API に渡すテンプレート引数（TemplateURL / TemplateBody）
+    """
+    return {'TemplateURL': template_url} if template_url else {'TemplateBody': template_body}
+
+def get_up_to_date_stack(stack_name: str, content_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    スタックが同じ内容で正常にデプロイ済みであれば、そのスタック情報を返す
+    
+    Args:
+        stack_name: スタック名
+        content_hash: デプロイしようとしている内容のハッシュ
+        
+    Returns:
+        スタック情報（更新が必要な場合は None）
+    """
+    stack = get_stack(stack_name)
+    if not stack or stack.get('StackStatus') not in STABLE_STACK_STATUSES:
+        return None
+    tags = {tag['Key']: tag['Value'] for tag in stack.get('Tags', [])}
+    return stack if tags.get(CONTENT_HASH_TAG) == content_hash else None
+
 def wait_for_deployment_completion(stack_name: str, operation_type: str) -> None:
     """
     デプロイ完了まで待機
@@ -0,0 +1,215 @@
+import json
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Callable, Optional
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+# スロットリングとして扱う CloudFormation のエラーコード
+THROTTLING_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'TooManyRequestsException',
+}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    スロットリング系のエラーかどうかを判定
+    """
+    return isinstance(error, ClientError) and error.response['Error']['Code'] in THROTTLING_ERROR_CODES
+
+
+def call_with_throttle_retry(
+    func: Callable[..., Any],
+    *args,
+    max_attempts: int = 6,
+    base_delay: float = 1.0,
+    max_delay: float = 20.0,
+    **kwargs
+) -> Any:
+    """
+    スロットリング時にフルジッター付き指数バックオフで再試行して API を呼び出す
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not is_throttling_error(e) or attempt >= max_attempts:
+                raise
+            delay = min(max_delay, base_delay * (2 ** (attempt - 1)))
+            time.sleep(random.uniform(0, delay))
+
+
+class ThrottleRetryingClient:
+    """
+    boto3 クライアントの API 呼び出しをスロットリング時に再試行するラッパー
+
+    スロットリングされたリクエストは実行されていないため、作成・更新系の API も再試行できる
+    """
+
+    def __init__(self, client, max_attempts: int = 6, base_delay: float = 1.0, max_delay: float = 20.0):
+        self._client = client
+        self._retry_options = {'max_attempts': max_attempts, 'base_delay': base_delay, 'max_delay': max_delay}
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+        if not callable(attribute) or name in ('get_waiter', 'get_paginator'):
+            return attribute
+
+        def call(*args, **kwargs):
+            return call_with_throttle_retry(attribute, *args, **self._retry_options, **kwargs)
+        return call
+
+
+def plan_stack_order(stacks: List[Dict[str, Any]]) -> List[str]:
+    """
+    スタック間の依存関係（depends_on）を検証し、デプロイ可能な順序を返す
+
+    Raises:
+        ValueError: スタック名の重複、未定義のスタックへの依存、循環依存がある場合
+    """
+    names = [stack['stack_name'] for stack in stacks]
+    if len(set(names)) != len(names):
+        raise ValueError(f"スタック名が重複しています: {names}")
+
+    dependencies = {stack['stack_name']: list(stack.get('depends_on', [])) for stack in stacks}
+    for name, depends_on in dependencies.items():
+        unknown = [dependency for dependency in depends_on if dependency not in dependencies]
+        if unknown:
+            raise ValueError(f"未定義のスタックに依存しています: {name} -> {unknown}")
+
+    order = []
+    remaining = dict(dependencies)
+    while remaining:
+        ready = [name for name in names if name in remaining and all(d not in remaining for d in remaining[name])]
+        if not ready:
+            raise ValueError(f"スタックの依存関係が循環しています: {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+    return order
+
+
+def run_stack_deployments(
+    stacks: List[Dict[str, Any]],
+    deploy: Callable[[Dict[str, Any]], Dict[str, Any]],
+    max_concurrency: int = 3,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    複数スタックを依存関係の順序を守りながら有界の並列度でデプロイ
+
+    依存先のデプロイがすべて成功したスタックから順に開始し、
+    依存先が失敗したスタックはデプロイせず SKIPPED とする。
+    deploy が status: IN_PROGRESS を返した（完了を待ちきれなかった）スタックに依存するスタックと、
+    deadline を過ぎても開始していないスタックは NOT_STARTED とする
+
+    Args:
+        stacks: stack_name と depends_on（任意）を含むスタック定義のリスト
+        deploy: 1 スタックをデプロイし、完了まで待機する関数
+        max_concurrency: 同時にデプロイするスタック数の上限
+        deadline: 新しいスタックのデプロイを開始できる期限（エポック秒）
+
+    Returns:
+        スタックごとの結果（所要時間を含む）と集計
+    """
+    order = plan_stack_order(stacks)
+    specs = {stack['stack_name']: stack for stack in stacks}
+    results: Dict[str, Dict[str, Any]] = {}
+    lock = threading.Lock()
+    in_flight = {'current': 0, 'max': 0}
+    batch_started_at = time.time()
+
+    def run_stack(name: str) -> Dict[str, Any]:
+        started_at = time.time()
+        with lock:
+            in_flight['current'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['current'])
+        try:
+            output = deploy(specs[name]) or {}
+            result = {'stack_name': name, 'status': 'SUCCEEDED', **output}
+        except Exception as e:
+            result = {'stack_name': name, 'status': 'FAILED', 'error': str(e)}
+        finally:
+            with lock:
+                in_flight['current'] -= 1
+        finished_at = time.time()
+        result.update({
+            'queued_seconds': round(started_at - batch_started_at, 3),
+            'duration_seconds': round(finished_at - started_at, 3),
+            'finished_seconds': round(finished_at - batch_started_at, 3)
+        })
+        return result
+
+    pending = list(order)
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        running = {}
+        while pending or running:
+            # 依存先の結果が確定したスタックを開始（失敗した依存先がある場合はスキップ）
+            for name in list(pending):
+                depends_on = specs[name].get('depends_on', [])
+                if any(results.get(d, {}).get('status') in ('FAILED', 'SKIPPED') for d in depends_on):
+                    pending.remove(name)
+                    results[name] = {
+                        'stack_name': name,
+                        'status': 'SKIPPED',
+                        'error': f"依存先のスタックのデプロイに失敗しました: {depends_on}"
+                    }
+                    continue
+                if any(results.get(d, {}).get('status') in ('IN_PROGRESS', 'NOT_STARTED') for d in depends_on):
+                    pending.remove(name)
+                    results[name] = {
+                        'stack_name': name,
+                        'status': 'NOT_STARTED',
+                        'error': f"依存先のスタックのデプロイが完了していません: {depends_on}"
+                    }
+                    continue
+                if deadline is not None and time.time() > deadline:
+                    pending.remove(name)
+                    results[name] = {
+                        'stack_name': name,
+                        'status': 'NOT_STARTED',
+                        'error': 'Lambda の実行時間内にデプロイを開始できませんでした'
+                    }
+                    continue
+                if len(running) >= max_concurrency:
+                    continue
+                if all(results.get(d, {}).get('status') == 'SUCCEEDED' for d in depends_on):
+                    pending.remove(name)
+                    running[executor.submit(run_stack, name)] = name
+
+            if not running:
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                logger.info(json.dumps({'stack_deployment': result}, ensure_ascii=False))
+                results[running.pop(future)] = result
+
+    elapsed = time.time() - batch_started_at
+    ordered_results = [results[name] for name in order]
+    durations = [r['duration_seconds'] for r in ordered_results if 'duration_seconds' in r]
+
+    return {
+        'results': ordered_results,
+        'summary': {
+            'total': len(ordered_results),
+            'succeeded': sum(1 for r in ordered_results if r['status'] == 'SUCCEEDED'),
+            'failed': sum(1 for r in ordered_results if r['status'] == 'FAILED'),
+            'skipped': sum(1 for r in ordered_results if r['status'] == 'SKIPPED'),
+            'in_progress': sum(1 for r in ordered_results if r['status'] == 'IN_PROGRESS'),
+            'not_started': sum(1 for r in ordered_results if r['status'] == 'NOT_STARTED'),
+            'elapsed_seconds': round(elapsed, 3),
+            'sum_of_durations_seconds': round(sum(durations), 3),
+            'max_concurrency': max_concurrency,
+            'max_in_flight': in_flight['max']
+        }
+    }
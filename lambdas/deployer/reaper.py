@@ -0,0 +1,98 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Any
+
+# 削除の対象とするスタック名のプレフィックスとタグ
+REAPER_STACK_PREFIX = 'chaos-engineering-'
+REAPER_TAGS = {'Project': 'ChaosEngineering'}
+
+# 削除に失敗（DELETE_FAILED）したスタックを再試行する回数の上限（超えたものは手動対応として報告する）
+MAX_DELETE_ATTEMPTS = 3
+
+
+def stack_age_seconds(stack: Dict[str, Any], now: datetime) -> float:
+    """
+    スタックの最終更新（更新がなければ作成）からの経過秒数
+    """
+    last_changed = stack.get('LastUpdatedTime') or stack['CreationTime']
+    return (now - last_changed).total_seconds()
+
+
+def select_expired_stacks(
+    stacks: List[Dict[str, Any]],
+    now: datetime,
+    ttl_seconds: float,
+    prefix: str = REAPER_STACK_PREFIX,
+    tags: Dict[str, str] = REAPER_TAGS
+) -> List[Dict[str, Any]]:
+    """
+    describe_stacks の結果から TTL を過ぎたカオス環境のスタックを選ぶ
+
+    作成・更新・削除中のスタック（*_IN_PROGRESS）は対象外とし、古い順に返す。
+    ただし変更セットのプレビューなどで残った REVIEW_IN_PROGRESS のスタックは対象とする
+    """
+    expired = []
+    for stack in stacks:
+        if not stack['StackName'].startswith(prefix):
+            continue
+        stack_tags = {tag['Key']: tag['Value'] for tag in stack.get('Tags', [])}
+        if any(stack_tags.get(key) != value for key, value in tags.items()):
+            continue
+        status = stack['StackStatus']
+        if (status.endswith('_IN_PROGRESS') and status != 'REVIEW_IN_PROGRESS') or status == 'DELETE_COMPLETE':
+            continue
+        age = stack_age_seconds(stack, now)
+        if age > ttl_seconds:
+            expired.append({
+                'stack_name': stack['StackName'],
+                'stack_id': stack['StackId'],
+                'stack_status': stack['StackStatus'],
+                'status_reason': stack.get('StackStatusReason', ''),
+                'age_hours': round(age / 3600, 1)
+            })
+    return sorted(expired, key=lambda stack: stack['age_hours'], reverse=True)
+
+
+def select_deleting_stacks(stacks: List[Dict[str, Any]], prefix: str = REAPER_STACK_PREFIX) -> List[str]:
+    """
+    削除中（前回までの実行で削除を開始した）スタックの名前を返す
+    """
+    return [
+        stack['StackName'] for stack in stacks
+        if stack['StackName'].startswith(prefix) and stack['StackStatus'] == 'DELETE_IN_PROGRESS'
+    ]
+
+
+def select_recently_deleted(
+    summaries: List[Dict[str, Any]],
+    now: datetime,
+    window_seconds: float,
+    prefix: str = REAPER_STACK_PREFIX
+) -> List[Dict[str, Any]]:
+    """
+    list_stacks（DELETE_COMPLETE）の結果から、直近 window_seconds 以内に削除が完了したスタックを返す
+    """
+    return [
+        {'stack_name': summary['StackName'], 'deleted_at': summary['DeletionTime'].isoformat()}
+        for summary in summaries
+        if summary['StackName'].startswith(prefix)
+        and summary.get('DeletionTime')
+        and (now - summary['DeletionTime']).total_seconds() <= window_seconds
+    ]
+
+
+def summarize_reclaimed(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    削除を開始したスタックのリソースをリソースタイプごとに集計
+    """
+    deleted = [result for result in results if result['status'] == 'DELETING']
+    by_type = Counter(
+        resource['resource_type']
+        for result in deleted
+        for resource in result.get('resources', [])
+    )
+    return {
+        'stacks': len(deleted),
+        'resources': sum(by_type.values()),
+        'resources_by_type': dict(by_type.most_common())
+    }
@@ -0,0 +1,225 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger()
+
+# スタック自体の操作開始を表す状態（初回の読み込みはこのイベントまで遡る）
+STACK_OPERATION_START_STATUSES = {
+    'CREATE_IN_PROGRESS',
+    'UPDATE_IN_PROGRESS',
+    'DELETE_IN_PROGRESS',
+    'IMPORT_IN_PROGRESS',
+}
+
+STACK_RESOURCE_TYPE = 'AWS::CloudFormation::Stack'
+
+# 操作の失敗（この後ロールバックされる）を表すリソースの状態
+# DELETE_FAILED は更新後のクリーンアップでも発生し、スタックの成否に影響しないため含めない
+OPERATION_FAILED_STATUSES = {'CREATE_FAILED', 'UPDATE_FAILED', 'IMPORT_FAILED'}
+
+
+class StackEventStream:
+    """
+    describe_stack_events を前回読み込んだイベント ID 以降だけ読み込むストリーム
+
+    describe_stack_events は新しい順に返るため、既読のイベントに達した時点で読み込みを止める。
+    初回は今回の操作の開始イベント（since 以降）まで遡る
+    """
+
+    def __init__(self, client, stack_name: str, last_event_id: Optional[str] = None, since: Optional[float] = None):
+        self.client = client
+        self.stack_name = stack_name
+        self.last_event_id = last_event_id
+        self.since = datetime.fromtimestamp(since, timezone.utc) if since else None
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        新着イベントを古い順に返す
+        """
+        events = []
+        next_token = None
+        while True:
+            params = {'StackName': self.stack_name}
+            if next_token:
+                params['NextToken'] = next_token
+            response = self.client.describe_stack_events(**params)
+
+            reached_seen = False
+            for event in response.get('StackEvents', []):
+                if event['EventId'] == self.last_event_id or (self.since and event['Timestamp'] < self.since):
+                    reached_seen = True
+                    break
+                events.append(event)
+                if self.last_event_id is None and is_operation_start(event):
+                    reached_seen = True
+                    break
+
+            next_token = response.get('NextToken')
+            if reached_seen or not next_token:
+                break
+
+        events.reverse()
+        if events:
+            self.last_event_id = events[-1]['EventId']
+        return events
+
+
+def is_operation_start(event: Dict[str, Any]) -> bool:
+    return (
+        event.get('ResourceType') == STACK_RESOURCE_TYPE
+        and event.get('LogicalResourceId') == event.get('StackName')
+        and event.get('ResourceStatus') in STACK_OPERATION_START_STATUSES
+    )
+
+
+class ResourceTimeline:
+    """
+    スタックイベントから論理リソースごとの処理時間を集計するタイムライン
+
+    リソースごとに *_IN_PROGRESS から *_COMPLETE / *_FAILED までをフェーズとして記録する
+    （ロールバック時は削除などのフェーズが追加される）
+    """
+
+    def __init__(self, resources: Optional[Dict[str, Any]] = None):
+        self.resources: Dict[str, Any] = resources or {}
+
+    def add_events(self, events: List[Dict[str, Any]]) -> None:
+        """
+        イベントを古い順に反映
+        """
+        for event in events:
+            status = event.get('ResourceStatus', '')
+            timestamp = to_epoch(event['Timestamp'])
+            resource = self.resources.setdefault(event['LogicalResourceId'], {
+                'resource_type': event.get('ResourceType'),
+                'phases': []
+            })
+            phases = resource['phases']
+            current = phases[-1] if phases and 'finished_at' not in phases[-1] else None
+
+            if status.endswith('_IN_PROGRESS'):
+                if current is None:
+                    phases.append({'action': status[:-len('_IN_PROGRESS')], 'started_at': timestamp})
+            elif status.endswith(('_COMPLETE', '_FAILED', '_SKIPPED')):
+                if current is None:
+                    # 開始イベントを読み込む前に終了したリソース（完了時刻のみ記録）
+                    current = {'action': status.rsplit('_', 1)[0], 'started_at': timestamp}
+                    phases.append(current)
+                current.update({
+                    'finished_at': timestamp,
+                    'duration_seconds': round(timestamp - current['started_at'], 3),
+                    'status': status
+                })
+                if event.get('ResourceStatusReason') and status.endswith('_FAILED'):
+                    current['reason'] = event['ResourceStatusReason']
+            resource['status'] = status
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        リソースごとの合計処理時間（スタック自体を除く）
+        """
+        rows = []
+        for logical_id, resource in self.resources.items():
+            if resource['resource_type'] == STACK_RESOURCE_TYPE:
+                continue
+            rows.append({
+                'logical_id': logical_id,
+                'resource_type': resource['resource_type'],
+                'status': resource.get('status'),
+                'duration_seconds': round(sum(p.get('duration_seconds', 0) for p in resource['phases']), 3)
+            })
+        return rows
+
+    def slowest(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        処理時間の長いリソースを返す
+        """
+        return sorted(self.summary(), key=lambda row: row['duration_seconds'], reverse=True)[:limit]
+
+    def failed(self) -> List[Dict[str, Any]]:
+        """
+        失敗したフェーズを含むリソースと理由を返す
+        """
+        return [
+            {'logical_id': logical_id, 'status': phase['status'], 'reason': phase.get('reason', '')}
+            for logical_id, resource in self.resources.items()
+            for phase in resource['phases']
+            if phase.get('status', '').endswith('_FAILED')
+        ]
+
+    def first_failure(self) -> Optional[Dict[str, Any]]:
+        """
+        最初に失敗したリソース（ロールバックの原因）を返す
+        """
+        failures = [
+            {'logical_id': logical_id, 'status': phase['status'], 'reason': phase.get('reason', ''),
+             'finished_at': phase['finished_at']}
+            for logical_id, resource in self.resources.items()
+            for phase in resource['phases']
+            if phase.get('status') in OPERATION_FAILED_STATUSES
+        ]
+        return min(failures, key=lambda failure: failure['finished_at']) if failures else None
+
+    def to_json(self, stack_name: str) -> str:
+        return json.dumps({
+            'stack_name': stack_name,
+            'resources': self.resources,
+            'slowest': self.slowest(),
+            'failed': self.failed(),
+            'first_failure': self.first_failure()
+        }, indent=2, ensure_ascii=False)
+
+
+class StackEventTracker:
+    """
+    イベントの差分読み込みとタイムラインの集計をまとめたもの
+
+    cursor（最後に読み込んだイベント ID）と resources を保存しておけば、
+    別の Lambda 呼び出しから続きを読み込める
+    """
+
+    def __init__(
+        self,
+        client,
+        stack_name: str,
+        cursor: Optional[str] = None,
+        since: Optional[float] = None,
+        resources: Optional[Dict[str, Any]] = None
+    ):
+        self.stream = StackEventStream(client, stack_name, cursor, since)
+        self.timeline = ResourceTimeline(resources)
+
+    @property
+    def cursor(self) -> Optional[str]:
+        return self.stream.last_event_id
+
+    def poll(self) -> int:
+        """
+        新着イベントをタイムラインに反映し、件数を返す
+        """
+        events = self.stream.poll()
+        self.timeline.add_events(events)
+        for event in events:
+            if event.get('ResourceStatus', '').endswith('_FAILED'):
+                logger.warning(
+                    f"Resource failed: {event['LogicalResourceId']} {event['ResourceStatus']} "
+                    f"{event.get('ResourceStatusReason', '')}".strip()
+                )
+        return len(events)
+
+
+def to_epoch(timestamp: Any) -> float:
+    """
+    イベントの Timestamp（datetime）をエポック秒に変換
+    """
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+
+
+def timeline_key(codegen_key: str, stack_name: str) -> str:
+    """
+    タイムラインの保存先（テンプレートと同じ場所に stack_name ごとに保存）
+    """
+    base = codegen_key[:-len('.json')] if codegen_key.endswith('.json') else codegen_key
+    return f'{base}.{stack_name}.timeline.json'
@@ -0,0 +1,273 @@
+import re
+import json
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+# PyYAML はランタイムに含まれないため、利用できる場合のみ YAML テンプレートを検証する
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# テンプレートの最上位に指定できるセクション
+TOP_LEVEL_SECTIONS = {
+    'AWSTemplateFormatVersion',
+    'Description',
+    'Metadata',
+    'Parameters',
+    'Rules',
+    'Mappings',
+    'Conditions',
+    'Transform',
+    'Resources',
+    'Outputs',
+}
+
+# リソースに指定できる属性
+RESOURCE_ATTRIBUTES = {
+    'Type',
+    'Properties',
+    'DependsOn',
+    'Condition',
+    'Metadata',
+    'DeletionPolicy',
+    'UpdateReplacePolicy',
+    'CreationPolicy',
+    'UpdatePolicy',
+}
+
+# デプロイを許可するリソースタイプ（プレフィックス）。CDK コード生成が出力するサービスと CDK の補助リソース
+DEFAULT_ALLOWED_RESOURCE_TYPES = (
+    'AWS::EC2::',
+    'AWS::ElasticLoadBalancingV2::',
+    'AWS::AutoScaling::',
+    'AWS::RDS::',
+    'AWS::DynamoDB::',
+    'AWS::ECS::',
+    'AWS::Lambda::',
+    'AWS::S3::',
+    'AWS::SNS::',
+    'AWS::SQS::',
+    'AWS::CloudWatch::',
+    'AWS::Logs::',
+    'AWS::IAM::',
+    'AWS::FIS::',
+    'AWS::SecretsManager::',
+    'AWS::KMS::',
+    'AWS::SSM::',
+    'AWS::CDK::Metadata',
+    'AWS::CloudFormation::CustomResource',
+    'Custom::',
+)
+
+# エラーメッセージに含める件数の上限
+MAX_REPORTED_ERRORS = 20
+
+SUB_VARIABLE_PATTERN = re.compile(r'\$\{(?!!)([^}]+)\}')
+
+
+if yaml is not None:
+    class CloudFormationLoader(yaml.SafeLoader):
+        """
+        CloudFormation の短縮形（!Ref, !GetAtt, !Sub など）を読み込める YAML ローダー
+        """
+
+    def _construct_intrinsic(loader, tag_suffix, node):
+        if isinstance(node, yaml.ScalarNode):
+            value = loader.construct_scalar(node)
+        elif isinstance(node, yaml.SequenceNode):
+            value = loader.construct_sequence(node, deep=True)
+        else:
+            value = loader.construct_mapping(node, deep=True)
+        if tag_suffix == 'GetAtt' and isinstance(value, str):
+            value = value.split('.', 1)
+        return {'Ref' if tag_suffix == 'Ref' else f'Fn::{tag_suffix}': value}
+
+    CloudFormationLoader.add_multi_constructor('!', _construct_intrinsic)
+
+
+def parse_resource_types(value: Any) -> Optional[Tuple[str, ...]]:
+    """
+    許可するリソースタイプ（プレフィックス）の指定を読み込む
+
+    Args:
+        value: カンマ区切りの文字列またはリスト
+
+    Returns:
+        プレフィックスのタプル（指定がない場合は None）
+    """
+    if not value:
+        return None
+    items = value.split(',') if isinstance(value, str) else value
+    resource_types = tuple(item.strip() for item in items if item and item.strip())
+    return resource_types or None
+
+
+def parse_template(text: str) -> Optional[Dict[str, Any]]:
+    """
+    JSON / YAML のテンプレートを読み込む
+
+    Returns:
+        テンプレート（YAML で PyYAML が利用できない場合は None）
+
+    Raises:
+        ValueError: 構文エラーの場合
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        if text.lstrip().startswith('{'):
+            raise ValueError(f"Invalid JSON template: {str(e)}")
+        json_error = e
+
+    if yaml is None:
+        return None
+    try:
+        return yaml.load(text, Loader=CloudFormationLoader)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid template (JSON: {str(json_error)}, YAML: {str(e)})")
+
+
+def validate_template_text(
+    text: str,
+    allowed_resource_types: Tuple[str, ...] = DEFAULT_ALLOWED_RESOURCE_TYPES
+) -> Optional[List[str]]:
+    """
+    テンプレートを CloudFormation に送らずに検証
+
+    Returns:
+        エラーメッセージのリスト（問題がなければ空）。検証できない形式の場合は None
+    """
+    try:
+        template = parse_template(text)
+    except ValueError as e:
+        return [str(e)]
+    if template is None:
+        return None
+    return validate_template_document(template, allowed_resource_types)
+
+
+def validate_template_document(
+    template: Any,
+    allowed_resource_types: Tuple[str, ...] = DEFAULT_ALLOWED_RESOURCE_TYPES
+) -> List[str]:
+    """
+    テンプレートの構造、組み込み関数の参照先、リソースタイプを検証
+    """
+    if not isinstance(template, dict):
+        return ['Template must be an object']
+
+    errors = []
+    unknown_sections = sorted(set(template) - TOP_LEVEL_SECTIONS)
+    if unknown_sections:
+        errors.append(f"Unknown top-level sections: {unknown_sections}")
+
+    version = template.get('AWSTemplateFormatVersion')
+    if version is not None and str(version) != '2010-09-09':
+        errors.append(f"Unsupported AWSTemplateFormatVersion: {version}")
+
+    sections = {}
+    for name in ('Parameters', 'Mappings', 'Conditions', 'Resources', 'Outputs'):
+        section = template.get(name, {})
+        if not isinstance(section, dict):
+            errors.append(f"{name} must be an object")
+            section = {}
+        sections[name] = section
+
+    resources = sections['Resources']
+    if not resources:
+        errors.append('Resources must contain at least one resource')
+
+    for name, parameter in sections['Parameters'].items():
+        if not isinstance(parameter, dict) or 'Type' not in parameter:
+            errors.append(f"Parameters.{name}: Type is required")
+
+    conditions = set(sections['Conditions'])
+    for logical_id, resource in resources.items():
+        path = f"Resources.{logical_id}"
+        if not isinstance(resource, dict):
+            errors.append(f"{path}: resource must be an object")
+            continue
+        resource_type = resource.get('Type')
+        if not isinstance(resource_type, str):
+            errors.append(f"{path}: Type is required")
+        elif not resource_type.startswith(allowed_resource_types):
+            errors.append(f"{path}: resource type is not allowed: {resource_type}")
+        unknown_attributes = sorted(set(resource) - RESOURCE_ATTRIBUTES)
+        if unknown_attributes:
+            errors.append(f"{path}: unknown attributes: {unknown_attributes}")
+        if 'Properties' in resource and not isinstance(resource['Properties'], dict):
+            errors.append(f"{path}: Properties must be an object")
+        depends_on = resource.get('DependsOn', [])
+        for dependency in [depends_on] if isinstance(depends_on, str) else depends_on:
+            if dependency not in resources:
+                errors.append(f"{path}: DependsOn references undefined resource '{dependency}'")
+        if 'Condition' in resource and resource['Condition'] not in conditions:
+            errors.append(f"{path}: Condition references undefined condition '{resource['Condition']}'")
+
+    for name, output in sections['Outputs'].items():
+        if not isinstance(output, dict) or 'Value' not in output:
+            errors.append(f"Outputs.{name}: Value is required")
+        elif 'Condition' in output and output['Condition'] not in conditions:
+            errors.append(f"Outputs.{name}: Condition references undefined condition '{output['Condition']}'")
+
+    # マクロ（Transform）はデプロイ時にリソースや参照を追加するため、参照先の検証は行わない
+    if 'Transform' not in template:
+        refs = set(sections['Parameters']) | set(resources)
+        for name in ('Resources', 'Outputs', 'Conditions'):
+            errors.extend(check_references(sections[name], name, refs, set(resources), conditions))
+
+    return errors
+
+
+def check_references(
+    node: Any,
+    path: str,
+    refs: Set[str],
+    resources: Set[str],
+    conditions: Set[str]
+) -> List[str]:
+    """
+    Ref / Fn::GetAtt / Fn::Sub / Fn::If の参照先が定義されているか検証
+    """
+    errors = []
+    if isinstance(node, list):
+        for index, item in enumerate(node):
+            errors.extend(check_references(item, f"{path}[{index}]", refs, resources, conditions))
+        return errors
+    if not isinstance(node, dict):
+        return errors
+
+    if len(node) == 1:
+        (function, args), = node.items()
+        if function == 'Ref' and isinstance(args, str):
+            if args not in refs and not args.startswith('AWS::'):
+                errors.append(f"{path}: Ref to undefined parameter or resource '{args}'")
+        elif function == 'Fn::GetAtt':
+            if isinstance(args, str):
+                target = args.split('.', 1)[0]
+            else:
+                target = args[0] if isinstance(args, list) and args else None
+            if isinstance(target, str) and target not in resources:
+                errors.append(f"{path}: Fn::GetAtt references undefined resource '{target}'")
+        elif function == 'Fn::Sub':
+            if isinstance(args, list) and args:
+                text, variables = args[0], (args[1] if len(args) > 1 else {})
+            else:
+                text, variables = args, {}
+            if isinstance(text, str):
+                for variable in SUB_VARIABLE_PATTERN.findall(text):
+                    name = variable.strip()
+                    if isinstance(variables, dict) and name in variables:
+                        continue
+                    target = name.split('.', 1)[0]
+                    if '.' in name and target not in resources:
+                        errors.append(f"{path}: Fn::Sub references undefined resource '{target}'")
+                    elif '.' not in name and name not in refs and not name.startswith('AWS::'):
+                        errors.append(f"{path}: Fn::Sub references undefined parameter or resource '{name}'")
+        elif function == 'Fn::If' and isinstance(args, list) and args and isinstance(args[0], str):
+            if args[0] not in conditions:
+                errors.append(f"{path}: Fn::If references undefined condition '{args[0]}'")
+
+    for key, value in node.items():
+        errors.extend(check_references(value, f"{path}.{key}", refs, resources, conditions))
+    return errors
@@ -1,131 +1,330 @@
-import json
-from typing import Dict, List, Any
+import re
+import heapq
+import operator
+from typing import Dict, List, Any, Iterable, Tuple, Union
 import logging
 
 logger = logging.getLogger()
 
-class CDKCodeGenerator:
+# テンプレート内で置換するスロット名（それ以外の波括弧は TypeScript としてそのまま出力）
+TEMPLATE_SLOTS = ('safe_name', 'safe_name_lower', 'scenario_name', 'imports_section', 'resources_section')
+_SLOT_PATTERN = re.compile(r'\{(' + '|'.join(TEMPLATE_SLOTS) + r')\}')
+
+
+class CodeTemplate:
     """
-    シナリオ分析結果をもとに TypeScript の CDK Construct ソースコードを生成
+    事前にコンパイルされたコードテンプレート
+
+    登録時に静的部分とスロットの並びから取り出し位置を計算しておき、生成時は
+    (静的部分 + スロットの値) から itemgetter で並べた要素を 1 回の join で連結する
+    """
+
+    def __init__(self, source: str = '', parts: Iterable[Union[str, int]] = None):
+        if parts is None:
+            split = _SLOT_PATTERN.split(source)
+            # split の結果は [静的部分, スロット名, 静的部分, ...] の順に並ぶ
+            parts = [split[0]]
+            for index in range(1, len(split), 2):
+                parts.extend((TEMPLATE_SLOTS.index(split[index]), split[index + 1]))
+        # 文字列は静的部分、整数は TEMPLATE_SLOTS のスロット番号
+        self._parts = tuple(part for part in parts if part != '')
+        self._arity = max((part + 1 for part in self._parts if isinstance(part, int)), default=0)
+        self._statics = tuple(part for part in self._parts if isinstance(part, str))
+        # 静的部分は先頭から、スロットの値は静的部分の後ろに並べた位置から取り出す
+        positions, static_index = [], 0
+        for part in self._parts:
+            if isinstance(part, int):
+                positions.append(len(self._statics) + part)
+            else:
+                positions.append(static_index)
+                static_index += 1
+        # itemgetter は位置が 1 つ以下だとタプルを返さないため、その場合はタプルを作る
+        if len(positions) > 1:
+            self._pick = operator.itemgetter(*positions)
+        else:
+            self._pick = lambda items: tuple(items[position] for position in positions)
+
+    @classmethod
+    def join(cls, separator: str, templates: Iterable['CodeTemplate']) -> 'CodeTemplate':
+        """
+        テンプレートを separator で連結した 1 つのテンプレートを返す
+        """
+        parts: List[Union[str, int]] = []
+        for index, template in enumerate(templates):
+            if index:
+                parts.append(separator)
+            parts.extend(template._parts)
+        return cls(parts=parts)
+
+    def fill(self, **sections: Union[str, 'CodeTemplate']) -> 'CodeTemplate':
+        """
+        指定したスロットを固定の文字列（またはテンプレート）で置き換えたテンプレートを返す
+        """
+        parts: List[Union[str, int]] = []
+        for part in self._parts:
+            value = sections.get(TEMPLATE_SLOTS[part]) if isinstance(part, int) else None
+            if value is None:
+                parts.append(part)
+            elif isinstance(value, CodeTemplate):
+                parts.extend(value._parts)
+            else:
+                parts.append(value)
+        return CodeTemplate(parts=parts)
+
+    def render(self, *values: str) -> str:
+        """
+        render(safe_name, safe_name_lower, scenario_name, ...) の順でスロットの値を埋める
+
+        Raises:
+            ValueError: テンプレートが使うスロットの値が足りない、または None の場合
+        """
+        if len(values) < self._arity or None in values[:self._arity]:
+            missing = [TEMPLATE_SLOTS[slot] for slot in range(self._arity) if slot >= len(values) or values[slot] is None]
+            raise ValueError(f"スロットの値が指定されていません: {', '.join(missing)}")
+        return ''.join(self._pick(self._statics + values))
+
+
+class ResourceTemplate:
+    """
+    1 つのリソース（または密結合したリソース群）のコードテンプレート
+
+    provides はこのスニペットが定義する TypeScript の変数名、
+    requires はこのスニペットが参照する他リソースの変数名
+    """
+
+    def __init__(
+        self,
+        name: str,
+        imports: Iterable[str],
+        snippet: str,
+        provides: Iterable[str] = (),
+        requires: Iterable[str] = ()
+    ):
+        self.name = name
+        self.imports = tuple(imports)
+        self.code = CodeTemplate(snippet)
+        self.provides = tuple(provides)
+        self.requires = tuple(requires)
+
+
+class ResourceGraphError(ValueError):
+    """
+    リソースの依存関係を解決できない場合のエラー
+    """
+
+
+class TemplateRegistry:
     """
-    
+    リソーステンプレートとサービス -> リソースの対応を管理するレジストリ
+
+    サービスの組み合わせごとに、依存関係を解決した生成プラン
+    （インポート部分と、トポロジカル順に並んだリソース）をキャッシュする
+    """
+
     def __init__(self):
-        self.imports = set()
-        self.resources = []
-        self.constructs = []
-        
-    def generate_cdk_code(self, aws_services: List[str], scenario_json: Dict[str, Any]) -> str:
+        self.resources: Dict[str, ResourceTemplate] = {}
+        self.services: Dict[str, Tuple[str, ...]] = {}
+        self._providers: Dict[str, str] = {}
+        self._order: Dict[str, int] = {}
+        self._plans: Dict[frozenset, Tuple[str, Tuple[ResourceTemplate, ...], CodeTemplate]] = {}
+
+    def register_resource(self, resource: ResourceTemplate) -> None:
+        for symbol in resource.provides:
+            provider = self._providers.get(symbol)
+            if provider is not None and provider != resource.name:
+                raise ResourceGraphError(f"'{symbol}' は既に {provider} が提供しています")
+            self._providers[symbol] = resource.name
+        self.resources[resource.name] = resource
+        # 同じ依存段階のリソースは登録順に出力する
+        self._order.setdefault(resource.name, len(self._order))
+        self._plans.clear()
+
+    def register_service(self, service: str, resource_names: Iterable[str]) -> None:
+        self.services[service] = tuple(resource_names)
+        self._plans.clear()
+
+    def plan(self, aws_services: Iterable[str]) -> Tuple[str, Tuple[ResourceTemplate, ...], CodeTemplate]:
         """
-        CDK コードを生成
+        サービス一覧から (インポート部分, 出力順のリソース, スタック全体のテンプレート) を返す
+
+        スタック全体のテンプレートはインポート部分とリソースを埋め込み済みで、
+        名前のスロットだけを残している
         """
-        self.imports.clear()
-        self.resources.clear()
-        self.constructs.clear()
-        
-        # 基本的なインポート
-        self.imports.add("import * as cdk from 'aws-cdk-lib';")
-        self.imports.add("import { Construct } from 'constructs';")
-        
-        # AWS サービスごとのリソース生成
-        for service in aws_services:
-            self._generate_service_resources(service, scenario_json)
-        
-        # CDK スタックコードの組み立て
-        return self._assemble_cdk_code(scenario_json)
-    
-    def _generate_service_resources(self, service: str, scenario_json: Dict[str, Any]):
+        # 登録済みのサービスだけをキーにし、キャッシュの大きさを組み合わせ数で抑える
+        key = frozenset(service for service in aws_services if service in self.services)
+        plan = self._plans.get(key)
+        if plan is None:
+            resources = self._resolve(key)
+            imports = set(BASE_IMPORTS)
+            for resource in resources:
+                imports.update(resource.imports)
+            imports_section = '\n'.join(sorted(imports))
+            code = STACK_TEMPLATE.fill(
+                imports_section=imports_section,
+                resources_section=CodeTemplate.join('\n', (resource.code for resource in resources))
+            )
+            plan = (imports_section, resources, code)
+            self._plans[key] = plan
+        return plan
+
+    def _resolve(self, aws_services: frozenset) -> Tuple[ResourceTemplate, ...]:
         """
-        サービス別のリソース生成
+        要求されたリソースに前提リソースを補い、トポロジカル順に並べる
         """
-        scenario_name = scenario_json.get('scenario_name', 'ChaosTest')
-        safe_name = scenario_name.replace(' ', '').replace('-', '')
-        
-        if service == 'EC2':
-            self._generate_ec2_resources(safe_name, scenario_json)
-        elif service == 'RDS':
-            self._generate_rds_resources(safe_name, scenario_json)
-        elif service == 'S3':
-            self._generate_s3_resources(safe_name, scenario_json)
-        elif service == 'Lambda':
-            self._generate_lambda_resources(safe_name, scenario_json)
-        elif service == 'ELB':
-            self._generate_elb_resources(safe_name, scenario_json)
-        elif service == 'VPC':
-            self._generate_vpc_resources(safe_name, scenario_json)
-        elif service == 'CloudWatch':
-            self._generate_cloudwatch_resources(safe_name, scenario_json)
-        elif service == 'SNS':
-            self._generate_sns_resources(safe_name, scenario_json)
-        elif service == 'SQS':
-            self._generate_sqs_resources(safe_name, scenario_json)
-        elif service == 'DynamoDB':
-            self._generate_dynamodb_resources(safe_name, scenario_json)
-    
-    def _generate_ec2_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """EC2 リソースの生成"""
-        self.imports.add("import * as ec2 from 'aws-cdk-lib/aws-ec2';")
-        
-        # VPC
-        vpc_code = f"""
+        # 要求されたリソースと、その前提リソースを 1 回ずつ収集
+        selected: Dict[str, ResourceTemplate] = {}
+        pending = [
+            name
+            for service in aws_services
+            for name in self.services.get(service, ())
+        ]
+        while pending:
+            name = pending.pop()
+            if name in selected:
+                continue
+            resource = self.resources.get(name)
+            if resource is None:
+                raise ResourceGraphError(f"リソーステンプレートが登録されていません: {name}")
+            selected[name] = resource
+            for symbol in resource.requires:
+                provider = self._providers.get(symbol)
+                if provider is None:
+                    raise ResourceGraphError(f"{name} が参照する '{symbol}' を提供するリソースがありません")
+                pending.append(provider)
+
+        # Kahn のアルゴリズム（同順位は登録順で決定的に並べる）
+        dependents: Dict[str, List[str]] = {name: [] for name in selected}
+        in_degree = {name: 0 for name in selected}
+        for name, resource in selected.items():
+            for provider in {self._providers[symbol] for symbol in resource.requires}:
+                if provider != name:
+                    dependents[provider].append(name)
+                    in_degree[name] += 1
+
+        ready = [(self._order[name], name) for name, degree in in_degree.items() if degree == 0]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            _, name = heapq.heappop(ready)
+            ordered.append(selected[name])
+            for dependent in dependents[name]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    heapq.heappush(ready, (self._order[dependent], dependent))
+
+        if len(ordered) != len(selected):
+            cyclic = sorted(name for name, degree in in_degree.items() if degree > 0)
+            raise ResourceGraphError(f"リソースの依存関係が循環しています: {', '.join(cyclic)}")
+
+        return tuple(ordered)
+
+
+DEFAULT_REGISTRY = TemplateRegistry()
+
+
+def register_resource_template(
+    name: str,
+    imports: Iterable[str],
+    snippet: str,
+    provides: Iterable[str] = (),
+    requires: Iterable[str] = ()
+) -> None:
+    """
+    リソースのコードテンプレートを登録（同名のリソースは上書き）
+    """
+    DEFAULT_REGISTRY.register_resource(ResourceTemplate(name, imports, snippet, provides, requires))
+
+
+def register_service_template(service: str, resource_names: Iterable[str]) -> None:
+    """
+    サービスが生成するリソースを登録（前提リソースは依存関係から自動的に補われる）
+    """
+    DEFAULT_REGISTRY.register_service(service, resource_names)
+
+
+BASE_IMPORTS = (
+    "import * as cdk from 'aws-cdk-lib';",
+    "import { Construct } from 'constructs';",
+)
+
+EC2_IMPORT = "import * as ec2 from 'aws-cdk-lib/aws-ec2';"
+
+STACK_TEMPLATE = CodeTemplate("""{imports_section}
+
+export interface {safe_name}StackProps extends cdk.StackProps {
+  readonly environment?: string;
+}
+
+export class {safe_name}Stack extends cdk.Stack {
+  constructor(scope: Construct, id: string, props?: {safe_name}StackProps) {
+    super(scope, id, props);
+
+    // Generated resources for {scenario_name}
+    {resources_section}
+
+    // Tags for all resources
+    cdk.Tags.of(this).add('Project', 'ChaosEngineering');
+    cdk.Tags.of(this).add('Scenario', '{scenario_name}');
+    cdk.Tags.of(this).add('Environment', props?.environment || 'test');
+  }
+}""")
+
+
+# VPC（EC2・RDS・ELB の共通の前提リソース）
+register_resource_template('Vpc', [EC2_IMPORT], """
     // VPC for {safe_name}
-    const vpc = new ec2.Vpc(this, '{safe_name}Vpc', {{
+    const vpc = new ec2.Vpc(this, '{safe_name}Vpc', {
       maxAzs: 2,
       subnetConfiguration: [
-        {{
+        {
           cidrMask: 24,
           name: 'public',
           subnetType: ec2.SubnetType.PUBLIC,
-        }},
-        {{
+        },
+        {
           cidrMask: 24,
           name: 'private',
           subnetType: ec2.SubnetType.PRIVATE_WITH_EGRESS,
-        }},
+        },
       ],
-    }});"""
-        self.resources.append(vpc_code)
-        
-        # Security Group
-        sg_code = f"""
+    });""", provides=['vpc'])
+
+# Security Group
+register_resource_template('SecurityGroup', [EC2_IMPORT], """
     // Security Group for {safe_name}
-    const securityGroup = new ec2.SecurityGroup(this, '{safe_name}SecurityGroup', {{
+    const securityGroup = new ec2.SecurityGroup(this, '{safe_name}SecurityGroup', {
       vpc,
       description: 'Security group for {safe_name} chaos engineering test',
       allowAllOutbound: true,
-    }});
-    
+    });
+
     securityGroup.addIngressRule(
       ec2.Peer.anyIpv4(),
       ec2.Port.tcp(22),
       'SSH access'
-    );"""
-        self.resources.append(sg_code)
-        
-        # EC2 Instance
-        instance_code = f"""
+    );""", provides=['securityGroup'], requires=['vpc'])
+
+# EC2 Instance
+register_resource_template('Instance', [EC2_IMPORT], """
     // EC2 Instance for {safe_name}
-    const instance = new ec2.Instance(this, '{safe_name}Instance', {{
+    const instance = new ec2.Instance(this, '{safe_name}Instance', {
       instanceType: ec2.InstanceType.of(ec2.InstanceClass.T3, ec2.InstanceSize.MICRO),
       machineImage: ec2.MachineImage.latestAmazonLinux(),
       vpc,
       securityGroup,
-      keyName: '{safe_name.lower()}-key',
-      vpcSubnets: {{
+      keyName: '{safe_name_lower}-key',
+      vpcSubnets: {
         subnetType: ec2.SubnetType.PUBLIC,
-      }},
-    }});"""
-        self.resources.append(instance_code)
-    
-    def _generate_rds_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """RDS リソースの生成"""
-        self.imports.add("import * as rds from 'aws-cdk-lib/aws-rds';")
-        
-        rds_code = f"""
+      },
+    });""", provides=['instance'], requires=['vpc', 'securityGroup'])
+
+# RDS Database
+register_resource_template('Database', ["import * as rds from 'aws-cdk-lib/aws-rds';", EC2_IMPORT], """
     // RDS Database for {safe_name}
-    const database = new rds.DatabaseInstance(this, '{safe_name}Database', {{
-      engine: rds.DatabaseInstanceEngine.mysql({{
+    const database = new rds.DatabaseInstance(this, '{safe_name}Database', {
+      engine: rds.DatabaseInstanceEngine.mysql({
         version: rds.MysqlEngineVersion.VER_8_0,
-      }}),
+      }),
       instanceType: ec2.InstanceType.of(ec2.InstanceClass.T3, ec2.InstanceSize.MICRO),
       vpc,
       credentials: rds.Credentials.fromGeneratedSecret('admin'),
@@ -134,152 +333,131 @@ class CDKCodeGenerator:
       deleteAutomatedBackups: true,
       deletionProtection: false,
       removalPolicy: cdk.RemovalPolicy.DESTROY,
-    }});"""
-        self.resources.append(rds_code)
-    
-    def _generate_s3_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """S3 リソースの生成"""
-        self.imports.add("import * as s3 from 'aws-cdk-lib/aws-s3';")
-        
-        s3_code = f"""
+    });""", provides=['database'], requires=['vpc'])
+
+# S3 Bucket
+register_resource_template('Bucket', ["import * as s3 from 'aws-cdk-lib/aws-s3';"], """
     // S3 Bucket for {safe_name}
-    const bucket = new s3.Bucket(this, '{safe_name}Bucket', {{
-      bucketName: `{safe_name.lower()}-chaos-test-${{cdk.Aws.ACCOUNT_ID}}-${{cdk.Aws.REGION}}`,
+    const bucket = new s3.Bucket(this, '{safe_name}Bucket', {
+      bucketName: `{safe_name_lower}-chaos-test-${cdk.Aws.ACCOUNT_ID}-${cdk.Aws.REGION}`,
       removalPolicy: cdk.RemovalPolicy.DESTROY,
       autoDeleteObjects: true,
       versioned: true,
       encryption: s3.BucketEncryption.S3_MANAGED,
-    }});"""
-        self.resources.append(s3_code)
-    
-    def _generate_lambda_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """Lambda リソースの生成"""
-        self.imports.add("import * as lambda from 'aws-cdk-lib/aws-lambda';")
-        
-        lambda_code = f"""
+    });""", provides=['bucket'])
+
+# Lambda Function
+register_resource_template('Function', ["import * as lambda from 'aws-cdk-lib/aws-lambda';"], """
     // Lambda Function for {safe_name}
-    const lambdaFunction = new lambda.Function(this, '{safe_name}Function', {{
+    const lambdaFunction = new lambda.Function(this, '{safe_name}Function', {
       runtime: lambda.Runtime.PYTHON_3_9,
       handler: 'index.lambda_handler',
       code: lambda.Code.fromInline(`
 def lambda_handler(event, context):
-    return {{
+    return {
         'statusCode': 200,
         'body': 'Hello from {safe_name} chaos test!'
-    }}
+    }
 `),
       timeout: cdk.Duration.seconds(30),
       memorySize: 128,
-    }});"""
-        self.resources.append(lambda_code)
-    
-    def _generate_elb_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """ELB リソースの生成"""
-        self.imports.add("import * as elbv2 from 'aws-cdk-lib/aws-elasticloadbalancingv2';")
-        
-        elb_code = f"""
+    });""", provides=['lambdaFunction'])
+
+# Application Load Balancer
+register_resource_template('LoadBalancer', ["import * as elbv2 from 'aws-cdk-lib/aws-elasticloadbalancingv2';"], """
     // Application Load Balancer for {safe_name}
-    const loadBalancer = new elbv2.ApplicationLoadBalancer(this, '{safe_name}LoadBalancer', {{
+    const loadBalancer = new elbv2.ApplicationLoadBalancer(this, '{safe_name}LoadBalancer', {
       vpc,
       internetFacing: true,
-      loadBalancerName: '{safe_name.lower()}-alb',
-    }});
-    
-    const listener = loadBalancer.addListener('{safe_name}Listener', {{
+      loadBalancerName: '{safe_name_lower}-alb',
+    });
+
+    const listener = loadBalancer.addListener('{safe_name}Listener', {
       port: 80,
       open: true,
-    }});"""
-        self.resources.append(elb_code)
-    
-    def _generate_vpc_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """VPC リソースの生成"""
-        # VPC は EC2 セクションで生成されるため、個別では生成しない
-        pass
-    
-    def _generate_cloudwatch_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """CloudWatch リソースの生成"""
-        self.imports.add("import * as cloudwatch from 'aws-cdk-lib/aws-cloudwatch';")
-        
-        cloudwatch_code = f"""
+    });""", provides=['loadBalancer', 'listener'], requires=['vpc'])
+
+# CloudWatch Dashboard
+register_resource_template('Dashboard', ["import * as cloudwatch from 'aws-cdk-lib/aws-cloudwatch';"], """
     // CloudWatch Dashboard for {safe_name}
-    const dashboard = new cloudwatch.Dashboard(this, '{safe_name}Dashboard', {{
-      dashboardName: '{safe_name.lower()}-chaos-dashboard',
-    }});"""
-        self.resources.append(cloudwatch_code)
-    
-    def _generate_sns_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """SNS リソースの生成"""
-        self.imports.add("import * as sns from 'aws-cdk-lib/aws-sns';")
-        
-        sns_code = f"""
+    const dashboard = new cloudwatch.Dashboard(this, '{safe_name}Dashboard', {
+      dashboardName: '{safe_name_lower}-chaos-dashboard',
+    });""", provides=['dashboard'])
+
+# SNS Topic
+register_resource_template('Topic', ["import * as sns from 'aws-cdk-lib/aws-sns';"], """
     // SNS Topic for {safe_name}
-    const topic = new sns.Topic(this, '{safe_name}Topic', {{
-      topicName: '{safe_name.lower()}-chaos-notifications',
+    const topic = new sns.Topic(this, '{safe_name}Topic', {
+      topicName: '{safe_name_lower}-chaos-notifications',
       displayName: '{safe_name} Chaos Engineering Notifications',
-    }});"""
-        self.resources.append(sns_code)
-    
-    def _generate_sqs_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """SQS リソースの生成"""
-        self.imports.add("import * as sqs from 'aws-cdk-lib/aws-sqs';")
-        
-        sqs_code = f"""
+    });""", provides=['topic'])
+
+# SQS Queue
+register_resource_template('Queue', ["import * as sqs from 'aws-cdk-lib/aws-sqs';"], """
     // SQS Queue for {safe_name}
-    const queue = new sqs.Queue(this, '{safe_name}Queue', {{
-      queueName: '{safe_name.lower()}-chaos-queue',
+    const queue = new sqs.Queue(this, '{safe_name}Queue', {
+      queueName: '{safe_name_lower}-chaos-queue',
       visibilityTimeout: cdk.Duration.seconds(300),
-    }});"""
-        self.resources.append(sqs_code)
-    
-    def _generate_dynamodb_resources(self, safe_name: str, scenario_json: Dict[str, Any]):
-        """DynamoDB リソースの生成"""
-        self.imports.add("import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';")
-        
-        dynamodb_code = f"""
+    });""", provides=['queue'])
+
+# DynamoDB Table
+register_resource_template('Table', ["import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';"], """
     // DynamoDB Table for {safe_name}
-    const table = new dynamodb.Table(this, '{safe_name}Table', {{
-      tableName: '{safe_name.lower()}-chaos-table',
-      partitionKey: {{
+    const table = new dynamodb.Table(this, '{safe_name}Table', {
+      tableName: '{safe_name_lower}-chaos-table',
+      partitionKey: {
         name: 'id',
         type: dynamodb.AttributeType.STRING,
-      }},
+      },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
       removalPolicy: cdk.RemovalPolicy.DESTROY,
-    }});"""
-        self.resources.append(dynamodb_code)
-    
-    def _assemble_cdk_code(self, scenario_json: Dict[str, Any]) -> str:
+    });""", provides=['table'])
+
+
+# サービスごとに生成するリソース
+register_service_template('EC2', ['Instance'])
+register_service_template('VPC', ['Vpc'])
+register_service_template('RDS', ['Database'])
+register_service_template('S3', ['Bucket'])
+register_service_template('Lambda', ['Function'])
+register_service_template('ELB', ['LoadBalancer'])
+register_service_template('CloudWatch', ['Dashboard'])
+register_service_template('SNS', ['Topic'])
+register_service_template('SQS', ['Queue'])
+register_service_template('DynamoDB', ['Table'])
+
+
+class CDKCodeGenerator:
+    """
+    シナリオ分析結果をもとに TypeScript の CDK Construct ソースコードを生成
+
+    サービスごとのリソースは TemplateRegistry に登録されたテンプレートから生成し、
+    VPC などの前提リソースを 1 回だけ補ったうえで依存関係の順に出力する。
+    新しいサービスは register_resource_template / register_service_template で登録する。
+    """
+
+    def __init__(self, registry: TemplateRegistry = DEFAULT_REGISTRY):
+        self.registry = registry
+        self.imports_section = ''
+
+    def generate_cdk_code(self, aws_services: List[str], scenario_json: Dict[str, Any]) -> str:
+        """
+        CDK コードを生成
         """
-        CDK コードの組み立て
+        names = self._template_names(scenario_json)
+
+        # 依存関係を解決した生成プラン（登録されていないサービスは無視）
+        imports_section, _, code = self.registry.plan(aws_services)
+        self.imports_section = imports_section
+
+        # CDK スタックコードの組み立て
+        return code.render(*names)
+
+    @staticmethod
+    def _template_names(scenario_json: Dict[str, Any]) -> Tuple[str, str, str]:
+        """
+        シナリオごとに埋める名前のスロット（TEMPLATE_SLOTS の順）
         """
         scenario_name = scenario_json.get('scenario_name', 'ChaosTest')
         safe_name = scenario_name.replace(' ', '').replace('-', '')
-        
-        # インポート部分
-        imports_section = '\n'.join(sorted(self.imports))
-        
-        # リソース部分
-        resources_section = '\n'.join(self.resources)
-        
-        # 完全なスタックコード
-        cdk_code = f"""{imports_section}
-
-export interface {safe_name}StackProps extends cdk.StackProps {{
-  readonly environment?: string;
-}}
-
-export class {safe_name}Stack extends cdk.Stack {{
-  constructor(scope: Construct, id: string, props?: {safe_name}StackProps) {{
-    super(scope, id, props);
-    
-    // Generated resources for {scenario_name}
-    {resources_section}
-    
-    // Tags for all resources
-    cdk.Tags.of(this).add('Project', 'ChaosEngineering');
-    cdk.Tags.of(this).add('Scenario', '{scenario_name}');
-    cdk.Tags.of(this).add('Environment', props?.environment || 'test');
-  }}
-}}"""
-        
-        return cdk_code 
\ No newline at end of file
+        return safe_name, safe_name.lower(), scenario_name
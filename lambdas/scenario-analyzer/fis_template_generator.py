@@ -4,6 +4,13 @@ import logging
 
 logger = logging.getLogger()
 
+
+def to_canonical_json(template: Dict[str, Any]) -> str:
+    """
+    FIS テンプレートを正規化した JSON 文字列に変換（キー順を固定し、同じ内容なら同じバイト列になる）
+    """
+    return json.dumps(template, indent=2, sort_keys=True)
+
 class FISTemplateGenerator:
     """
     シナリオ分析結果をもとに FIS 実験テンプレート JSON を生成
@@ -25,8 +32,8 @@ class FISTemplateGenerator:
         scenario_name = scenario_json.get('scenario_name', 'ChaosTest')
         description = scenario_json.get('purpose', 'Chaos Engineering Test')
         
-        # AWS サービスごとのアクション生成
-        for service in aws_services:
+        # AWS サービスごとのアクション生成（入力順に依存しないようソート）
+        for service in sorted(aws_services):
             self._generate_service_actions(service, scenario_json)
         
         # ストップ条件の設定
@@ -1,16 +1,25 @@
 import json
+import hashlib
 import boto3
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from botocore.exceptions import ClientError
 from cdk_codegen import CDKCodeGenerator
-from fis_template_generator import FISTemplateGenerator
-import re
-from typing import Dict, List, Any
+from fis_template_generator import FISTemplateGenerator, to_canonical_json
+from service_matcher import service_matcher
+from typing import Dict, List, Any, Optional
 
 # ロギングの設定
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# 生成物の保存先プレフィックス（generated/{scenario_id}/ 配下にシナリオごとに保存）
+GENERATED_PREFIX = 'generated'
+
+# AWS クライアントの初期化（アップロードスレッド間で共有）
+s3_client = boto3.client('s3')
+
 def lambda_handler(event, context):
     """
     Step 1 で生成されたシナリオ JSON を分析し、必要な AWS サービスを抽出
@@ -36,26 +45,39 @@ def lambda_handler(event, context):
         fis_generator = FISTemplateGenerator()
         fis_template = fis_generator.generate_fis_template(aws_services, scenario_json)
         
-        # S3 への保存
-        s3_client = boto3.client('s3')
+        # S3 への保存（シナリオ ID と内容ハッシュを含むキーに保存）
         bucket_name = event.get('bucket_name')
+        scenario_id = event.get('scenario_id') or compute_scenario_id(scenario_json)
+        fis_body = to_canonical_json(fis_template)
         
-        # CDK コードの保存
-        cdk_key = 'generated/cdk/chaos-stack.ts'
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=cdk_key,
-            Body=cdk_code,
-            ContentType='text/typescript'
-        )
+        cdk_hash = compute_content_hash(cdk_code)
+        fis_hash = compute_content_hash(fis_body)
+        cdk_key = f'{GENERATED_PREFIX}/{scenario_id}/cdk/{cdk_hash[:16]}/chaos-stack.ts'
+        fis_key = f'{GENERATED_PREFIX}/{scenario_id}/fis/{fis_hash[:16]}/experiment-template.json'
+        manifest_key = f'{GENERATED_PREFIX}/{scenario_id}/manifest.json'
         
-        # FIS テンプレートの保存
-        fis_key = 'generated/fis/experiment-template.json'
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=fis_key,
-            Body=json.dumps(fis_template, indent=2),
-            ContentType='application/json'
+        # CDK コードと FIS テンプレートを並列にアップロード（内容が同じ場合は省略）
+        cdk_uploaded, fis_uploaded = upload_objects_parallel(bucket_name, [
+            (cdk_key, cdk_code, 'text/typescript', cdk_hash),
+            (fis_key, fis_body, 'application/json', fis_hash),
+        ])
+        
+        # マニフェストは参照先のアップロード完了後に保存する
+        manifest = {
+            'scenario_id': scenario_id,
+            'scenario_name': scenario_json.get('scenario_name', 'Unknown'),
+            'aws_services': aws_services,
+            'artifacts': {
+                'cdk_code': {'key': cdk_key, 'sha256': cdk_hash},
+                'fis_template': {'key': fis_key, 'sha256': fis_hash}
+            }
+        }
+        # 生成日時を除いた内容でハッシュを取り、内容が同じなら再アップロードしない
+        manifest_hash = compute_content_hash(json.dumps(manifest, sort_keys=True, ensure_ascii=False))
+        manifest['generated_at'] = datetime.now(timezone.utc).isoformat()
+        put_object_if_changed(
+            s3_client, bucket_name, manifest_key,
+            json.dumps(manifest, indent=2, ensure_ascii=False), 'application/json', manifest_hash
         )
         
         logger.info("CDK コードと FIS テンプレートの生成が完了しました")
@@ -64,9 +86,17 @@ def lambda_handler(event, context):
             'statusCode': 200,
             'body': json.dumps({
                 'message': 'シナリオ分析が完了しました',
+                'scenario_id': scenario_id,
                 'aws_services': aws_services,
                 'cdk_code_key': cdk_key,
                 'fis_template_key': fis_key,
+                'manifest_key': manifest_key,
+                'cdk_code_hash': cdk_hash,
+                'fis_template_hash': fis_hash,
+                'uploaded': {
+                    'cdk_code': cdk_uploaded,
+                    'fis_template': fis_uploaded
+                },
                 'scenario_name': scenario_json.get('scenario_name', 'Unknown')
             }, ensure_ascii=False)
         }
@@ -82,41 +112,85 @@ def lambda_handler(event, context):
         }
 
 
-def extract_aws_services(scenario_json: Dict[str, Any]) -> List[str]:
+def compute_content_hash(body: str) -> str:
     """
-    シナリオ JSON から AWS サービスを抽出
+    生成物の内容ハッシュ（SHA-256）を計算
     """
-    aws_services = set()
-    
-    # 明示的に指定されたサービスの抽出
-    if 'target_services' in scenario_json:
-        for service in scenario_json['target_services']:
-            aws_services.add(service.upper())
-    
-    # テキストからサービス名を抽出
-    text_content = json.dumps(scenario_json, ensure_ascii=False)
-    
-    # AWS サービス名のパターン
-    service_patterns = {
-        'EC2': r'(?i)\b(ec2|elastic\s+compute|virtual\s+machine|instance)\b',
-        'RDS': r'(?i)\b(rds|database|mysql|postgresql|aurora)\b',
-        'S3': r'(?i)\b(s3|simple\s+storage|bucket|object\s+storage)\b',
-        'Lambda': r'(?i)\b(lambda|serverless|function)\b',
-        'ELB': r'(?i)\b(elb|elastic\s+load\s+balancer|load\s+balancer)\b',
-        'VPC': r'(?i)\b(vpc|virtual\s+private\s+cloud|network)\b',
-        'IAM': r'(?i)\b(iam|identity|access\s+management|role|policy)\b',
-        'CloudWatch': r'(?i)\b(cloudwatch|monitoring|metrics|logs)\b',
-        'SNS': r'(?i)\b(sns|simple\s+notification|notification)\b',
-        'SQS': r'(?i)\b(sqs|simple\s+queue|queue)\b',
-        'DynamoDB': r'(?i)\b(dynamodb|nosql|document\s+database)\b',
-        'ECS': r'(?i)\b(ecs|elastic\s+container|container)\b',
-        'EKS': r'(?i)\b(eks|kubernetes|k8s)\b',
-        'API Gateway': r'(?i)\b(api\s+gateway|api)\b',
-        'Step Functions': r'(?i)\b(step\s+functions|state\s+machine|workflow)\b'
-    }
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+def compute_scenario_id(scenario_json: Dict[str, Any]) -> str:
+    """
+    シナリオ JSON の内容からシナリオ ID を計算（同じシナリオは同じ ID になる）
+    """
+    canonical = json.dumps(scenario_json, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return compute_content_hash(canonical)[:16]
+
+
+def put_object_if_changed(
+    s3_client,
+    bucket_name: str,
+    key: str,
+    body: str,
+    content_type: str,
+    content_hash: Optional[str] = None
+) -> tuple:
+    """
+    S3 に保存済みのオブジェクトと内容ハッシュが異なる場合のみアップロード
+
+    ハッシュはオブジェクトメタデータ content-sha256 として保存する
+
+    Returns:
+        (内容ハッシュ, アップロードしたかどうか)
+    """
+    content_hash = content_hash or compute_content_hash(body)
     
-    for service, pattern in service_patterns.items():
-        if re.search(pattern, text_content):
-            aws_services.add(service)
+    try:
+        head = s3_client.head_object(Bucket=bucket_name, Key=key)
+        if head.get('Metadata', {}).get('content-sha256') == content_hash:
+            logger.info(f"内容に変更がないためアップロードを省略: {key}")
+            return content_hash, False
+    except ClientError as e:
+        if e.response['Error']['Code'] not in ('404', 'NoSuchKey', 'NotFound'):
+            raise
     
-    return list(aws_services) 
\ No newline at end of file
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=key,
+        Body=body,
+        ContentType=content_type,
+        Metadata={'content-sha256': content_hash}
+    )
+    return content_hash, True
+
+
+def upload_objects_parallel(bucket_name: str, objects: List[tuple]) -> List[bool]:
+    """
+    複数のオブジェクトをスレッドプールで並列にアップロード
+
+    Args:
+        objects: (キー, 本文, Content-Type, 内容ハッシュ) のリスト
+
+    Returns:
+        各オブジェクトをアップロードしたかどうか（objects と同じ順）
+    """
+    with ThreadPoolExecutor(max_workers=max(1, len(objects))) as executor:
+        futures = [
+            executor.submit(put_object_if_changed, s3_client, bucket_name, key, body, content_type, content_hash)
+            for key, body, content_type, content_hash in objects
+        ]
+        return [future.result()[1] for future in futures]
+
+
+def extract_aws_services(scenario_json: Dict[str, Any]) -> List[str]:
+    """
+    シナリオ JSON から AWS サービスを抽出
+    """
+    return service_matcher.match(scenario_json)
+
+
+def extract_aws_services_batch(scenarios: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    複数のシナリオ JSON から AWS サービスをまとめて抽出
+    """
+    return service_matcher.match_batch(scenarios)
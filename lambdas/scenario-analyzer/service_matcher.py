@@ -0,0 +1,130 @@
+import re
+from json.encoder import encode_basestring
+from typing import Dict, List, Any, Iterable, Tuple, Optional, Pattern
+
+# AWS サービス名のキーワード（複数語のキーワードは空白区切りで照合）
+SERVICE_KEYWORDS = {
+    'EC2': ['ec2', 'elastic compute', 'virtual machine', 'instance'],
+    'RDS': ['rds', 'database', 'mysql', 'postgresql', 'aurora'],
+    'S3': ['s3', 'simple storage', 'bucket', 'object storage'],
+    'Lambda': ['lambda', 'serverless', 'function'],
+    'ELB': ['elb', 'elastic load balancer', 'load balancer'],
+    'VPC': ['vpc', 'virtual private cloud', 'network'],
+    'IAM': ['iam', 'identity', 'access management', 'role', 'policy'],
+    'CloudWatch': ['cloudwatch', 'monitoring', 'metrics', 'logs'],
+    'SNS': ['sns', 'simple notification', 'notification'],
+    'SQS': ['sqs', 'simple queue', 'queue'],
+    'DynamoDB': ['dynamodb', 'nosql', 'document database'],
+    'ECS': ['ecs', 'elastic container', 'container'],
+    'EKS': ['eks', 'kubernetes', 'k8s'],
+    'API Gateway': ['api gateway', 'api'],
+    'Step Functions': ['step functions', 'state machine', 'workflow'],
+}
+
+# JSON 文字列化でエスケープされる制御文字
+_CONTROL_CHARS = re.compile(r'[\x00-\x1f]')
+
+
+class ServiceMatcher:
+    """
+    シナリオ JSON の文字列リーフを 1 パスで走査し、AWS サービスを検出する
+
+    キーワードの先頭語だけを 1 本の正規表現で走査し、先頭語が見つかった位置で
+    のみ残りの語を照合する。先頭語単位で読み進めるため、"document database"
+    の DynamoDB と RDS のように重なり合うキーワードも両方検出される。
+    """
+
+    def __init__(self, service_keywords: Dict[str, List[str]] = SERVICE_KEYWORDS):
+        # 先頭語ごとに (単語だけで成立するサービス, [(残りの語のパターン, サービス)])
+        heads: Dict[str, Tuple[List[str], List[Tuple[str, str]]]] = {}
+        for service, keywords in service_keywords.items():
+            for keyword in keywords:
+                head, *tail = keyword.lower().split()
+                single, multi = heads.setdefault(head, ([], []))
+                if tail:
+                    multi.append((r'\s+'.join(re.escape(word) for word in tail), service))
+                else:
+                    single.append(service)
+
+        self._entries: Dict[str, Tuple[List[str], Optional[Pattern], List[str]]] = {}
+        alternatives = []
+        for index, (head, (single, multi)) in enumerate(heads.items()):
+            group_name = f'w{index}'
+            alternatives.append(f'(?P<{group_name}>{re.escape(head)})')
+            tail_pattern = None
+            if multi:
+                tail_pattern = re.compile(
+                    r'\s+(?:' + '|'.join(f'(?P<t{i}>{pattern})' for i, (pattern, _) in enumerate(multi)) + r')\b',
+                    re.IGNORECASE
+                )
+            self._entries[group_name] = (single, tail_pattern, [service for _, service in multi])
+
+        self._head_pattern = re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', re.IGNORECASE)
+        self._service_count = len(service_keywords)
+
+    def match(self, scenario_json: Dict[str, Any]) -> List[str]:
+        """
+        シナリオ JSON から AWS サービスを抽出
+        """
+        aws_services = set()
+
+        # 明示的に指定されたサービスの抽出
+        if 'target_services' in scenario_json:
+            for service in scenario_json['target_services']:
+                aws_services.add(service.upper())
+
+        # テキストからサービス名を抽出
+        aws_services.update(self._match_text(self._iter_string_leaves(scenario_json)))
+
+        # 出力の順序を安定させるため、ソートして返す
+        return sorted(aws_services)
+
+    def match_batch(self, scenarios: Iterable[Dict[str, Any]]) -> List[List[str]]:
+        """
+        複数のシナリオ JSON から AWS サービスをまとめて抽出
+        """
+        return [self.match(scenario_json) for scenario_json in scenarios]
+
+    def _match_text(self, texts: Iterable[str]) -> set:
+        """
+        文字列群に含まれるサービスを検出（全サービス検出時点で打ち切り）
+        """
+        found = set()
+        for text in texts:
+            for match in self._head_pattern.finditer(text):
+                single, tail_pattern, tail_services = self._entries[match.lastgroup]
+                found.update(single)
+                if tail_pattern is not None:
+                    tail_match = tail_pattern.match(text, match.end())
+                    if tail_match:
+                        found.add(tail_services[int(tail_match.lastgroup[1:])])
+                if len(found) == self._service_count:
+                    return found
+        return found
+
+    @staticmethod
+    def _iter_string_leaves(value: Any) -> Iterable[str]:
+        """
+        JSON 値に含まれるキーと文字列値を順に返す
+
+        以前の json.dumps ベースの照合と結果を一致させるため、制御文字を含む
+        文字列は JSON と同じ形式にエスケープしてから返す
+        """
+        stack = [value]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, str):
+                if _CONTROL_CHARS.search(current):
+                    current = encode_basestring(current)
+                yield current
+            elif isinstance(current, dict):
+                for key, item in current.items():
+                    if isinstance(key, str):
+                        stack.append(key)
+                    stack.append(item)
+            elif isinstance(current, (list, tuple)):
+                stack.extend(current)
+
+
+# モジュール読み込み時に一度だけコンパイルし、ウォームスタート間で再利用する
+service_matcher = ServiceMatcher()
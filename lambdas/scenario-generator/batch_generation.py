@@ -0,0 +1,177 @@
+import json
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Callable, Optional
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+# スロットリングとして扱う Bedrock のエラーコード
+THROTTLING_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+}
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    スロットリングに応じて同時実行数を増減させるリミッター（AIMD）
+
+    スロットリング発生時は上限を半減し、成功が続くと 1 ずつ元の上限まで戻す
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    スロットリング系のエラーかどうかを判定
+    """
+    return isinstance(error, ClientError) and error.response['Error']['Code'] in THROTTLING_ERROR_CODES
+
+
+def run_batch_generation(
+    items: List[Dict[str, Any]],
+    generate: Callable[[Dict[str, Any]], Dict[str, Any]],
+    on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]] = None,
+    max_concurrency: int = 4,
+    max_attempts: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 20.0,
+    deadline: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    バッチ生成を有界の並列度で実行
+
+    Args:
+        items: 生成単位（index, prompt などを含む辞書）のリスト
+        generate: 1 件を生成する関数（Bedrock 呼び出し）
+        on_result: 1 件の生成完了ごとに呼び出す関数（S3 保存など）。戻り値は結果に追加される
+        max_concurrency: 最大同時実行数
+        max_attempts: スロットリング時の最大試行回数
+        base_delay: バックオフの初期待機秒数
+        max_delay: バックオフの最大待機秒数
+        deadline: 新たに Bedrock 呼び出しを開始してよい期限（エポック秒）。
+            期限までに開始できなかったアイテムは NOT_STARTED として返す
+
+    Returns:
+        各アイテムの結果とスループットなどの集計
+    """
+    limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+
+    def run_item(item: Dict[str, Any]) -> Dict[str, Any]:
+        started_at = time.time()
+        attempts = 0
+        throttled_count = 0
+        while True:
+            limiter.acquire()
+            if deadline is not None and time.time() >= deadline:
+                limiter.release()
+                return {
+                    'index': item['index'],
+                    'status': 'NOT_STARTED' if attempts == 0 else 'FAILED',
+                    'error': 'Lambda の実行時間内に生成を開始できませんでした',
+                    'attempts': attempts,
+                    'throttled': throttled_count,
+                    'latency_ms': round((time.time() - started_at) * 1000, 1)
+                }
+            attempts += 1
+            try:
+                output = generate(item)
+            except Exception as e:
+                throttled = is_throttling_error(e)
+                limiter.release(throttled=throttled)
+                if not throttled or attempts >= max_attempts:
+                    return {
+                        'index': item['index'],
+                        'status': 'FAILED',
+                        'error': str(e),
+                        'attempts': attempts,
+                        'throttled': throttled_count,
+                        'latency_ms': round((time.time() - started_at) * 1000, 1)
+                    }
+                throttled_count += 1
+                # フルジッター付き指数バックオフ
+                delay = min(max_delay, base_delay * (2 ** (attempts - 1)))
+                if deadline is not None:
+                    delay = max(0.0, min(delay, deadline - time.time()))
+                time.sleep(random.uniform(0, delay))
+                continue
+            limiter.release()
+            break
+
+        result = {
+            'index': item['index'],
+            'status': 'SUCCEEDED',
+            'attempts': attempts,
+            'throttled': throttled_count,
+            'latency_ms': round((time.time() - started_at) * 1000, 1)
+        }
+        if on_result:
+            try:
+                result.update(on_result(item, output) or {})
+            except Exception as e:
+                result['status'] = 'FAILED'
+                result['error'] = str(e)
+        return result
+
+    batch_started_at = time.time()
+    results = []
+    # 実際の同時実行数はリミッターで制御する
+    with ThreadPoolExecutor(max_workers=limiter.max_concurrency) as executor:
+        futures = [executor.submit(run_item, item) for item in items]
+        for future in as_completed(futures):
+            result = future.result()
+            logger.info(json.dumps({'batch_item': result}, ensure_ascii=False))
+            results.append(result)
+
+    elapsed = time.time() - batch_started_at
+    results.sort(key=lambda r: r['index'])
+    succeeded = [r for r in results if r['status'] == 'SUCCEEDED']
+    not_started = [r for r in results if r['status'] == 'NOT_STARTED']
+    latencies = sorted(r['latency_ms'] for r in succeeded)
+
+    return {
+        'results': results,
+        'summary': {
+            'total': len(results),
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded) - len(not_started),
+            'not_started': len(not_started),
+            'elapsed_seconds': round(elapsed, 3),
+            'throughput_per_second': round(len(succeeded) / elapsed, 3) if elapsed > 0 else None,
+            'latency_ms_p50': latencies[len(latencies) // 2] if latencies else None,
+            'latency_ms_max': latencies[-1] if latencies else None,
+            'throttled': sum(r['throttled'] for r in results),
+            'final_concurrency_limit': limiter.limit
+        }
+    }
@@ -0,0 +1,202 @@
+import json
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+
+def compute_cache_key(model_id: str, request_body: Dict[str, Any]) -> str:
+    """
+    モデル ID とリクエストボディ全体から内容アドレス型のキャッシュキーを計算
+    """
+    canonical = json.dumps(
+        {'model_id': model_id, 'body': request_body},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class MemoryCacheBackend:
+    """
+    ウォームな Lambda コンテナ内で共有されるインメモリ LRU キャッシュ
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, ttl: Optional[float]) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if ttl is not None and time.time() - created_at > ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class LocalDiskCacheBackend:
+    """
+    ローカルディスク（/tmp など）に保存するキャッシュ
+    """
+
+    name = 'disk'
+
+    def __init__(self, directory: str = '/tmp/generation-cache', max_entries: int = 512):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.txt')
+
+    def get(self, key: str, ttl: Optional[float]) -> Optional[str]:
+        path = self._path(key)
+        try:
+            if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        # 書き込み途中のファイルを読まれないよう、一時ファイル経由で置き換える
+        tmp_path = f'{self._path(key)}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith('.txt')
+        ]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class S3CacheBackend:
+    """
+    S3 に保存するキャッシュ（コンテナ間で共有される）
+
+    エントリ数による追い出しは行わないため、必要に応じてバケットの
+    ライフサイクルルールで prefix 配下を削除する
+    """
+
+    name = 's3'
+
+    def __init__(self, s3_client, bucket_name: str, prefix: str = 'generation-cache/'):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f'{self.prefix}{key}.txt'
+
+    def get(self, key: str, ttl: Optional[float]) -> Optional[str]:
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self._key(key))
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return None
+            raise
+        created_at = float(response.get('Metadata', {}).get('created-at', 0))
+        if ttl is not None and time.time() - created_at > ttl:
+            return None
+        return response['Body'].read().decode('utf-8')
+
+    def put(self, key: str, value: str) -> None:
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=self._key(key),
+            Body=value.encode('utf-8'),
+            ContentType='text/plain; charset=utf-8',
+            Metadata={'created-at': str(time.time())}
+        )
+
+
+class GenerationCache:
+    """
+    Bedrock の生成結果をリクエスト内容のハッシュで引くキャッシュ層
+
+    ウォームなコンテナ内で呼び出し間に共有される。現在の呼び出し元（lambda_handler）は
+    1 スレッドのみだが、複数スレッドから使われても集計が崩れないようヒット数・ミス数はロックで保護する
+    """
+
+    def __init__(self, backend, ttl: Optional[float] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self._hits = 0
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def hits(self) -> int:
+        with self._stats_lock:
+            return self._hits
+
+    @property
+    def misses(self) -> int:
+        with self._stats_lock:
+            return self._misses
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self.backend.get(key, self.ttl)
+        except Exception as e:
+            # キャッシュ障害で生成自体を失敗させない
+            logger.warning(f"キャッシュの読み取りに失敗しました: {e}")
+            value = None
+        with self._stats_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        try:
+            self.backend.put(key, value)
+        except Exception as e:
+            logger.warning(f"キャッシュの書き込みに失敗しました: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+        return {
+            'backend': self.backend.name,
+            'ttl': self.ttl,
+            'hits': hits,
+            'misses': misses
+        }
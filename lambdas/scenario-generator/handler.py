@@ -1,93 +1,156 @@
+import time
+
+# モジュール初期化の開始時刻（boto3 とローカルモジュールのインポートを module_init_ms に含める）
+_module_init_started_at = time.time()
+
 import json
+import os
+import uuid
 import boto3
 import logging
+from collections import OrderedDict
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from typing import Dict, List, Any, Optional
+from generation_cache import (
+    GenerationCache,
+    MemoryCacheBackend,
+    LocalDiskCacheBackend,
+    S3CacheBackend,
+    compute_cache_key,
+)
+from scenario_stream import generate_scenario_stream
+from batch_generation import run_batch_generation
 
 # ロギングの設定
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# AWS クライアントの初期化（ウォームスタート間で接続プールを再利用）
+s3_client = boto3.client('s3', config=Config(
+    connect_timeout=5,
+    read_timeout=10,
+    max_pool_connections=20,
+    retries={'max_attempts': 3, 'mode': 'standard'}
+))
+# Bedrock の接続・応答待ちの上限（生成完了まで応答が返らないため長めに設定）
+BEDROCK_CONNECT_TIMEOUT = 5
+BEDROCK_READ_TIMEOUT = 120
+BEDROCK_MAX_POOL_CONNECTIONS = 20
+
+# バッチ生成の件数の上限
+MAX_BATCH_ITEMS = 50
+
+# 最後に開始した生成が完了するまでに確保する秒数。バッチ用クライアントは SDK 内で再試行しないため、
+# Bedrock 呼び出し 1 回の最大時間と、S3 への保存の最大時間（s3_client の 3 回 × (5 + 10) 秒）の合計
+BATCH_SAVE_RESERVED_SECONDS = 45
+BATCH_RESERVED_SECONDS = BEDROCK_CONNECT_TIMEOUT + BEDROCK_READ_TIMEOUT + BATCH_SAVE_RESERVED_SECONDS + 10
+
+bedrock_client = boto3.client('bedrock-runtime', config=Config(
+    connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+    read_timeout=BEDROCK_READ_TIMEOUT,
+    max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+    retries={'max_attempts': 4, 'mode': 'adaptive'}
+))
+# バッチ生成用（スロットリング時の再試行は run_batch_generation が期限内でのみ行うため、SDK では再試行しない）
+batch_bedrock_client = boto3.client('bedrock-runtime', config=Config(
+    connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+    read_timeout=BEDROCK_READ_TIMEOUT,
+    max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+    retries={'total_max_attempts': 1, 'mode': 'standard'}
+))
+
+# 生成キャッシュ（ウォームスタート間で再利用するためモジュールスコープで保持）
+# キーにイベントで指定できる設定を含むため、保持するインスタンス数を制限し古いものから破棄する
+MAX_GENERATION_CACHES = 8
+_generation_caches: 'OrderedDict[tuple, GenerationCache]' = OrderedDict()
+
+# テンプレートキャッシュ: (bucket, key) -> (ETag, テンプレート)
+_template_cache: Dict[tuple, tuple] = {}
+
+_module_init_ms = round((time.time() - _module_init_started_at) * 1000, 1)
+_cold_start = True
+
 def lambda_handler(event, context):
     """
     BedrockでAIを使用してカオスエンジニアリングシナリオを生成する
     """
+    started_at = time.time()
+    cold_start = consume_cold_start()
+    # 失敗した呼び出しも含めて finally で出力するメトリクス
+    metrics = {'succeeded': False}
     try:
         # S3からテンプレートを読み取り
-        s3_client = boto3.client('s3')
         bucket_name = event.get('bucket_name')
         template_key = event.get('template_key', 'templates/scenario-template.json')
         
         logger.info(f"S3からテンプレートを読み取り中: s3://{bucket_name}/{template_key}")
         
-        response = s3_client.get_object(Bucket=bucket_name, Key=template_key)
-        template_content = json.loads(response['Body'].read().decode('utf-8'))
-        
-        # Bedrock クライアントを初期化
-        bedrock_client = boto3.client('bedrock-runtime')
+        template_content, metrics['template_cache_hit'] = load_template(bucket_name, template_key)
+        metrics['template_ms'] = round((time.time() - started_at) * 1000, 1)
         
         # プロンプトの準備
         prompt = template_content['template']['prompt']
         model_id = template_content['template']['model_id']
-        max_tokens = template_content['template']['max_tokens']
-        temperature = template_content['template']['temperature']
         
         # Bedrock API を呼び出し
         logger.info(f"Bedrock API を呼び出し中: {model_id}")
         
-        # Claude 3 Haiku のリクエスト形式
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
+        request_body = build_request_body(template_content['template'], prompt)
         
-        response = bedrock_client.invoke_model(
-            modelId=model_id,
-            body=json.dumps(request_body),
-            contentType='application/json'
-        )
+        # 生成キャッシュの確認（オプトイン）
+        generation_cache = get_generation_cache(event, s3_client, bucket_name)
+        cache_key = compute_cache_key(model_id, request_body)
+        generated_text = None
+        cache_hit = False
+        
+        if generation_cache and not event.get('force_regenerate', False):
+            generated_text = generation_cache.get(cache_key)
+            cache_hit = generated_text is not None
+        metrics['generation_cache_hit'] = cache_hit
+        
+        stream_result = None
+        if cache_hit:
+            logger.info(f"生成キャッシュにヒットしました: {cache_key}")
+        elif event.get('stream', False):
+            # ストリーミング生成（フィールド単位で逐次解析）
+            stream_result = generate_scenario_stream(
+                bedrock_client,
+                model_id,
+                request_body,
+                on_field=lambda key, value: logger.info(f"シナリオフィールドを受信: {key}")
+            )
+            generated_text = stream_result['generated_text']
+        else:
+            generated_text = invoke_bedrock(bedrock_client, model_id, request_body)
         
-        # レスポンスを解析
-        response_body = json.loads(response['body'].read().decode('utf-8'))
-        generated_text = response_body['content'][0]['text']
+        if generation_cache and not cache_hit:
+            generation_cache.put(cache_key, generated_text)
         
         logger.info("シナリオの生成が完了しました")
         
         # JSON形式のシナリオを抽出
-        try:
-            # 生成されたテキストからJSON部分を抽出
-            start_idx = generated_text.find('{')
-            end_idx = generated_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = generated_text[start_idx:end_idx]
-                scenario = json.loads(json_str)
-            else:
-                raise ValueError("生成されたテキストにJSONが見つかりません")
-                
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"JSONの解析に失敗しました: {e}")
-            # フォールバック：生成されたテキストをそのまま返す
-            scenario = {
-                "scenario_name": "生成されたシナリオ",
-                "purpose": "Bedrock による自動生成",
-                "target_services": ["AWS"],
-                "execution_steps": [generated_text],
-                "expected_results": ["システムの障害耐性の確認"],
-                "recovery_steps": ["システムの復旧"]
-            }
+        if stream_result and stream_result['scenario'] is not None:
+            scenario = stream_result['scenario']
+        else:
+            scenario = extract_scenario(generated_text)
         
+        metrics['succeeded'] = True
         return {
             'statusCode': 200,
             'body': json.dumps({
                 'scenario': scenario,
-                'generated_text': generated_text
+                'generated_text': generated_text,
+                'metadata': {
+                    'cache_key': cache_key,
+                    'cache_hit': cache_hit,
+                    'cache': generation_cache.stats() if generation_cache else None,
+                    'stream': {
+                        'first_token_ms': stream_result['first_token_ms'],
+                        'field_timings': stream_result['field_timings'],
+                        'total_ms': stream_result['total_ms']
+                    } if stream_result else None
+                }
             }, ensure_ascii=False)
         }
         
@@ -109,4 +172,272 @@ def lambda_handler(event, context):
                 'error': '予期しないエラーが発生しました',
                 'details': str(e)
             }, ensure_ascii=False)
-        } 
\ No newline at end of file
+        }
+    
+    finally:
+        log_invocation_metrics('lambda_handler', cold_start, started_at, **metrics)
+
+
+def batch_handler(event, context):
+    """
+    複数のプロンプトバリエーションからシナリオをまとめて生成し、完了した順に S3 に保存する
+
+    event:
+        bucket_name, template_key: テンプレートの場所（省略時は環境変数 BUCKET_NAME / TEMPLATE_KEY）
+        variants: プロンプト末尾に追加するバリエーションのリスト（省略時は count 件のシード）
+        count: variants 省略時の生成件数
+        max_concurrency: Bedrock 呼び出しの最大同時実行数（接続プールの大きさが上限）
+        output_prefix: 生成結果の保存先プレフィックス
+
+    Lambda の残り時間内に開始できなかったバリエーションは NOT_STARTED として返すため、
+    呼び出し元はその variants を再度送信して続きを生成できる
+    """
+    started_at = time.time()
+    cold_start = consume_cold_start()
+    # 失敗した呼び出しも含めて finally で出力するメトリクス
+    metrics = {'succeeded': False}
+    try:
+        bucket_name = event.get('bucket_name') or os.environ.get('BUCKET_NAME')
+        template_key = event.get('template_key') or os.environ.get('TEMPLATE_KEY', 'templates/scenario-template.json')
+        output_prefix = event.get('output_prefix', 'scenarios/')
+        batch_id = event.get('batch_id') or uuid.uuid4().hex[:12]
+        
+        template_content, metrics['template_cache_hit'] = load_template(bucket_name, template_key)
+        template = template_content['template']
+        model_id = template['model_id']
+        
+        variants = event.get('variants') or build_seed_variants(int(event.get('count', 10)))
+        if len(variants) > MAX_BATCH_ITEMS:
+            raise ValueError(f"バッチ生成の件数は {MAX_BATCH_ITEMS} 件以下にしてください: {len(variants)}")
+        items = [
+            {'index': index, 'prompt': f"{template['prompt']}\n\n{variant}"}
+            for index, variant in enumerate(variants)
+        ]
+        metrics['items'] = len(items)
+        
+        logger.info(f"バッチ生成を開始: batch_id={batch_id}, 件数={len(items)}")
+        
+        def generate(item: Dict[str, Any]) -> Dict[str, Any]:
+            request_body = build_request_body(template, item['prompt'])
+            generated_text = invoke_bedrock(batch_bedrock_client, model_id, request_body)
+            return {'scenario': extract_scenario(generated_text), 'generated_text': generated_text}
+        
+        def save(item: Dict[str, Any], output: Dict[str, Any]) -> Dict[str, Any]:
+            key = f"{output_prefix}{batch_id}-{item['index']:03d}.json"
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=key,
+                Body=json.dumps(output['scenario'], ensure_ascii=False),
+                ContentType='application/json'
+            )
+            return {'key': key, 'scenario_name': output['scenario'].get('scenario_name')}
+        
+        batch_result = run_batch_generation(
+            items,
+            generate,
+            on_result=save,
+            max_concurrency=resolve_batch_concurrency(event),
+            deadline=(
+                time.time() + context.get_remaining_time_in_millis() / 1000 - BATCH_RESERVED_SECONDS
+                if context is not None else None
+            )
+        )
+        
+        logger.info(f"バッチ生成が完了しました: {json.dumps(batch_result['summary'])}")
+        
+        metrics['succeeded'] = True
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'batch_id': batch_id,
+                **batch_result,
+                'remaining_variants': [
+                    variants[result['index']] for result in batch_result['results']
+                    if result['status'] == 'NOT_STARTED'
+                ]
+            }, ensure_ascii=False)
+        }
+        
+    except Exception as e:
+        logger.error(f"バッチ生成エラー: {e}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'error': 'バッチ生成エラーが発生しました',
+                'details': str(e)
+            }, ensure_ascii=False)
+        }
+    
+    finally:
+        log_invocation_metrics('batch_handler', cold_start, started_at, **metrics)
+
+
+def resolve_batch_concurrency(event: Dict[str, Any]) -> int:
+    """
+    バッチ生成の同時実行数を 1〜Bedrock クライアントの接続プールの大きさに丸めて返す
+    """
+    requested = int(event.get('max_concurrency', os.environ.get('BATCH_MAX_CONCURRENCY', 4)))
+    return max(1, min(requested, BEDROCK_MAX_POOL_CONNECTIONS))
+
+
+def load_template(bucket_name: str, template_key: str) -> tuple:
+    """
+    シナリオテンプレートを取得（ウォームスタート時は ETag で再検証）
+
+    Returns:
+        (テンプレート, キャッシュを再利用したかどうか)
+    """
+    cache_id = (bucket_name, template_key)
+    cached = _template_cache.get(cache_id)
+    
+    params = {'Bucket': bucket_name, 'Key': template_key}
+    if cached:
+        params['IfNoneMatch'] = cached[0]
+    
+    try:
+        response = s3_client.get_object(**params)
+    except ClientError as e:
+        # 変更がない場合 S3 は 304 Not Modified を返す
+        if cached and e.response['Error']['Code'] in ('304', 'NotModified'):
+            return cached[1], True
+        raise
+    
+    template_content = json.loads(response['Body'].read().decode('utf-8'))
+    _template_cache[cache_id] = (response.get('ETag'), template_content)
+    return template_content, False
+
+
+def consume_cold_start() -> bool:
+    """
+    コールドスタート後の最初の呼び出しかどうかを返す
+    """
+    global _cold_start
+    cold_start = _cold_start
+    _cold_start = False
+    return cold_start
+
+
+def log_invocation_metrics(handler_name: str, cold_start: bool, started_at: float, **metrics) -> None:
+    """
+    コールドスタート・ウォームスタートのレイテンシを構造化ログとして出力
+    """
+    logger.info(json.dumps({
+        'metric': 'invocation_latency',
+        'handler': handler_name,
+        'cold_start': cold_start,
+        'module_init_ms': _module_init_ms if cold_start else 0,
+        'duration_ms': round((time.time() - started_at) * 1000, 1),
+        **metrics
+    }, ensure_ascii=False))
+
+
+def build_seed_variants(count: int) -> List[str]:
+    """
+    バリエーション未指定時に、重複を避けるためのシード文を生成
+    """
+    return [
+        f"これは {count} 件中 {i + 1} 件目のシナリオです。他のシナリオと重複しない障害パターンを選んでください。"
+        for i in range(count)
+    ]
+
+
+def build_request_body(template: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+    """
+    Claude 3 Haiku のリクエスト形式でリクエストボディを組み立て
+    """
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": template['max_tokens'],
+        "temperature": template['temperature'],
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    }
+
+
+def invoke_bedrock(bedrock_client, model_id: str, request_body: Dict[str, Any]) -> str:
+    """
+    Bedrock を呼び出し、生成されたテキストを返す
+    """
+    response = bedrock_client.invoke_model(
+        modelId=model_id,
+        body=json.dumps(request_body),
+        contentType='application/json'
+    )
+    
+    # レスポンスを解析
+    response_body = json.loads(response['body'].read().decode('utf-8'))
+    return response_body['content'][0]['text']
+
+
+def extract_scenario(generated_text: str) -> Dict[str, Any]:
+    """
+    生成されたテキストからJSON形式のシナリオを抽出
+    """
+    try:
+        # 生成されたテキストからJSON部分を抽出
+        start_idx = generated_text.find('{')
+        end_idx = generated_text.rfind('}') + 1
+        
+        if start_idx != -1 and end_idx != -1:
+            json_str = generated_text[start_idx:end_idx]
+            return json.loads(json_str)
+        else:
+            raise ValueError("生成されたテキストにJSONが見つかりません")
+            
+    except (json.JSONDecodeError, ValueError) as e:
+        logger.error(f"JSONの解析に失敗しました: {e}")
+        # フォールバック：生成されたテキストをそのまま返す
+        return {
+            "scenario_name": "生成されたシナリオ",
+            "purpose": "Bedrock による自動生成",
+            "target_services": ["AWS"],
+            "execution_steps": [generated_text],
+            "expected_results": ["システムの障害耐性の確認"],
+            "recovery_steps": ["システムの復旧"]
+        }
+
+
+def get_generation_cache(event: Dict[str, Any], s3_client, bucket_name: Optional[str]) -> Optional[GenerationCache]:
+    """
+    イベントまたは環境変数の設定に応じて生成キャッシュを取得
+
+    cache_backend（GENERATION_CACHE_BACKEND）に memory / disk / s3 を指定した場合のみ有効
+    """
+    backend_name = event.get('cache_backend') or os.environ.get('GENERATION_CACHE_BACKEND')
+    if not backend_name or backend_name == 'none':
+        return None
+    
+    ttl = event.get('cache_ttl', os.environ.get('GENERATION_CACHE_TTL'))
+    ttl = float(ttl) if ttl is not None else None
+    max_entries = int(event.get('cache_max_entries', os.environ.get('GENERATION_CACHE_MAX_ENTRIES', 128)))
+    
+    if backend_name == 's3':
+        prefix = os.environ.get('GENERATION_CACHE_PREFIX', 'generation-cache/')
+        cache_id = (backend_name, bucket_name, prefix, ttl)
+    elif backend_name == 'disk':
+        directory = os.environ.get('GENERATION_CACHE_DIR', '/tmp/generation-cache')
+        cache_id = (backend_name, directory, max_entries, ttl)
+    elif backend_name == 'memory':
+        cache_id = (backend_name, max_entries, ttl)
+    else:
+        raise ValueError(f"未対応のキャッシュバックエンドです: {backend_name}")
+    
+    if cache_id in _generation_caches:
+        _generation_caches.move_to_end(cache_id)
+        return _generation_caches[cache_id]
+    
+    if backend_name == 's3':
+        backend = S3CacheBackend(s3_client, bucket_name, prefix)
+    elif backend_name == 'disk':
+        backend = LocalDiskCacheBackend(directory, max_entries)
+    else:
+        backend = MemoryCacheBackend(max_entries)
+    _generation_caches[cache_id] = GenerationCache(backend, ttl)
+    while len(_generation_caches) > MAX_GENERATION_CACHES:
+        _generation_caches.popitem(last=False)
+    
+    return _generation_caches[cache_id]
@@ -0,0 +1,158 @@
+import json
+import time
+import logging
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Callable, Tuple
+
+logger = logging.getLogger()
+
+
+def iter_stream_text(stream: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    invoke_model_with_response_stream のイベントストリームからテキスト差分を取り出す
+    """
+    for event in stream:
+        if 'chunk' not in event:
+            # modelStreamErrorException などのエラーイベント
+            error_type = next(iter(event), 'unknown')
+            raise RuntimeError(f"Bedrock ストリームエラー: {error_type}: {event.get(error_type)}")
+
+        payload = json.loads(event['chunk']['bytes'].decode('utf-8'))
+        if payload.get('type') == 'content_block_delta':
+            text = payload.get('delta', {}).get('text')
+            if text:
+                yield text
+
+
+class IncrementalScenarioParser:
+    """
+    生成中のテキストからシナリオ JSON のトップレベルフィールドを逐次取り出すパーサー
+
+    最初の '{' 以降をトップレベルオブジェクトとみなし、各フィールドの値が
+    閉じた時点で (キー, 値) を返す。文字列中の括弧やエスケープは読み飛ばす。
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._member_start: Optional[int] = None
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self.error: Optional[str] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        テキスト差分を追加し、新たに完成したフィールドを返す
+
+        完結後やエラー後もテキストは保持し（generated_text として返すため）、解析のみ行わない
+        """
+        self._text += chunk
+        if self.complete or self.error:
+            return []
+
+        completed = []
+        text = self._text
+
+        while self._pos < len(text):
+            char = text[self._pos]
+
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_member(text[self._member_start:self._pos], completed)
+                    self.complete = True
+                    self._pos += 1
+                    break
+            elif char == ',' and self._depth == 1:
+                self._emit_member(text[self._member_start:self._pos], completed)
+                self._member_start = self._pos + 1
+
+            self._pos += 1
+            if self.error:
+                break
+
+        return completed
+
+    def _emit_member(self, member: str, completed: List[Tuple[str, Any]]) -> None:
+        """
+        "key": value 形式のメンバー文字列を解析して追加
+        """
+        if not member.strip():
+            return
+        try:
+            parsed = json.loads('{' + member + '}')
+        except json.JSONDecodeError as e:
+            self.error = f"フィールドの解析に失敗しました: {e}"
+            return
+        for key, value in parsed.items():
+            self.fields[key] = value
+            completed.append((key, value))
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+
+def generate_scenario_stream(
+    bedrock_client,
+    model_id: str,
+    request_body: Dict[str, Any],
+    on_field: Optional[Callable[[str, Any], None]] = None
+) -> Dict[str, Any]:
+    """
+    ストリーミングでシナリオを生成し、フィールドが完成するたびに on_field を呼び出す
+
+    Returns:
+        generated_text, scenario（JSON が完結した場合のみ）, field_timings（ミリ秒）
+    """
+    started_at = time.time()
+    response = bedrock_client.invoke_model_with_response_stream(
+        modelId=model_id,
+        body=json.dumps(request_body),
+        contentType='application/json'
+    )
+
+    parser = IncrementalScenarioParser()
+    field_timings = {}
+    first_token_ms = None
+
+    for text in iter_stream_text(response['body']):
+        if first_token_ms is None:
+            first_token_ms = round((time.time() - started_at) * 1000, 1)
+        for key, value in parser.feed(text):
+            field_timings[key] = round((time.time() - started_at) * 1000, 1)
+            if on_field:
+                on_field(key, value)
+
+    if parser.error:
+        logger.warning(parser.error)
+
+    return {
+        'generated_text': parser.text,
+        'scenario': parser.fields if parser.complete and not parser.error else None,
+        'first_token_ms': first_token_ms,
+        'field_timings': field_timings,
+        'total_ms': round((time.time() - started_at) * 1000, 1)
+    }
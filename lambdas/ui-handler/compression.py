@@ -0,0 +1,88 @@
+import gzip
+import base64
+from typing import Dict, Optional, Tuple
+
+# Brotli はランタイムに含まれないため、利用できる場合のみ使用する
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# これより小さいレスポンスは圧縮しない（バイト数）
+COMPRESSION_MIN_BYTES = 1024
+
+# 圧縮対象の Content-Type
+COMPRESSIBLE_CONTENT_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """
+    サーバー側で利用できるエンコーディング（優先順）
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """
+    Accept-Encoding ヘッダーをエンコーディングごとの q 値に変換
+    """
+    weights = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding.strip().lower()] = q
+    return weights
+
+
+def negotiate_encoding(header: Optional[str]) -> Optional[str]:
+    """
+    クライアントが受け入れるエンコーディングから使用するものを選ぶ（なければ None）
+
+    q 値が同じ場合はサーバー側の優先順（br → gzip）で選ぶ
+    """
+    weights = parse_accept_encoding(header)
+    candidates = [
+        (weights.get(coding, weights.get('*', 0.0)), -index, coding)
+        for index, coding in enumerate(available_encodings())
+    ]
+    q, _, coding = max(candidates)
+    return coding if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def compress_body(body: str, content_type: str, accept_encoding: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    レスポンスボディを圧縮し、API Gateway 用に Base64 エンコードする
+
+    Returns:
+        (Base64 文字列, エンコーディング)。圧縮しない場合は None
+    """
+    if not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+        return None
+
+    raw = body.encode('utf-8')
+    if len(raw) < COMPRESSION_MIN_BYTES:
+        return None
+
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return None
+
+    compressed = compress(raw, encoding)
+    if len(compressed) >= len(raw):
+        return None
+    return base64.b64encode(compressed).decode('ascii'), encoding
@@ -1,16 +1,32 @@
 import json
+import time
+import heapq
+import base64
 import boto3
 import os
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import logging
+import re
+from urllib.parse import unquote_plus
+from itertools import takewhile
+from pagination import decode_cursor, iter_items, parse_time, take_page, take_sorted_page
+from compression import compress_body
+from response_cache import ResponseCache, build_cache_key
+from router import Handler, Middleware, Request, Response, Router
 
 # ロギング設定
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# AWS クライアント
-s3_client = boto3.client('s3')
+# シナリオ本文の並列取得数
+SCENARIO_FETCH_CONCURRENCY = 8
+
+# AWS クライアント（S3 は並列取得の同時接続数に合わせて接続プールを広げる）
+s3_client = boto3.client('s3', config=Config(max_pool_connections=SCENARIO_FETCH_CONCURRENCY * 2))
 stepfunctions_client = boto3.client('stepfunctions')
 fis_client = boto3.client('fis')
 cloudwatch_logs_client = boto3.client('logs')
@@ -19,19 +35,67 @@ cloudwatch_logs_client = boto3.client('logs')
 BUCKET_NAME = os.environ.get('BUCKET_NAME')
 STATE_MACHINE_ARN = os.environ.get('STATE_MACHINE_ARN')
 
+# シナリオ一覧のページサイズ
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# 一括取得できるシナリオ数の上限
+MAX_BATCH_SCENARIOS = 50
+
+# シナリオ ID として受け付ける形式
+SCENARIO_ID_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+# シナリオ詳細で取得できる項目
+SCENARIO_DETAIL_FIELDS = ('scenario', 'cdk_code')
+
+# シナリオ一覧表示用のメタデータをまとめたインデックスオブジェクト
+SCENARIO_INDEX_KEY = 'index/scenarios.json'
+
+# インデックスの形式（一覧のページをインデックスのみから返せるよう作成日時とサイズを含む）
+SCENARIO_INDEX_VERSION = 2
+
+# インデックスのキャッシュ（ウォームスタート間で再利用）
+_scenario_index: Dict[str, Any] = {'etag': None, 'entries': {}, 'scanned_at': None, 'sorted': None}
+
+# S3 イベント通知の取りこぼしに備えてバケットを走査し直す間隔（秒）
+SCENARIO_INDEX_RESCAN_SECONDS = 3600
+
+# 他のコンテナと同時に更新した場合にインデックスの保存を再試行する回数
+SCENARIO_INDEX_SAVE_ATTEMPTS = 3
+
+# 実験ログの取得設定
+LOG_STREAM_LIMIT = 10
+LOG_EVENTS_PER_STREAM = 100
+LOG_FETCH_CONCURRENCY = 10
+LOG_PAGE_SIZE = 100
+
+# FIS 実験・Step Functions 実行一覧の API 1 回あたりの取得件数
+# （カーソルにページ内オフセットを含むため、ページの区切りを固定する）
+FIS_LIST_PAGE_SIZE = 100
+EXECUTION_LIST_PAGE_SIZE = 100
+
+# GET レスポンスのキャッシュ（ウォームスタート間で再利用）
+response_cache = ResponseCache()
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     API Gateway からの各種リクエストを処理するメインハンドラー
+
+    scenarios/ への S3 イベント通知を受け取った場合はレスポンスキャッシュを無効化する
     """
+    if is_s3_event(event):
+        return handle_s3_event(event)
+    
+    # CORS ヘッダーの設定
+    headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization, If-None-Match',
+        'Access-Control-Expose-Headers': 'ETag',
+    }
+    
     try:
-        # CORS ヘッダーの設定
-        headers = {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, Authorization',
-        }
-        
         # OPTIONS リクエストの処理（プリフライト）
         if event.get('httpMethod') == 'OPTIONS':
             return {
@@ -40,39 +104,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'body': json.dumps({'message': 'CORS preflight'})
             }
         
-        # パスとメソッドの取得
-        path = event.get('path', '')
-        method = event.get('httpMethod', 'GET')
-        
-        logger.info(f"Request: {method} {path}")
+        request = Request(event)
+        logger.info(f"Request: {request.method} {request.path}")
         
         # ルーティング
-        if path == '/scenarios' and method == 'GET':
-            response_body = get_scenarios()
-        elif path.startswith('/scenarios/') and method == 'GET':
-            scenario_id = path.split('/')[-1]
-            response_body = get_scenario_detail(scenario_id)
-        elif path == '/fis/experiments' and method == 'GET':
-            response_body = get_fis_experiments()
-        elif path.startswith('/fis/experiments/') and method == 'GET':
-            experiment_id = path.split('/')[-1]
-            response_body = get_fis_experiment_detail(experiment_id)
-        elif path == '/executions' and method == 'GET':
-            response_body = get_step_function_executions()
-        elif path == '/health' and method == 'GET':
-            response_body = {'status': 'healthy', 'timestamp': datetime.now().isoformat()}
-        else:
-            return {
-                'statusCode': 404,
-                'headers': headers,
-                'body': json.dumps({'error': 'Not Found'})
-            }
-        
-        return {
-            'statusCode': 200,
-            'headers': headers,
-            'body': json.dumps(response_body)
-        }
+        return router.dispatch(request).to_proxy(headers)
     
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
@@ -82,81 +118,596 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'body': json.dumps({'error': 'Internal Server Error', 'message': str(e)})
         }
 
-def get_scenarios() -> Dict[str, Any]:
+def timing_middleware(request: Request, handler: Handler) -> Response:
+    """
+    ルートごとのレイテンシを構造化ログとして出力
     """
-    S3バケットから生成されたシナリオ一覧を取得
+    started_at = time.time()
+    response = handler(request)
+    logger.info(json.dumps({
+        'metric': 'route_latency',
+        'route': request.route.name,
+        'status': response.status_code,
+        'duration_ms': round((time.time() - started_at) * 1000, 1)
+    }))
+    return response
+
+def compression_middleware(request: Request, handler: Handler) -> Response:
+    """
+    Accept-Encoding に応じてレスポンスを圧縮（Brotli / gzip）
+
+    圧縮したボディは API Gateway のバイナリサポート用に Base64 で返す
+    """
+    response = handler(request)
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+    
+    compressed = compress_body(response.text, response.headers['Content-Type'], request.headers.get('accept-encoding'))
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compressed is None:
+        return response
+    
+    response.body, encoding = compressed
+    response.is_base64_encoded = True
+    response.headers['Content-Encoding'] = encoding
+    # 圧縮後の表現はバイト列が異なるため弱い ETag にする
+    if 'ETag' in response.headers and not response.headers['ETag'].startswith('W/'):
+        response.headers['ETag'] = 'W/' + response.headers['ETag']
+    return response
+
+def cache_middleware(ttl: int) -> Middleware:
+    """
+    レスポンスを ttl 秒キャッシュするミドルウェアを作成
+
+    キャッシュ済みのレスポンスがあれば AWS API を呼び出さずに返す
+    """
+    def middleware(request: Request, handler: Handler) -> Response:
+        cache_key = build_cache_key(request.path, request.query)
+        if 'no-cache' not in request.headers.get('cache-control', ''):
+            cached = response_cache.get(cache_key)
+            if cached:
+                return build_cacheable_response(cached['body'], cached['etag'], cached['max_age'], request.headers)
+        
+        response = handler(request)
+        
+        # エラーを含むレスポンスはキャッシュしない
+        if response.status_code != 200 or response.is_error:
+            return response
+        body = response.text
+        etag = response_cache.put(cache_key, body, ttl)
+        return build_cacheable_response(body, etag, ttl, request.headers)
+    
+    return middleware
+
+def build_cacheable_response(
+    body: str,
+    etag: str,
+    max_age: int,
+    request_headers: Dict[str, str]
+) -> Response:
+    """
+    ETag / Cache-Control 付きのレスポンスを作成（If-None-Match が一致する場合は 304）
+    """
+    headers = {'ETag': etag, 'Cache-Control': f'private, max-age={max_age}'}
+    if_none_match = request_headers.get('if-none-match', '')
+    # 圧縮時の弱い ETag（W/ 付き）も同じ内容として比較する
+    tags = [tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip() for tag in if_none_match.split(',')]
+    if etag in tags or if_none_match.strip() == '*':
+        return Response('', status_code=304, headers=headers)
+    
+    return Response(body, headers=headers)
+
+# ルーティングテーブル（共通ミドルウェアはすべてのルートの最も外側に適用）
+router = Router(middleware=[timing_middleware, compression_middleware])
+
+@router.route('GET', '/scenarios', middleware=[cache_middleware(30)])
+def route_scenarios(request: Request) -> Response:
+    return Response(get_scenarios(
+        limit=parse_limit(request.query.get('limit')),
+        cursor=request.query.get('cursor')
+    ))
+
+@router.route('GET', '/scenarios/batch', middleware=[cache_middleware(300)])
+def route_scenario_batch(request: Request) -> Response:
+    ids = [scenario_id.strip() for scenario_id in request.query.get('ids', '').split(',') if scenario_id.strip()]
+    fields = [field.strip() for field in request.query.get('fields', ','.join(SCENARIO_DETAIL_FIELDS)).split(',')]
+    if not ids:
+        return Response({'error': 'ids を指定してください'}, status_code=400)
+    if len(ids) > MAX_BATCH_SCENARIOS:
+        return Response({'error': f'一度に取得できるシナリオは {MAX_BATCH_SCENARIOS} 件までです'}, status_code=400)
+    return Response(get_scenario_details(ids, fields))
+
+@router.route('GET', '/scenarios/{scenario_id:slug}', middleware=[cache_middleware(300)])
+def route_scenario_detail(request: Request) -> Response:
+    return Response(get_scenario_detail(request.path_params['scenario_id']))
+
+@router.route('GET', '/fis/experiments', middleware=[cache_middleware(10)])
+def route_fis_experiments(request: Request) -> Response:
+    query = request.query
+    return Response(get_fis_experiments(
+        limit=parse_limit(query.get('limit')),
+        cursor=query.get('cursor'),
+        state=query.get('state'),
+        tag=query.get('tag'),
+        time_from=query.get('from'),
+        time_to=query.get('to')
+    ))
+
+@router.route('GET', '/fis/experiments/{experiment_id:slug}', middleware=[cache_middleware(5)])
+def route_fis_experiment_detail(request: Request) -> Response:
+    query = request.query
+    return Response(get_fis_experiment_detail(
+        request.path_params['experiment_id'],
+        logs_mode=query.get('logs_mode', 'streams'),
+        logs_next_token=query.get('logs_next_token'),
+        logs_limit=parse_limit(query.get('logs_limit'), default=LOG_PAGE_SIZE),
+        logs_filter=query.get('logs_filter')
+    ))
+
+@router.route('GET', '/fis/experiments/{experiment_id:slug}/logs/tail')
+def route_fis_experiment_logs_tail(request: Request) -> Response:
+    tail = tail_experiment_logs(
+        request.path_params['experiment_id'],
+        cursor=request.query.get('cursor'),
+        since=parse_since(request.query.get('since'))
+    )
+    # フロントエンドが追記できるよう 1 行 1 イベントの NDJSON で返す
+    return Response(to_ndjson(tail), content_type='application/x-ndjson')
+
+@router.route('GET', '/executions', middleware=[cache_middleware(10)])
+def route_executions(request: Request) -> Response:
+    query = request.query
+    return Response(get_step_function_executions(
+        limit=parse_limit(query.get('limit')),
+        cursor=query.get('cursor'),
+        status=query.get('status'),
+        time_from=query.get('from'),
+        time_to=query.get('to')
+    ))
+
+@router.route('GET', '/health')
+def route_health(request: Request) -> Response:
+    return Response({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+
+def is_s3_event(event: Dict[str, Any]) -> bool:
     """
+    S3 イベント通知による呼び出しかどうかを判定
+    """
+    records = event.get('Records') or []
+    return bool(records) and all(record.get('eventSource') == 'aws:s3' for record in records)
+
+def handle_s3_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    S3 への書き込み・削除に対応するルートのキャッシュを無効化し、シナリオインデックスに反映
+
+    無効化できるのは通知を受け取ったコンテナのキャッシュのみで、
+    他のコンテナのキャッシュはルートごとの TTL で失効する
+    """
+    keys = [unquote_plus(record['s3']['object']['key']) for record in event['Records']]
+    removed = response_cache.invalidate_for_s3_keys(keys)
     try:
-        response = s3_client.list_objects_v2(
-            Bucket=BUCKET_NAME,
-            Prefix='scenarios/'
-        )
+        apply_scenario_events(event['Records'])
+    except Exception as e:
+        # 反映できなかった変更は次回の走査でインデックスに取り込まれる
+        logger.warning(f"Error applying S3 events to scenario index: {str(e)}")
+    logger.info(f"Invalidated {removed} cached responses for {len(keys)} S3 objects")
+    return {'invalidated': removed}
+
+def parse_limit(value: Optional[str], default: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    クエリパラメータの limit を 1〜MAX_PAGE_SIZE の範囲に丸めて返す
+    """
+    try:
+        limit = int(value) if value is not None else default
+    except ValueError:
+        limit = default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def get_scenarios(limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    S3バケットから生成されたシナリオ一覧を取得（作成日時の新しい順、cursor によるページング）
+
+    ページはシナリオインデックスから切り出す。バケットの全件走査はインデックスが未作成・
+    旧形式の場合と、最後の走査から SCENARIO_INDEX_RESCAN_SECONDS 経過した場合のみ行い、
+    それ以外の追加・削除は S3 イベント通知でインデックスに反映する
+
+    Returns:
+        scenarios（ページ内のシナリオ）、total（シナリオの総数）、limit、next_cursor
+    """
+    try:
+        load_scenario_index()
+        if needs_scenario_rescan():
+            rescan_scenario_index()
+        
+        items = sorted_scenario_items()
+        page, next_cursor = take_sorted_page(items, limit, cursor, scenario_sort_key)
         
-        scenarios = []
-        for obj in response.get('Contents', []):
-            if obj['Key'].endswith('.json'):
-                # シナリオファイルの詳細を取得
-                scenario_obj = s3_client.get_object(Bucket=BUCKET_NAME, Key=obj['Key'])
-                scenario_data = json.loads(scenario_obj['Body'].read())
-                
-                scenarios.append({
-                    'id': obj['Key'].split('/')[-1].replace('.json', ''),
-                    'name': scenario_data.get('name', 'Unknown Scenario'),
-                    'description': scenario_data.get('description', ''),
-                    'created_at': obj['LastModified'].isoformat(),
-                    'size': obj['Size'],
-                    'type': scenario_data.get('type', 'unknown')
-                })
+        scenarios = [{
+            'id': item['key'].split('/')[-1].replace('.json', ''),
+            'name': item['name'],
+            'description': item['description'],
+            'created_at': item['last_modified'],
+            'size': item['size'],
+            'type': item['type']
+        } for item in page]
         
         return {
-            'scenarios': sorted(scenarios, key=lambda x: x['created_at'], reverse=True),
-            'total': len(scenarios)
+            'scenarios': scenarios,
+            'total': len(items),
+            'limit': limit,
+            'next_cursor': next_cursor
         }
     
     except Exception as e:
         logger.error(f"Error getting scenarios: {str(e)}")
         return {'scenarios': [], 'total': 0, 'error': str(e)}
 
+def list_scenario_objects() -> List[Dict[str, Any]]:
+    """
+    シナリオファイル（scenarios/*.json）のオブジェクト一覧を全件取得
+    """
+    objects = []
+    params = {'Bucket': BUCKET_NAME, 'Prefix': 'scenarios/'}
+    while True:
+        response = s3_client.list_objects_v2(**params)
+        objects.extend(obj for obj in response.get('Contents', []) if obj['Key'].endswith('.json'))
+        if not response.get('IsTruncated'):
+            return objects
+        params['ContinuationToken'] = response['NextContinuationToken']
+
+def scenario_sort_key(item: Dict[str, Any]) -> List[str]:
+    """
+    シナリオ一覧の並び順（更新日時、同時刻はキー）
+    """
+    return [item['last_modified'], item['key']]
+
+def sorted_scenario_items() -> List[Dict[str, Any]]:
+    """
+    インデックスのエントリを一覧の並び順に並べて返す（インデックスが変わるまで再利用）
+    """
+    if _scenario_index['sorted'] is None:
+        items = [{'key': key, **entry} for key, entry in _scenario_index['entries'].items()]
+        _scenario_index['sorted'] = sorted(items, key=scenario_sort_key, reverse=True)
+    return _scenario_index['sorted']
+
+def fetch_scenario_entry(key: str, obj: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    シナリオ本文を取得し、インデックスのエントリ（一覧表示用のメタデータ）を作成
+
+    obj（一覧取得時のオブジェクト情報）がない場合は GetObject のレスポンスの値を使う
+    """
+    response = s3_client.get_object(Bucket=BUCKET_NAME, Key=key)
+    scenario_data = json.loads(response['Body'].read())
+    obj = obj or response
+    
+    return {
+        'etag': obj['ETag'],
+        'last_modified': obj['LastModified'].isoformat(),
+        'size': obj['Size'] if 'Size' in obj else obj['ContentLength'],
+        'name': scenario_data.get('name', 'Unknown Scenario'),
+        'description': scenario_data.get('description', ''),
+        'type': scenario_data.get('type', 'unknown')
+    }
+
+def needs_scenario_rescan() -> bool:
+    """
+    バケットを走査してインデックスを作り直す必要があるかどうかを判定
+    """
+    scanned_at = _scenario_index['scanned_at']
+    return scanned_at is None or time.time() - scanned_at > SCENARIO_INDEX_RESCAN_SECONDS
+
+def rescan_scenario_index() -> None:
+    """
+    シナリオのオブジェクト一覧とインデックスを突き合わせ、差分をインデックスに反映
+
+    インデックスにない・更新されたシナリオのみ本文を並列に取得する
+    """
+    objects = list_scenario_objects()
+    entries = _scenario_index['entries']
+    
+    stale, updates = [], {}
+    for obj in objects:
+        entry = entries.get(obj['Key'])
+        if entry is None or entry['etag'] != obj['ETag']:
+            stale.append(obj)
+        elif 'last_modified' not in entry:
+            # 旧形式のエントリは一覧取得時の情報で補う
+            updates[obj['Key']] = {**entry, 'last_modified': obj['LastModified'].isoformat(), 'size': obj['Size']}
+    
+    if stale:
+        # シナリオファイルの詳細を並列に取得
+        with ThreadPoolExecutor(max_workers=min(SCENARIO_FETCH_CONCURRENCY, len(stale))) as executor:
+            fetched = list(executor.map(lambda obj: fetch_scenario_entry(obj['Key'], obj), stale))
+        updates.update((obj['Key'], entry) for obj, entry in zip(stale, fetched))
+    
+    present_keys = {obj['Key'] for obj in objects}
+    removed_keys = {key for key in entries if key not in present_keys}
+    update_scenario_index(updates, removed_keys, scanned_at=time.time())
+
+def apply_scenario_events(records: List[Dict[str, Any]]) -> None:
+    """
+    scenarios/ への S3 イベント通知をシナリオインデックスに反映
+    """
+    updates, removed_keys = {}, set()
+    for record in records:
+        key = unquote_plus(record['s3']['object']['key'])
+        if not key.startswith('scenarios/') or not key.endswith('.json'):
+            continue
+        if record['eventName'].startswith('ObjectRemoved'):
+            removed_keys.add(key)
+            updates.pop(key, None)
+        else:
+            updates[key] = fetch_scenario_entry(key)
+            removed_keys.discard(key)
+    
+    if updates or removed_keys:
+        load_scenario_index()
+        update_scenario_index(updates, removed_keys)
+
+def set_scenario_index(entries: Dict[str, Any], etag: Optional[str], scanned_at: Optional[float]) -> None:
+    """
+    コンテナ内のインデックスのキャッシュを置き換える
+    """
+    _scenario_index.update({'etag': etag, 'entries': entries, 'scanned_at': scanned_at, 'sorted': None})
+
+def load_scenario_index() -> Dict[str, Any]:
+    """
+    シナリオインデックスを取得（キャッシュ済みの場合は ETag で再検証）
+    """
+    params = {'Bucket': BUCKET_NAME, 'Key': SCENARIO_INDEX_KEY}
+    if _scenario_index['etag']:
+        params['IfNoneMatch'] = _scenario_index['etag']
+    
+    try:
+        response = s3_client.get_object(**params)
+        index = json.loads(response['Body'].read())
+        if index.get('version') == SCENARIO_INDEX_VERSION:
+            set_scenario_index(index.get('entries', {}), response.get('ETag'), index.get('scanned_at'))
+        else:
+            # 旧形式のインデックスは走査し直して上書きする
+            set_scenario_index(index.get('entries', {}), response.get('ETag'), None)
+    except ClientError as e:
+        code = e.response['Error']['Code']
+        if code == 'NoSuchKey':
+            # インデックス未作成（保存できなかった走査結果はこのコンテナ内で使い続ける）
+            if _scenario_index['etag']:
+                set_scenario_index({}, None, None)
+        elif code not in ('304', 'NotModified'):
+            raise
+    
+    return _scenario_index['entries']
+
+def update_scenario_index(updates: Dict[str, Any], removed_keys: set, scanned_at: Optional[float] = None) -> None:
+    """
+    シナリオインデックスを条件付きで保存（失敗しても一覧の取得は継続）
+
+    読み込んだ時点の ETag を条件に書き込み、他のコンテナが先に更新していた場合は
+    最新のインデックスを読み直して更新分をマージしてから再度保存する。
+    条件付き書き込みに対応していない SDK などで保存できない場合は、
+    更新後のインデックスをこのコンテナ内でのみ使う
+
+    Args:
+        updates: 追加・更新するエントリ
+        removed_keys: 削除されたシナリオのキー（他のコンテナが追加したエントリは残す）
+        scanned_at: バケットを走査した時刻（走査していない場合は保存済みの値を引き継ぐ）
+    """
+    for _ in range(SCENARIO_INDEX_SAVE_ATTEMPTS):
+        entries = merge_index_entries(updates, removed_keys)
+        index_scanned_at = scanned_at if scanned_at is not None else _scenario_index['scanned_at']
+        condition = {'IfMatch': _scenario_index['etag']} if _scenario_index['etag'] else {'IfNoneMatch': '*'}
+        try:
+            response = s3_client.put_object(
+                Bucket=BUCKET_NAME,
+                Key=SCENARIO_INDEX_KEY,
+                Body=json.dumps({
+                    'version': SCENARIO_INDEX_VERSION,
+                    'scanned_at': index_scanned_at,
+                    'entries': entries
+                }, ensure_ascii=False),
+                ContentType='application/json',
+                **condition
+            )
+            set_scenario_index(entries, response.get('ETag'), index_scanned_at)
+            return
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                logger.warning(f"Error saving scenario index: {str(e)}")
+                break
+        except BotoCoreError as e:
+            # 条件付き書き込みのパラメータを受け付けない SDK では ParamValidationError になる
+            logger.warning(f"Error saving scenario index: {str(e)}")
+            break
+        try:
+            load_scenario_index()
+        except (ClientError, BotoCoreError) as e:
+            logger.warning(f"Error reloading scenario index: {str(e)}")
+            break
+    else:
+        logger.warning("Scenario index was updated concurrently, giving up saving")
+    
+    set_scenario_index(
+        merge_index_entries(updates, removed_keys),
+        _scenario_index['etag'],
+        scanned_at if scanned_at is not None else _scenario_index['scanned_at']
+    )
+
+def merge_index_entries(updates: Dict[str, Any], removed_keys: set) -> Dict[str, Any]:
+    """
+    キャッシュ済みのインデックスに更新分を適用したエントリを返す
+    """
+    entries = {key: entry for key, entry in _scenario_index['entries'].items() if key not in removed_keys}
+    entries.update(updates)
+    return entries
+
 def get_scenario_detail(scenario_id: str) -> Dict[str, Any]:
     """
     特定のシナリオの詳細情報を取得
     """
-    try:
-        key = f'scenarios/{scenario_id}.json'
-        response = s3_client.get_object(Bucket=BUCKET_NAME, Key=key)
-        scenario_data = json.loads(response['Body'].read())
-        
-        # CDKコードも取得（存在する場合）
-        cdk_key = f'cdk-code/{scenario_id}.ts'
-        cdk_code = None
+    detail = get_scenario_details([scenario_id])['scenarios'][0]
+    if 'error' in detail:
+        return {'error': detail['error']}
+    return {
+        'id': scenario_id,
+        'scenario': detail['scenario'],
+        'cdk_code': detail['cdk_code'],
+        'last_modified': detail['last_modified']
+    }
+
+def get_scenario_details(scenario_ids: List[str], fields: List[str] = SCENARIO_DETAIL_FIELDS) -> Dict[str, Any]:
+    """
+    複数のシナリオの詳細情報を並列に取得
+
+    fields に含まれない項目は本文を取得せず、HEAD で更新日時とサイズのみ確認する。
+    シナリオごとのエラーは各要素の error に含め、一括取得全体は失敗させない
+    """
+    scenario_ids = list(dict.fromkeys(scenario_ids))
+    valid_ids = [scenario_id for scenario_id in scenario_ids if SCENARIO_ID_PATTERN.match(scenario_id)]
+    
+    # シナリオ本文と CDK コードの取得をまとめてスレッドプールに投入
+    requests = [
+        (scenario_id, part, key, part in fields)
+        for scenario_id in valid_ids
+        for part, key in (('scenario', f'scenarios/{scenario_id}.json'), ('cdk_code', f'cdk-code/{scenario_id}.ts'))
+    ]
+    results = {}
+    if requests:
+        with ThreadPoolExecutor(max_workers=min(SCENARIO_FETCH_CONCURRENCY, len(requests))) as executor:
+            futures = {
+                (scenario_id, part): executor.submit(fetch_s3_object if with_body else head_s3_object, key)
+                for scenario_id, part, key, with_body in requests
+            }
+            for request_key, future in futures.items():
+                try:
+                    results[request_key] = future.result()
+                except Exception as e:
+                    logger.error(f"Error getting scenario object {request_key}: {str(e)}")
+                    results[request_key] = {'error': str(e)}
+    
+    scenarios = []
+    for scenario_id in scenario_ids:
+        if scenario_id not in valid_ids:
+            scenarios.append({'id': scenario_id, 'error': 'Invalid scenario id'})
+            continue
+        scenarios.append(build_scenario_detail(
+            scenario_id, results[(scenario_id, 'scenario')], results[(scenario_id, 'cdk_code')], fields
+        ))
+    
+    return {
+        'scenarios': scenarios,
+        'total': len(scenarios),
+        'errors': sum(1 for scenario in scenarios if 'error' in scenario)
+    }
+
+def build_scenario_detail(
+    scenario_id: str,
+    scenario_obj: Optional[Dict[str, Any]],
+    cdk_obj: Optional[Dict[str, Any]],
+    fields: List[str]
+) -> Dict[str, Any]:
+    """
+    取得した S3 オブジェクトからシナリオ詳細を組み立てる
+    """
+    if scenario_obj is None:
+        return {'id': scenario_id, 'error': 'Scenario not found'}
+    if 'error' in scenario_obj:
+        return {'id': scenario_id, 'error': scenario_obj['error']}
+    
+    detail = {
+        'id': scenario_id,
+        'last_modified': scenario_obj['last_modified'],
+        'size': scenario_obj['size']
+    }
+    if 'scenario' in fields:
         try:
-            cdk_response = s3_client.get_object(Bucket=BUCKET_NAME, Key=cdk_key)
-            cdk_code = cdk_response['Body'].read().decode('utf-8')
-        except s3_client.exceptions.NoSuchKey:
-            pass
-        
-        return {
-            'id': scenario_id,
-            'scenario': scenario_data,
-            'cdk_code': cdk_code,
-            'last_modified': response['LastModified'].isoformat()
-        }
+            detail['scenario'] = json.loads(scenario_obj['body'])
+        except ValueError as e:
+            return {'id': scenario_id, 'error': f'Invalid scenario JSON: {str(e)}'}
     
-    except s3_client.exceptions.NoSuchKey:
-        return {'error': 'Scenario not found'}
-    except Exception as e:
-        logger.error(f"Error getting scenario detail: {str(e)}")
-        return {'error': str(e)}
+    # CDK コードは存在しない場合もあるため、取得できなくてもシナリオ自体は返す
+    if cdk_obj is not None and 'error' in cdk_obj:
+        detail['cdk_code_error'] = cdk_obj['error']
+        cdk_obj = None
+    if 'cdk_code' in fields:
+        detail['cdk_code'] = cdk_obj['body'] if cdk_obj else None
+    detail['cdk_code_size'] = cdk_obj['size'] if cdk_obj else None
+    return detail
 
-def get_fis_experiments() -> Dict[str, Any]:
+def fetch_s3_object(key: str) -> Optional[Dict[str, Any]]:
     """
-    FIS実験の一覧を取得
+    S3 オブジェクトの本文とメタデータを取得（存在しない場合は None）
     """
     try:
-        response = fis_client.list_experiments()
-        experiments = []
+        response = s3_client.get_object(Bucket=BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404', 'NotFound'):
+            return None
+        raise
+    return {
+        'body': response['Body'].read().decode('utf-8'),
+        'last_modified': response['LastModified'].isoformat(),
+        'size': response.get('ContentLength')
+    }
+
+def head_s3_object(key: str) -> Optional[Dict[str, Any]]:
+    """
+    S3 オブジェクトのメタデータのみを取得（存在しない場合は None）
+    """
+    try:
+        response = s3_client.head_object(Bucket=BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if e.response['Error']['Code'] in ('NoSuchKey', '404', 'NotFound'):
+            return None
+        raise
+    return {
+        'last_modified': response['LastModified'].isoformat(),
+        'size': response.get('ContentLength')
+    }
+
+def get_fis_experiments(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    state: Optional[str] = None,
+    tag: Optional[str] = None,
+    time_from: Optional[str] = None,
+    time_to: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    FIS実験の一覧を取得（cursor によるページング）
+
+    FIS の ListExperiments は並び順を保証しないため、ページ内・ページ間とも API が返した順に返す。
+    作成日時順の表示は、取得済みのページを呼び出し元で並べ替えて行う
+
+    Args:
+        state: 実験の状態（running, completed など。大文字小文字は区別しない）
+        tag: 'Key' または 'Key=Value' 形式のタグ条件
+        time_from / time_to: 作成日時の範囲（ISO 8601）
+    """
+    try:
+        position = decode_cursor(cursor)
+        start, end = parse_time(time_from), parse_time(time_to)
+        tag_key, _, tag_value = (tag or '').partition('=')
+        
+        def fetch_page(token: Optional[str]) -> Dict[str, Any]:
+            params = {'maxResults': FIS_LIST_PAGE_SIZE}
+            if token:
+                params['nextToken'] = token
+            return fis_client.list_experiments(**params)
         
-        for exp in response.get('experiments', []):
+        # FIS の List API は状態・タグ・期間で絞り込めないため、取得しながら判定する
+        def matches(exp: Dict[str, Any]) -> bool:
+            if state and exp.get('state', {}).get('status', '').lower() != state.lower():
+                return False
+            if tag_key and (tag_key not in exp.get('tags', {}) or (tag_value and exp['tags'][tag_key] != tag_value)):
+                return False
+            created = exp.get('creationTime')
+            if (start or end) and created is None:
+                return False
+            return not (start and created < start) and not (end and created > end)
+        
+        page, next_cursor = take_page(iter_items(fetch_page, 'experiments', position), limit, matches)
+        
+        experiments = []
+        for exp in page:
             experiments.append({
                 'id': exp['id'],
                 'state': exp.get('state', {}),
@@ -165,23 +716,43 @@ def get_fis_experiments() -> Dict[str, Any]:
             })
         
         return {
-            'experiments': sorted(experiments, key=lambda x: x['creation_time'] or '', reverse=True),
-            'total': len(experiments)
+            'experiments': experiments,
+            'count': len(experiments),
+            'limit': limit,
+            'next_cursor': next_cursor
         }
     
     except Exception as e:
         logger.error(f"Error getting FIS experiments: {str(e)}")
-        return {'experiments': [], 'total': 0, 'error': str(e)}
+        return {'experiments': [], 'count': 0, 'error': str(e)}
 
-def get_fis_experiment_detail(experiment_id: str) -> Dict[str, Any]:
+def get_fis_experiment_detail(
+    experiment_id: str,
+    logs_mode: str = 'streams',
+    logs_next_token: Optional[str] = None,
+    logs_limit: int = LOG_PAGE_SIZE,
+    logs_filter: Optional[str] = None
+) -> Dict[str, Any]:
     """
     特定のFIS実験の詳細情報を取得
+
+    logs_mode が 'filter' の場合はロググループ全体を filter_log_events で
+    ページングしながら取得し、次ページのトークンを logs_next_token として返す
     """
     try:
         response = fis_client.get_experiment(id=experiment_id)
         experiment = response.get('experiment', {})
         
         # CloudWatch Logsからログを取得
+        if logs_mode == 'filter':
+            page = get_experiment_logs_page(experiment_id, logs_limit, logs_next_token, logs_filter)
+            return {
+                'id': experiment_id,
+                'experiment': experiment,
+                'logs': page['logs'],
+                'logs_next_token': page['next_token']
+            }
+        
         logs = get_experiment_logs(experiment_id)
         
         return {
@@ -197,6 +768,9 @@ def get_fis_experiment_detail(experiment_id: str) -> Dict[str, Any]:
 def get_experiment_logs(experiment_id: str) -> List[Dict[str, Any]]:
     """
     実験のCloudWatch Logsを取得
+
+    最新のログストリームからイベントを並列に取得し、
+    ストリームごとに時刻順のイベント列をマージして新しい順に返す
     """
     try:
         log_group_name = f'/aws/fis/{experiment_id}'
@@ -206,43 +780,229 @@ def get_experiment_logs(experiment_id: str) -> List[Dict[str, Any]]:
             logGroupName=log_group_name,
             orderBy='LastEventTime',
             descending=True,
-            limit=10
+            limit=LOG_STREAM_LIMIT
         )
+        stream_names = [stream['logStreamName'] for stream in streams_response.get('logStreams', [])]
+        if not stream_names:
+            return []
         
-        logs = []
-        for stream in streams_response.get('logStreams', []):
-            # ログイベントの取得
-            events_response = cloudwatch_logs_client.get_log_events(
-                logGroupName=log_group_name,
-                logStreamName=stream['logStreamName'],
-                limit=100
-            )
-            
-            for event in events_response.get('events', []):
-                logs.append({
-                    'timestamp': datetime.fromtimestamp(event['timestamp'] / 1000).isoformat(),
-                    'message': event['message'],
-                    'stream': stream['logStreamName']
-                })
+        # ログイベントをストリームごとに並列で取得
+        with ThreadPoolExecutor(max_workers=min(LOG_FETCH_CONCURRENCY, len(stream_names))) as executor:
+            streams = list(executor.map(
+                lambda stream_name: fetch_stream_events(log_group_name, stream_name),
+                stream_names
+            ))
         
-        return sorted(logs, key=lambda x: x['timestamp'], reverse=True)
+        # 各ストリームは新しい順に並んでいるため k-way マージで結合
+        merged = heapq.merge(*streams, key=lambda event: event['timestamp'], reverse=True)
+        return [format_log_event(event) for event in merged]
     
     except Exception as e:
         logger.error(f"Error getting experiment logs: {str(e)}")
         return []
 
-def get_step_function_executions() -> Dict[str, Any]:
+def fetch_stream_events(log_group_name: str, stream_name: str) -> List[Dict[str, Any]]:
+    """
+    ログストリームの最新イベントを新しい順に取得
+    """
+    events_response = cloudwatch_logs_client.get_log_events(
+        logGroupName=log_group_name,
+        logStreamName=stream_name,
+        limit=LOG_EVENTS_PER_STREAM
+    )
+    
+    # get_log_events は古い順に返すため反転する
+    events = events_response.get('events', [])
+    for event in events:
+        event['logStreamName'] = stream_name
+    return events[::-1]
+
+def get_experiment_logs_page(
+    experiment_id: str,
+    limit: int = LOG_PAGE_SIZE,
+    next_token: Optional[str] = None,
+    filter_pattern: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    実験のCloudWatch Logsを filter_log_events でページ単位に取得（古い順）
+    """
+    try:
+        params = {'logGroupName': f'/aws/fis/{experiment_id}', 'limit': limit}
+        if next_token:
+            params['nextToken'] = next_token
+        if filter_pattern:
+            params['filterPattern'] = filter_pattern
+        response = cloudwatch_logs_client.filter_log_events(**params)
+        
+        return {
+            'logs': [format_log_event(event) for event in response.get('events', [])],
+            'next_token': response.get('nextToken')
+        }
+    
+    except Exception as e:
+        logger.error(f"Error getting experiment logs page: {str(e)}")
+        return {'logs': [], 'next_token': None, 'error': str(e)}
+
+def format_log_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    CloudWatch Logs のイベントをレスポンス用の形式に変換
+    """
+    return {
+        'timestamp': datetime.fromtimestamp(event['timestamp'] / 1000).isoformat(),
+        'message': event['message'],
+        'stream': event['logStreamName']
+    }
+
+def parse_since(value: Optional[str]) -> Optional[int]:
+    """
+    クエリパラメータの since（エポックミリ秒）を整数に変換
+    """
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def encode_log_cursor(stream_tokens: Dict[str, str], since: Optional[int]) -> str:
+    """
+    ストリームごとの nextForwardToken と取得済みの最新時刻を不透明なカーソル文字列に変換
+    """
+    payload = json.dumps({'streams': stream_tokens, 'since': since}, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_log_cursor(cursor: Optional[str]) -> tuple:
+    """
+    カーソル文字列を (ストリームごとのトークン, 取得済みの最新時刻) に戻す（不正な場合は空）
+    """
+    if not cursor:
+        return {}, None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return payload.get('streams', {}), payload.get('since')
+    except (ValueError, TypeError, AttributeError):
+        logger.warning("Invalid log cursor, starting from since")
+        return {}, None
+
+def tail_experiment_logs(
+    experiment_id: str,
+    cursor: Optional[str] = None,
+    since: Optional[int] = None,
+    logs_client: Any = None
+) -> Dict[str, Any]:
     """
-    Step Function実行履歴を取得
+    実験ログの新着イベントのみを取得
+
+    カーソルに含まれるストリームは前回の続き（nextForwardToken）から、
+    含まれないストリームは since（エポックミリ秒）以降のイベントを取得する
+    since を省略した場合はカーソルに記録された最新時刻を使う
+
+    Returns:
+        古い順の新着イベント、次回のカーソル、取得済みの最新時刻
     """
+    logs_client = logs_client or cloudwatch_logs_client
+    log_group_name = f'/aws/fis/{experiment_id}'
+    stream_tokens, cursor_since = decode_log_cursor(cursor)
+    if since is None:
+        since = cursor_since
+    
     try:
-        response = stepfunctions_client.list_executions(
-            stateMachineArn=STATE_MACHINE_ARN,
-            maxResults=50
+        streams_response = logs_client.describe_log_streams(
+            logGroupName=log_group_name,
+            orderBy='LastEventTime',
+            descending=True,
+            limit=LOG_STREAM_LIMIT
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ResourceNotFoundException':
+            raise
+        # 実験開始直後はロググループがまだ存在しない
+        return {'events': [], 'cursor': encode_log_cursor(stream_tokens, since), 'since': since}
+    
+    stream_names = [stream['logStreamName'] for stream in streams_response.get('logStreams', [])]
+    
+    def fetch_new_events(stream_name: str) -> tuple:
+        params = {
+            'logGroupName': log_group_name,
+            'logStreamName': stream_name,
+            'limit': LOG_EVENTS_PER_STREAM,
+            'startFromHead': True
+        }
+        if stream_name in stream_tokens:
+            params['nextToken'] = stream_tokens[stream_name]
+        elif since is not None:
+            params['startTime'] = since + 1
+        response = logs_client.get_log_events(**params)
+        events = response.get('events', [])
+        for event in events:
+            event['logStreamName'] = stream_name
+        return events, response.get('nextForwardToken', stream_tokens.get(stream_name))
+    
+    next_tokens = dict(stream_tokens)
+    streams = []
+    if stream_names:
+        with ThreadPoolExecutor(max_workers=min(LOG_FETCH_CONCURRENCY, len(stream_names))) as executor:
+            for stream_name, (events, token) in zip(stream_names, executor.map(fetch_new_events, stream_names)):
+                streams.append(events)
+                if token:
+                    next_tokens[stream_name] = token
+    
+    # 各ストリームは古い順に並んでいるため k-way マージで結合
+    events = list(heapq.merge(*streams, key=lambda event: event['timestamp']))
+    latest = events[-1]['timestamp'] if events else since
+    if since is not None and latest is not None:
+        latest = max(since, latest)
+    
+    return {
+        'events': [format_log_event(event) for event in events],
+        'cursor': encode_log_cursor(next_tokens, latest),
+        'since': latest
+    }
+
+def to_ndjson(tail: Dict[str, Any]) -> str:
+    """
+    tail の結果を NDJSON に変換（最終行は次回リクエスト用のカーソル）
+    """
+    lines = [json.dumps(event, ensure_ascii=False) for event in tail['events']]
+    lines.append(json.dumps({'cursor': tail['cursor'], 'since': tail['since']}))
+    return '\n'.join(lines) + '\n'
+
+def get_step_function_executions(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    time_from: Optional[str] = None,
+    time_to: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Step Function実行履歴を取得（cursor によるページング、ListExecutions の順序どおり開始日時の新しい順）
+
+    Args:
+        status: 実行ステータス（RUNNING, SUCCEEDED など。API 側で絞り込む）
+        time_from / time_to: 開始日時の範囲（ISO 8601）
+    """
+    try:
+        position = decode_cursor(cursor)
+        start, end = parse_time(time_from), parse_time(time_to)
+        
+        def fetch_page(token: Optional[str]) -> Dict[str, Any]:
+            params = {'stateMachineArn': STATE_MACHINE_ARN, 'maxResults': EXECUTION_LIST_PAGE_SIZE}
+            if status:
+                params['statusFilter'] = status.upper()
+            if token:
+                params['nextToken'] = token
+            return stepfunctions_client.list_executions(**params)
+        
+        items = iter_items(fetch_page, 'executions', position)
+        if start:
+            # 実行履歴は新しい順に返るため、期間の開始より古い実行に達したら取得を止める
+            items = takewhile(lambda pair: pair[0]['startDate'] >= start, items)
+        
+        page, next_cursor = take_page(
+            items, limit,
+            (lambda execution: execution['startDate'] <= end) if end else None
         )
         
         executions = []
-        for execution in response.get('executions', []):
+        for execution in page:
             executions.append({
                 'execution_arn': execution['executionArn'],
                 'name': execution['name'],
@@ -253,9 +1013,11 @@ def get_step_function_executions() -> Dict[str, Any]:
         
         return {
             'executions': executions,
-            'total': len(executions)
+            'count': len(executions),
+            'limit': limit,
+            'next_cursor': next_cursor
         }
     
     except Exception as e:
         logger.error(f"Error getting step function executions: {str(e)}")
-        return {'executions': [], 'total': 0, 'error': str(e)} 
\ No newline at end of file
+        return {'executions': [], 'count': 0, 'error': str(e)} 
@@ -0,0 +1,117 @@
+import json
+import base64
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+
+
+def encode_cursor(position: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    ページ位置（API の nextToken とページ内オフセット）を不透明なカーソル文字列に変換
+    """
+    if position is None:
+        return None
+    payload = json.dumps(position, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    カーソル文字列をページ位置に戻す
+
+    Raises:
+        ValueError: カーソルが不正な場合
+    """
+    if not cursor:
+        return {'token': None, 'skip': 0}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return {'token': position.get('token'), 'skip': int(position.get('skip', 0))}
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError(f'不正なカーソルです: {cursor}')
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """
+    ISO 8601 形式の時刻を解釈（タイムゾーンがない場合は UTC とみなす）
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def iter_items(
+    fetch_page: Callable[[Optional[str]], Dict[str, Any]],
+    items_key: str,
+    position: Dict[str, Any]
+) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """
+    nextToken でページングする List API の要素を遅延評価で順に返す
+
+    ページは必要になった時点で取得する。再開位置をカーソルにできるよう、
+    各要素の直後の位置（最後の要素の後は None）を組にして返す
+    """
+    token, skip = position['token'], position['skip']
+    while True:
+        response = fetch_page(token)
+        items = response.get(items_key, [])
+        next_token = response.get('nextToken')
+        for index in range(skip, len(items)):
+            if index + 1 < len(items):
+                after = {'token': token, 'skip': index + 1}
+            else:
+                after = {'token': next_token, 'skip': 0} if next_token else None
+            yield items[index], after
+        if not next_token:
+            return
+        token, skip = next_token, 0
+
+
+def take_page(
+    items: Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+    limit: int,
+    predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    max_scan: int = 1000
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    条件に一致する要素を limit 件まで取り出し、次ページのカーソルを返す
+
+    条件に一致しない要素が続く場合も max_scan 件で打ち切り、
+    続きから再開できるカーソルを返す
+    """
+    page = []
+    for scanned, (item, position) in enumerate(items, start=1):
+        if predicate is None or predicate(item):
+            page.append(item)
+        if len(page) >= limit or scanned >= max_scan:
+            return page, encode_cursor(position)
+    # 最後まで取り出した場合は次ページなし
+    return page, None
+
+
+def take_sorted_page(
+    items: List[Dict[str, Any]],
+    limit: int,
+    cursor: Optional[str],
+    sort_key: Callable[[Dict[str, Any]], List[Any]]
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    sort_key の降順に並んだ要素から limit 件を取り出し、次ページのカーソルを返す
+
+    カーソルには前ページの最後の要素のソートキーを記録するため、
+    ページの間に要素が追加・削除されても重複や欠落が起きない
+
+    Raises:
+        ValueError: カーソルが不正な場合
+    """
+    start = 0
+    if cursor:
+        try:
+            after = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))['after']
+            start = next((index for index, item in enumerate(items) if sort_key(item) < after), len(items))
+        except (ValueError, TypeError, KeyError, AttributeError):
+            raise ValueError(f'不正なカーソルです: {cursor}')
+    page = items[start:start + limit]
+    if start + limit >= len(items):
+        return page, None
+    return page, encode_cursor({'after': sort_key(page[-1])})
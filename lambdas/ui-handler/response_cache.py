@@ -0,0 +1,97 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+# S3 への書き込みで無効化するルート（キーのプレフィックス → キャッシュキーのプレフィックス）
+S3_INVALIDATION_PREFIXES: Dict[str, List[str]] = {
+    'scenarios/': ['/scenarios'],
+}
+
+
+def compute_etag(body: str) -> str:
+    """
+    レスポンスボディから強い ETag を計算
+    """
+    return '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def build_cache_key(path: str, query: Optional[Dict[str, str]]) -> str:
+    """
+    パスとクエリパラメータ（順不同）からキャッシュキーを作成
+    """
+    if not query:
+        return path
+    return path + '?' + '&'.join(f'{name}={query[name]}' for name in sorted(query))
+
+
+class ResponseCache:
+    """
+    ウォームな Lambda コンテナ内で共有される GET レスポンスの LRU キャッシュ
+
+    TTL はエントリごとに指定する（ルーティングテーブルでルートごとに設定）
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        有効期限内のエントリを返す
+
+        Returns:
+            body, etag, max_age（残り秒数）を含む辞書
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, body, etag = entry
+                remaining = expires_at - time.time()
+                if remaining > 0:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return {'body': body, 'etag': etag, 'max_age': int(remaining)}
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, body: str, ttl: int) -> str:
+        """
+        エントリを保存し、ETag を返す
+        """
+        etag = compute_etag(body)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def invalidate(self, prefix: str = '') -> int:
+        """
+        キャッシュキーが prefix で始まるエントリを削除し、削除件数を返す
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def invalidate_for_s3_keys(self, keys: List[str]) -> int:
+        """
+        S3 に書き込まれたオブジェクトキーに対応するルートのキャッシュを無効化
+        """
+        removed = 0
+        for s3_prefix, route_prefixes in S3_INVALIDATION_PREFIXES.items():
+            if any(key.startswith(s3_prefix) for key in keys):
+                for route_prefix in route_prefixes:
+                    removed += self.invalidate(route_prefix)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
@@ -0,0 +1,226 @@
+import re
+import json
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+# パスパラメータの型（{name:type} で指定。省略時は str）
+PARAM_TYPES: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    'str': (r'[^/]+', str),
+    'int': (r'\d+', int),
+    'slug': (r'[A-Za-z0-9][A-Za-z0-9_.-]*', str),
+}
+
+PARAM_PATTERN = re.compile(r'^\{(?P<name>[A-Za-z_][A-Za-z0-9_]*)(?::(?P<type>[a-z]+))?\}$')
+
+
+class Request:
+    """
+    API Gateway（プロキシ統合）のイベントから作成するリクエスト
+    """
+
+    def __init__(self, event: Dict[str, Any]):
+        self.event = event
+        self.method = event.get('httpMethod', 'GET')
+        self.path = event.get('path', '')
+        self.query: Dict[str, str] = event.get('queryStringParameters') or {}
+        self.headers: Dict[str, str] = {
+            name.lower(): value for name, value in (event.get('headers') or {}).items()
+        }
+        self.path_params: Dict[str, Any] = {}
+        self.route: Optional['Route'] = None
+
+
+class Response:
+    """
+    ルートハンドラーとミドルウェアが返すレスポンス
+
+    body が文字列以外の場合はインデントなしの JSON（UTF-8 のまま）に変換して返す
+    """
+
+    def __init__(
+        self,
+        body: Any = None,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        content_type: str = 'application/json; charset=utf-8'
+    ):
+        self.body = body
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        self.headers.setdefault('Content-Type', content_type)
+        self.is_base64_encoded = False
+        self._has_error_body = isinstance(body, dict) and 'error' in body
+
+    @property
+    def text(self) -> str:
+        if not isinstance(self.body, str):
+            # 変換結果を保持し、ミドルウェアごとに再変換しない
+            self.body = json.dumps(self.body, ensure_ascii=False, separators=(',', ':'))
+        return self.body
+
+    @property
+    def is_error(self) -> bool:
+        return self.status_code >= 400 or self._has_error_body
+
+    def to_proxy(self, base_headers: Dict[str, str]) -> Dict[str, Any]:
+        """
+        API Gateway のプロキシ統合のレスポンス形式に変換
+        """
+        return {
+            'statusCode': self.status_code,
+            'headers': {**base_headers, **self.headers},
+            'body': self.text,
+            'isBase64Encoded': self.is_base64_encoded
+        }
+
+
+Handler = Callable[[Request], Response]
+Middleware = Callable[[Request, Handler], Response]
+
+
+class Route:
+    """
+    メソッドとパスパターンに対応するルート
+
+    ミドルウェアは登録時に外側から順に合成しておく
+    """
+
+    def __init__(self, name: str, method: str, pattern: str, handler: Handler, middleware: List[Middleware]):
+        self.name = name
+        self.method = method
+        self.pattern = pattern
+        self.handler = handler
+        self.middleware = middleware
+        self.call = compose(middleware, handler)
+
+
+def compose(middleware: List[Middleware], handler: Handler) -> Handler:
+    """
+    ミドルウェアを合成（リストの先頭が最も外側）
+    """
+    for hook in reversed(middleware):
+        handler = (lambda hook, inner: lambda request: hook(request, inner))(hook, handler)
+    return handler
+
+
+class _Node:
+    __slots__ = ('static', 'param', 'routes')
+
+    def __init__(self):
+        self.static: Dict[str, '_Node'] = {}
+        # (パラメータ名, 正規表現, 変換関数, 子ノード)
+        self.param: Optional[Tuple[str, 're.Pattern', Callable[[str], Any], '_Node']] = None
+        self.routes: Dict[str, Route] = {}
+
+
+class RouteNotFound(Exception):
+    pass
+
+
+class MethodNotAllowed(Exception):
+    def __init__(self, allowed: List[str]):
+        super().__init__(', '.join(allowed))
+        self.allowed = allowed
+
+
+class Router:
+    """
+    パスのセグメント単位のトライ木でルートを解決するディスパッチャー
+
+    探索はパスの深さに比例し、各階層では固定セグメントをパラメータより優先する
+    """
+
+    def __init__(self, middleware: Optional[List[Middleware]] = None):
+        self.middleware = list(middleware or [])
+        self.routes: List[Route] = []
+        self._root = _Node()
+
+    def add_route(
+        self,
+        method: str,
+        pattern: str,
+        handler: Handler,
+        name: Optional[str] = None,
+        middleware: Optional[List[Middleware]] = None
+    ) -> Route:
+        """
+        ルートを登録
+
+        Args:
+            pattern: '/fis/experiments/{experiment_id:slug}' のようなパスパターン
+            middleware: このルートのみに適用するミドルウェア（共通ミドルウェアの内側）
+        """
+        node = self._root
+        for segment in split_path(pattern):
+            match = PARAM_PATTERN.match(segment)
+            if not match:
+                node = node.static.setdefault(segment, _Node())
+                continue
+            param_name, param_type = match.group('name'), match.group('type') or 'str'
+            if param_type not in PARAM_TYPES:
+                raise ValueError(f"不明なパラメータ型です: {param_type} ({pattern})")
+            if node.param is None:
+                regex, convert = PARAM_TYPES[param_type]
+                node.param = (param_name, re.compile(f'^{regex}$'), convert, _Node())
+            elif node.param[0] != param_name:
+                raise ValueError(f"同じ階層に異なるパラメータは登録できません: {pattern}")
+            node = node.param[3]
+
+        if method in node.routes:
+            raise ValueError(f"ルートが重複しています: {method} {pattern}")
+        route = Route(name or f'{method} {pattern}', method, pattern, handler, self.middleware + list(middleware or []))
+        node.routes[method] = route
+        self.routes.append(route)
+        return route
+
+    def route(self, method: str, pattern: str, name: Optional[str] = None, middleware: Optional[List[Middleware]] = None):
+        """
+        add_route のデコレーター版
+        """
+        def decorator(handler: Handler) -> Handler:
+            self.add_route(method, pattern, handler, name, middleware)
+            return handler
+        return decorator
+
+    def resolve(self, method: str, path: str) -> Tuple[Route, Dict[str, Any]]:
+        """
+        メソッドとパスからルートとパスパラメータを解決
+
+        Raises:
+            RouteNotFound: パスに一致するルートがない場合
+            MethodNotAllowed: パスは一致するがメソッドが登録されていない場合
+        """
+        node = self._root
+        params: Dict[str, Any] = {}
+        for segment in split_path(path):
+            child = node.static.get(segment)
+            if child is None:
+                if node.param is None or not node.param[1].match(segment):
+                    raise RouteNotFound(path)
+                param_name, _, convert, child = node.param
+                params[param_name] = convert(segment)
+            node = child
+
+        if not node.routes:
+            raise RouteNotFound(path)
+        if method not in node.routes:
+            raise MethodNotAllowed(sorted(node.routes))
+        return node.routes[method], params
+
+    def dispatch(self, request: Request) -> Response:
+        """
+        リクエストをルートに振り分けて実行
+        """
+        try:
+            route, params = self.resolve(request.method, request.path)
+        except RouteNotFound:
+            return Response({'error': 'Not Found'}, status_code=404)
+        except MethodNotAllowed as e:
+            return Response({'error': 'Method Not Allowed'}, status_code=405, headers={'Allow': ', '.join(e.allowed)})
+
+        request.route = route
+        request.path_params = params
+        return route.call(request)
+
+
+def split_path(path: str) -> List[str]:
+    return [segment for segment in path.split('/') if segment]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+CDKCodeGenerator のマイクロベンチマーク
+
+現在の実装と、テンプレートレジストリ導入前の実装（git の履歴から取得）で
+1,000 シナリオ分の CDK コード生成スループットを比較する。
+
+使い方:
+    python scripts/benchmark_cdk_codegen.py [--scenarios 1000] [--repeat 20] [--baseline-rev REV]
+"""
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANALYZER_DIR = os.path.join(ROOT_DIR, 'lambdas', 'scenario-analyzer')
+CODEGEN_PATH = 'lambdas/scenario-analyzer/cdk_codegen.py'
+
+SERVICES = ['EC2', 'RDS', 'S3', 'Lambda', 'ELB', 'VPC', 'CloudWatch', 'SNS', 'SQS', 'DynamoDB', 'ECS', 'EKS']
+
+
+def find_baseline_rev() -> str:
+    """
+    テンプレートレジストリを導入したコミットの親を返す
+    """
+    output = subprocess.check_output(
+        ['git', 'log', '--reverse', '--format=%H', '-S', 'register_service_template', '--', CODEGEN_PATH],
+        cwd=ROOT_DIR,
+        text=True
+    ).split()
+    if not output:
+        raise RuntimeError('テンプレートレジストリ導入前のリビジョンが見つかりません')
+    return f'{output[0]}^'
+
+
+def load_module(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_baseline(rev: str):
+    source = subprocess.check_output(['git', 'show', f'{rev}:{CODEGEN_PATH}'], cwd=ROOT_DIR)
+    with tempfile.NamedTemporaryFile('wb', suffix='.py', delete=False) as f:
+        f.write(source)
+    try:
+        return load_module('cdk_codegen_baseline', f.name)
+    finally:
+        os.remove(f.name)
+
+
+def build_scenarios(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        (
+            rng.sample(SERVICES, rng.randint(1, len(SERVICES))),
+            {'scenario_name': f'Chaos Scenario-{index}'}
+        )
+        for index in range(count)
+    ]
+
+
+def measure(generator_class, scenarios, repeat: int) -> float:
+    """
+    最速の試行でのスループット（シナリオ/秒）を返す
+    """
+    best = None
+    for _ in range(repeat):
+        generator = generator_class()
+        started_at = time.perf_counter()
+        for aws_services, scenario_json in scenarios:
+            generator.generate_cdk_code(aws_services, scenario_json)
+        elapsed = time.perf_counter() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+    return len(scenarios) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--baseline-rev', default=None, help='比較対象のリビジョン（既定: レジストリ導入前）')
+    args = parser.parse_args()
+
+    sys.path.insert(0, ANALYZER_DIR)
+    current = load_module('cdk_codegen_current', os.path.join(ANALYZER_DIR, 'cdk_codegen.py'))
+    baseline = load_baseline(args.baseline_rev or find_baseline_rev())
+
+    scenarios = build_scenarios(args.scenarios)
+    baseline_rate = measure(baseline.CDKCodeGenerator, scenarios, args.repeat)
+    current_rate = measure(current.CDKCodeGenerator, scenarios, args.repeat)
+
+    print(f'scenarios: {args.scenarios}, repeat: {args.repeat}')
+    print(f'baseline: {baseline_rate:,.0f} scenarios/s')
+    print(f'current:  {current_rate:,.0f} scenarios/s')
+    print(f'speedup:  {current_rate / baseline_rate:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
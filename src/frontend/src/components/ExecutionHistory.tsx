@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react'
-import { Clock, CheckCircle, XCircle, Play, Pause, AlertTriangle } from 'lucide-react'
+import { Clock, CheckCircle, XCircle, Play, Pause, AlertTriangle, RefreshCw } from 'lucide-react'
 import { useApi } from '../contexts/ApiContext'
 
 interface StepFunctionExecution {
@@ -12,12 +12,15 @@ interface StepFunctionExecution {
 
 interface ExecutionHistoryResponse {
   executions: StepFunctionExecution[]
-  total: number
+  count: number
+  next_cursor?: string | null
 }
 
 const ExecutionHistory: React.FC = () => {
   const [executions, setExecutions] = useState<StepFunctionExecution[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const { api } = useApi()
 
@@ -26,6 +29,7 @@ const ExecutionHistory: React.FC = () => {
       setLoading(true)
       const response = await api.get<ExecutionHistoryResponse>('/executions')
       setExecutions(response.data.executions)
+      setNextCursor(response.data.next_cursor ?? null)
       setError(null)
     } catch (err) {
       setError('実行履歴の取得に失敗しました')
@@ -35,6 +39,24 @@ const ExecutionHistory: React.FC = () => {
     }
   }
 
+  // 次のページ（より古い実行）を取得して一覧の末尾に追加
+  const fetchMoreExecutions = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const response = await api.get<ExecutionHistoryResponse>('/executions', {
+        params: { cursor: nextCursor }
+      })
+      setExecutions(prev => [...prev, ...response.data.executions])
+      setNextCursor(response.data.next_cursor ?? null)
+    } catch (err) {
+      setError('実行履歴の取得に失敗しました')
+      console.error('Error fetching more executions:', err)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   useEffect(() => {
     fetchExecutions()
   }, [])
@@ -222,6 +244,19 @@ const ExecutionHistory: React.FC = () => {
           </div>
         )}
       </div>
+
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={fetchMoreExecutions}
+            className="btn btn-outline btn-sm"
+            disabled={loadingMore}
+          >
+            <RefreshCw className={`h-4 w-4 mr-2 ${loadingMore ? 'animate-spin' : ''}`} />
+            さらに読み込む
+          </button>
+        </div>
+      )}
     </div>
   )
 }
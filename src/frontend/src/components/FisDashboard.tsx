@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react'
-import { Zap, Play, Pause, CheckCircle, XCircle, Clock, AlertTriangle } from 'lucide-react'
+import { Zap, Play, Pause, CheckCircle, XCircle, Clock, AlertTriangle, RefreshCw } from 'lucide-react'
 import { useApi } from '../contexts/ApiContext'
 
 interface FisExperiment {
@@ -24,14 +24,21 @@ interface FisExperimentDetail {
 
 interface FisExperimentsResponse {
   experiments: FisExperiment[]
-  total: number
+  count: number
+  next_cursor?: string | null
 }
 
+// FIS の一覧 API は並び順を保証しないため、取得済みの実験を作成日時の新しい順に並べる
+const sortByCreationTime = (experiments: FisExperiment[]) =>
+  [...experiments].sort((a, b) => (b.creation_time ?? '').localeCompare(a.creation_time ?? ''))
+
 const FisDashboard: React.FC = () => {
   const [experiments, setExperiments] = useState<FisExperiment[]>([])
   const [selectedExperiment, setSelectedExperiment] = useState<string | null>(null)
   const [experimentDetail, setExperimentDetail] = useState<FisExperimentDetail | null>(null)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [detailLoading, setDetailLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const { api } = useApi()
@@ -40,7 +47,8 @@ const FisDashboard: React.FC = () => {
     try {
       setLoading(true)
       const response = await api.get<FisExperimentsResponse>('/fis/experiments')
-      setExperiments(response.data.experiments)
+      setExperiments(sortByCreationTime(response.data.experiments))
+      setNextCursor(response.data.next_cursor ?? null)
       setError(null)
     } catch (err) {
       setError('FIS実験の取得に失敗しました')
@@ -50,6 +58,24 @@ const FisDashboard: React.FC = () => {
     }
   }
 
+  // 次のページを取得して一覧に追加
+  const fetchMoreExperiments = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const response = await api.get<FisExperimentsResponse>('/fis/experiments', {
+        params: { cursor: nextCursor }
+      })
+      setExperiments(prev => sortByCreationTime([...prev, ...response.data.experiments]))
+      setNextCursor(response.data.next_cursor ?? null)
+    } catch (err) {
+      setError('FIS実験の取得に失敗しました')
+      console.error('Error fetching more experiments:', err)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const fetchExperimentDetail = async (experimentId: string) => {
     try {
       setDetailLoading(true)
@@ -213,6 +239,18 @@ const FisDashboard: React.FC = () => {
               ))
             )}
           </div>
+          {nextCursor && (
+            <div className="flex justify-center">
+              <button
+                onClick={fetchMoreExperiments}
+                className="btn btn-outline btn-sm"
+                disabled={loadingMore}
+              >
+                <RefreshCw className={`h-4 w-4 mr-2 ${loadingMore ? 'animate-spin' : ''}`} />
+                さらに読み込む
+              </button>
+            </div>
+          )}
         </div>
 
         {/* Experiment Detail */}
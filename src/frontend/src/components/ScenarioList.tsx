@@ -15,11 +15,15 @@ interface Scenario {
 interface ScenarioListResponse {
   scenarios: Scenario[]
   total: number
+  next_cursor?: string | null
 }
 
 const ScenarioList: React.FC = () => {
   const [scenarios, setScenarios] = useState<Scenario[]>([])
+  const [total, setTotal] = useState(0)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [searchTerm, setSearchTerm] = useState('')
   const { api } = useApi()
@@ -29,6 +33,8 @@ const ScenarioList: React.FC = () => {
       setLoading(true)
       const response = await api.get<ScenarioListResponse>('/scenarios')
       setScenarios(response.data.scenarios)
+      setTotal(response.data.total)
+      setNextCursor(response.data.next_cursor ?? null)
       setError(null)
     } catch (err) {
       setError('シナリオの取得に失敗しました')
@@ -38,6 +44,25 @@ const ScenarioList: React.FC = () => {
     }
   }
 
+  // 次のページを取得して一覧の末尾に追加
+  const fetchMoreScenarios = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const response = await api.get<ScenarioListResponse>('/scenarios', {
+        params: { cursor: nextCursor }
+      })
+      setScenarios(prev => [...prev, ...response.data.scenarios])
+      setTotal(response.data.total)
+      setNextCursor(response.data.next_cursor ?? null)
+    } catch (err) {
+      setError('シナリオの取得に失敗しました')
+      console.error('Error fetching more scenarios:', err)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   useEffect(() => {
     fetchScenarios()
   }, [])
@@ -129,7 +154,7 @@ const ScenarioList: React.FC = () => {
         <h2 className="text-2xl font-bold text-foreground">シナリオ一覧</h2>
         <div className="flex items-center space-x-2">
           <span className="text-sm text-muted-foreground">
-            {filteredScenarios.length} / {scenarios.length} シナリオ
+            {filteredScenarios.length} / {total} シナリオ
           </span>
           <button 
             onClick={fetchScenarios}
@@ -207,6 +232,20 @@ const ScenarioList: React.FC = () => {
           ))
         )}
       </div>
+
+      {/* Load More */}
+      {nextCursor && (
+        <div className="flex justify-center">
+          <button
+            onClick={fetchMoreScenarios}
+            className="btn btn-outline btn-sm"
+            disabled={loadingMore}
+          >
+            <RefreshCw className={`h-4 w-4 mr-2 ${loadingMore ? 'animate-spin' : ''}`} />
+            さらに読み込む
+          </button>
+        </div>
+      )}
     </div>
   )
 }
@@ -0,0 +1,39 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+LAMBDAS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambdas')
+
+# 各 Lambda のモジュールを直接インポートできるようにする（handler.py は名前が重複するため個別に読み込む）
+for name in ('deployer', 'scenario-generator', 'scenario-analyzer', 'ui-handler'):
+    path = os.path.join(LAMBDAS_DIR, name)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+
+@pytest.fixture(scope='session')
+def ui_handler():
+    """
+    UI Handler の handler.py（他の Lambda の handler.py と区別するため別名で読み込む）
+    """
+    spec = importlib.util.spec_from_file_location('ui_handler', os.path.join(LAMBDAS_DIR, 'ui-handler', 'handler.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def scenario_generator():
+    """
+    Scenario Generator の handler.py（他の Lambda の handler.py と区別するため別名で読み込む）
+    """
+    spec = importlib.util.spec_from_file_location(
+        'scenario_generator_handler', os.path.join(LAMBDAS_DIR, 'scenario-generator', 'handler.py')
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from orchestrator import plan_stack_order, run_stack_deployments
+
+
+class FakeCloudFormation:
+    """
+    create_stack の呼び出しを記録し、指定したスタックを失敗させる CloudFormation クライアント
+    """
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.created = []
+        self._lock = threading.Lock()
+
+    def create_stack(self, StackName, **kwargs):
+        with self._lock:
+            self.created.append(StackName)
+        if StackName in self.failing:
+            raise ValueError(f"Stack operation failed: ROLLBACK_COMPLETE ({StackName})")
+        return {'StackId': f'arn:aws:cloudformation:us-east-1:123456789012:stack/{StackName}/1'}
+
+
+def deploy_with(client):
+    def deploy(spec):
+        response = client.create_stack(StackName=spec['stack_name'])
+        return {'stack_id': response['StackId']}
+    return deploy
+
+
+def test_plan_stack_order_respects_dependencies():
+    stacks = [
+        {'stack_name': 'app', 'depends_on': ['network', 'db']},
+        {'stack_name': 'db', 'depends_on': ['network']},
+        {'stack_name': 'network'},
+    ]
+
+    order = plan_stack_order(stacks)
+
+    assert order.index('network') < order.index('db') < order.index('app')
+
+
+def test_plan_stack_order_rejects_cycle():
+    stacks = [
+        {'stack_name': 'a', 'depends_on': ['b']},
+        {'stack_name': 'b', 'depends_on': ['a']},
+    ]
+
+    with pytest.raises(ValueError, match='循環'):
+        plan_stack_order(stacks)
+
+
+def test_plan_stack_order_rejects_unknown_dependency():
+    with pytest.raises(ValueError, match='未定義'):
+        plan_stack_order([{'stack_name': 'a', 'depends_on': ['missing']}])
+
+
+def test_run_stack_deployments_skips_dependents_of_failed_stack():
+    client = FakeCloudFormation(failing=['db'])
+    stacks = [
+        {'stack_name': 'network'},
+        {'stack_name': 'db', 'depends_on': ['network']},
+        {'stack_name': 'app', 'depends_on': ['db']},
+        {'stack_name': 'monitoring', 'depends_on': ['network']},
+    ]
+
+    outcome = run_stack_deployments(stacks, deploy_with(client), max_concurrency=2)
+
+    statuses = {result['stack_name']: result['status'] for result in outcome['results']}
+    assert statuses == {'network': 'SUCCEEDED', 'db': 'FAILED', 'app': 'SKIPPED', 'monitoring': 'SUCCEEDED'}
+    assert 'app' not in client.created
+    assert outcome['summary']['failed'] == 1
+    assert outcome['summary']['skipped'] == 1
+
+
+def test_run_stack_deployments_marks_dependents_of_in_progress_stack_not_started():
+    stacks = [
+        {'stack_name': 'db'},
+        {'stack_name': 'app', 'depends_on': ['db']},
+    ]
+
+    outcome = run_stack_deployments(stacks, lambda spec: {'status': 'IN_PROGRESS'})
+
+    statuses = {result['stack_name']: result['status'] for result in outcome['results']}
+    assert statuses == {'db': 'IN_PROGRESS', 'app': 'NOT_STARTED'}
+    assert outcome['summary']['in_progress'] == 1
+    assert outcome['summary']['not_started'] == 1
+
+
+def test_run_stack_deployments_does_not_start_after_deadline():
+    client = FakeCloudFormation()
+
+    outcome = run_stack_deployments(
+        [{'stack_name': 'a'}, {'stack_name': 'b'}],
+        deploy_with(client),
+        deadline=time.time() - 1
+    )
+
+    assert client.created == []
+    assert {result['status'] for result in outcome['results']} == {'NOT_STARTED'}
+
+
+def test_run_stack_deployments_bounds_concurrency():
+    lock = threading.Lock()
+    in_flight = {'current': 0, 'max': 0}
+
+    def deploy(spec):
+        with lock:
+            in_flight['current'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['current'])
+        time.sleep(0.02)
+        with lock:
+            in_flight['current'] -= 1
+        return {}
+
+    outcome = run_stack_deployments([{'stack_name': f's{i}'} for i in range(6)], deploy, max_concurrency=2)
+
+    assert outcome['summary']['succeeded'] == 6
+    assert in_flight['max'] <= 2
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+from reaper import select_deleting_stacks, select_expired_stacks, select_recently_deleted, summarize_reclaimed
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def stack(name, hours, status='CREATE_COMPLETE', tags=None):
+    tags = {'Project': 'ChaosEngineering'} if tags is None else tags
+    return {
+        'StackName': name,
+        'StackId': f'id/{name}',
+        'StackStatus': status,
+        'CreationTime': NOW - timedelta(hours=hours),
+        'Tags': [{'Key': key, 'Value': value} for key, value in tags.items()]
+    }
+
+
+def test_select_expired_stacks_skips_in_progress_except_review_and_untagged():
+    stacks = [
+        stack('chaos-engineering-old', 48),
+        stack('chaos-engineering-new', 2),
+        stack('chaos-engineering-busy', 48, 'UPDATE_IN_PROGRESS'),
+        stack('chaos-engineering-deleting', 48, 'DELETE_IN_PROGRESS'),
+        stack('chaos-engineering-notag', 48, tags={}),
+        stack('other', 99),
+        stack('chaos-engineering-failed', 72, 'DELETE_FAILED'),
+        stack('chaos-engineering-review', 30, 'REVIEW_IN_PROGRESS'),
+    ]
+
+    expired = select_expired_stacks(stacks, NOW, 24 * 3600)
+
+    assert [s['stack_name'] for s in expired] == [
+        'chaos-engineering-failed', 'chaos-engineering-old', 'chaos-engineering-review'
+    ]
+    assert select_deleting_stacks(stacks) == ['chaos-engineering-deleting']
+
+
+def test_select_recently_deleted_uses_window_and_prefix():
+    summaries = [
+        {'StackName': 'chaos-engineering-a', 'DeletionTime': NOW - timedelta(minutes=30)},
+        {'StackName': 'chaos-engineering-b', 'DeletionTime': NOW - timedelta(days=2)},
+        {'StackName': 'other', 'DeletionTime': NOW},
+    ]
+
+    deleted = select_recently_deleted(summaries, NOW, 2 * 3600)
+
+    assert [d['stack_name'] for d in deleted] == ['chaos-engineering-a']
+
+
+def test_summarize_reclaimed_counts_only_started_deletions():
+    results = [
+        {'status': 'DELETING', 'resources': [{'resource_type': 'AWS::EC2::VPC'}, {'resource_type': 'AWS::RDS::DBInstance'}]},
+        {'status': 'DELETING', 'resources': [{'resource_type': 'AWS::EC2::VPC'}]},
+        {'status': 'FAILED', 'error': 'AccessDenied'},
+    ]
+
+    assert summarize_reclaimed(results) == {
+        'stacks': 2,
+        'resources': 3,
+        'resources_by_type': {'AWS::EC2::VPC': 2, 'AWS::RDS::DBInstance': 1}
+    }
@@ -0,0 +1,49 @@
+import pytest
+
+from cdk_codegen import CDKCodeGenerator, CodeTemplate
+
+
+def test_code_template_fills_only_known_slots():
+    template = CodeTemplate("class {safe_name}Stack { id = '{scenario_name}'; x = `${{a}}`; {unknown} }")
+
+    assert template.render('Demo', 'demo', 'Demo Scenario') == (
+        "class DemoStack { id = 'Demo Scenario'; x = `${{a}}`; {unknown} }"
+    )
+
+
+def test_code_template_does_not_evaluate_slot_values():
+    template = CodeTemplate('{safe_name}-{safe_name_lower}')
+
+    assert template.render('{__import__("os")}', '{{x}}') == '{__import__("os")}-{{x}}'
+
+
+def test_code_template_rejects_missing_slot_values():
+    template = CodeTemplate('{safe_name}/{scenario_name}')
+
+    with pytest.raises(ValueError, match='scenario_name'):
+        template.render('Demo', 'demo')
+    with pytest.raises(ValueError, match='safe_name'):
+        template.render(None, 'demo', 'Demo Scenario')
+
+
+def test_code_template_fill_and_join_inline_sections():
+    resources = CodeTemplate.join('\n', [CodeTemplate('a {safe_name}'), CodeTemplate('b {safe_name_lower}')])
+    template = CodeTemplate('{imports_section}|{resources_section}|{scenario_name}').fill(
+        imports_section='import { X }', resources_section=resources
+    )
+
+    assert template.render('Demo', 'demo', 'S') == 'import { X }|a Demo\nb demo|S'
+
+
+def test_generate_cdk_code_renders_registered_resources():
+    code = CDKCodeGenerator().generate_cdk_code(['EC2', 'S3', 'Unknown'], {'scenario_name': 'My Test-1'})
+
+    # EC2 の前提リソース（VPC・セキュリティグループ）が依存関係の順に出力される
+    assert code.index("new ec2.Vpc(this, 'MyTest1Vpc'") < code.index("new ec2.SecurityGroup(this, 'MyTest1SecurityGroup'")
+    assert code.index("new ec2.SecurityGroup(") < code.index("new ec2.Instance(this, 'MyTest1Instance'")
+    assert "keyName: 'mytest1-key'" in code
+    assert "bucketName: `mytest1-chaos-test-${cdk.Aws.ACCOUNT_ID}-${cdk.Aws.REGION}`" in code
+    assert "import * as s3 from 'aws-cdk-lib/aws-s3';" in code
+    assert "cdk.Tags.of(this).add('Scenario', 'My Test-1');" in code
+    assert 'export class MyTest1Stack extends cdk.Stack {' in code
+    assert '{safe_name}' not in code and '{resources_section}' not in code
@@ -0,0 +1,128 @@
+import io
+import json
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from batch_generation import run_batch_generation
+
+
+def throttling_error():
+    return ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'slow down'}}, 'InvokeModel')
+
+
+def test_items_not_started_before_deadline_are_reported():
+    items = [{'index': index} for index in range(6)]
+    deadline = time.time() + 0.2
+
+    def generate(item):
+        # 最初の 2 件が期限を過ぎるまで実行中のままにする
+        time.sleep(max(0.0, deadline - time.time()) + 0.01)
+        return {'index': item['index']}
+
+    result = run_batch_generation(items, generate, max_concurrency=2, deadline=deadline)
+
+    assert [r['status'] for r in result['results']] == ['SUCCEEDED'] * 2 + ['NOT_STARTED'] * 4
+    assert result['summary']['not_started'] == 4
+    assert result['summary']['failed'] == 0
+
+
+def test_throttled_item_gives_up_at_deadline():
+    calls = []
+
+    def generate(item):
+        calls.append(item['index'])
+        raise throttling_error()
+
+    result = run_batch_generation(
+        [{'index': 0}], generate, max_attempts=1000, base_delay=0.05, deadline=time.time() + 0.1
+    )
+
+    assert result['results'][0]['status'] == 'FAILED'
+    assert result['results'][0]['error'] == 'Lambda の実行時間内に生成を開始できませんでした'
+    assert len(calls) == result['results'][0]['attempts']
+    assert result['summary']['failed'] == 1 and result['summary']['not_started'] == 0
+
+
+def test_failures_propagate_without_deadline():
+    def generate(item):
+        if item['index'] == 1:
+            raise ValueError('invalid scenario')
+        return {}
+
+    result = run_batch_generation([{'index': 0}, {'index': 1}], generate)
+
+    assert [r['status'] for r in result['results']] == ['SUCCEEDED', 'FAILED']
+    assert result['summary']['failed'] == 1 and result['summary']['not_started'] == 0
+
+
+class FakeBedrock:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke_model(self, modelId, body, contentType):
+        self.calls += 1
+        text = json.dumps({'scenario_name': f'scenario-{self.calls}'})
+        return {'body': io.BytesIO(json.dumps({'content': [{'text': text}]}).encode('utf-8'))}
+
+
+class FakeS3:
+    def __init__(self):
+        self.saved = {}
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        template = {'template': {'prompt': 'p', 'model_id': 'm', 'max_tokens': 10, 'temperature': 0}}
+        return {'Body': io.BytesIO(json.dumps(template).encode('utf-8')), 'ETag': '"t"'}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.saved[Key] = json.loads(Body)
+
+
+class FakeContext:
+    def __init__(self, remaining_seconds):
+        self.remaining_seconds = remaining_seconds
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_seconds * 1000
+
+
+@pytest.fixture
+def batch(scenario_generator, monkeypatch):
+    bedrock, s3 = FakeBedrock(), FakeS3()
+    monkeypatch.setattr(scenario_generator, 'batch_bedrock_client', bedrock)
+    # SDK 内で再試行するクライアントはバッチ生成では使わない
+    monkeypatch.setattr(scenario_generator, 'bedrock_client', None)
+    monkeypatch.setattr(scenario_generator, 's3_client', s3)
+    return bedrock, s3
+
+
+def test_batch_handler_uses_single_attempt_client(scenario_generator, batch):
+    bedrock, s3 = batch
+
+    response = scenario_generator.batch_handler(
+        {'bucket_name': 'b', 'variants': ['a', 'b', 'c'], 'batch_id': 'x', 'max_concurrency': 1000},
+        FakeContext(900)
+    )
+
+    body = json.loads(response['body'])
+    assert response['statusCode'] == 200 and body['summary']['succeeded'] == 3
+    assert bedrock.calls == 3 and sorted(s3.saved) == ['scenarios/x-000.json', 'scenarios/x-001.json', 'scenarios/x-002.json']
+
+
+def test_batch_handler_reserves_time_for_the_last_call(scenario_generator, batch):
+    bedrock, _ = batch
+
+    response = scenario_generator.batch_handler(
+        {'bucket_name': 'b', 'variants': ['a', 'b']}, FakeContext(scenario_generator.BATCH_RESERVED_SECONDS - 1)
+    )
+
+    body = json.loads(response['body'])
+    assert bedrock.calls == 0
+    assert body['remaining_variants'] == ['a', 'b']
+
+
+@pytest.mark.parametrize('requested, expected', [(1000, 20), (0, 1), (8, 8)])
+def test_batch_concurrency_is_clamped_to_pool_size(scenario_generator, requested, expected):
+    assert scenario_generator.BEDROCK_MAX_POOL_CONNECTIONS == 20
+    assert scenario_generator.resolve_batch_concurrency({'max_concurrency': requested}) == expected
@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from generation_cache import GenerationCache, MemoryCacheBackend
+
+
+def test_counters_are_consistent_under_concurrent_access():
+    cache = GenerationCache(MemoryCacheBackend(max_entries=1000))
+    for i in range(0, 2000, 2):
+        cache.put(f'key-{i}', 'value')
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(cache.get, [f'key-{i}' for i in range(2000)] * 4))
+
+    assert cache.stats()['hits'] + cache.stats()['misses'] == 8000
+    assert cache.hits == 4000 and cache.misses == 4000
+
+
+def test_counters_are_per_instance():
+    backend = MemoryCacheBackend()
+    backend.put('shared', 'value')
+    first, second = GenerationCache(backend), GenerationCache(backend)
+
+    first.get('shared')
+    second.get('missing')
+
+    assert (first.hits, first.misses) == (1, 0)
+    assert (second.hits, second.misses) == (0, 1)
+
+
+def test_generation_cache_instances_are_bounded(scenario_generator, monkeypatch):
+    monkeypatch.setattr(scenario_generator, '_generation_caches', type(scenario_generator._generation_caches)())
+    first = scenario_generator.get_generation_cache({'cache_backend': 'memory', 'cache_ttl': 0}, None, None)
+
+    for ttl in range(1, 100):
+        scenario_generator.get_generation_cache({'cache_backend': 'memory', 'cache_ttl': ttl}, None, None)
+
+    assert len(scenario_generator._generation_caches) == scenario_generator.MAX_GENERATION_CACHES
+    assert scenario_generator.get_generation_cache({'cache_backend': 'memory', 'cache_ttl': 0}, None, None) is not first
+    latest = scenario_generator.get_generation_cache({'cache_backend': 'memory', 'cache_ttl': 99}, None, None)
+    assert scenario_generator.get_generation_cache({'cache_backend': 'memory', 'cache_ttl': 99}, None, None) is latest
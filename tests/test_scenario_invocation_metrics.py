@@ -0,0 +1,60 @@
+import importlib.util
+import json
+import os
+import sys
+import time
+
+from botocore.exceptions import ClientError
+
+GENERATOR_HANDLER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lambdas', 'scenario-generator', 'handler.py'
+)
+
+
+class FailingS3:
+    def get_object(self, **params):
+        raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'GetObject')
+
+
+def invocation_metrics(caplog):
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.getMessage().startswith('{"metric"')]
+    return [record for record in records if record['metric'] == 'invocation_latency']
+
+
+def test_failed_invocations_emit_metrics(scenario_generator, monkeypatch, caplog):
+    monkeypatch.setattr(scenario_generator, 's3_client', FailingS3())
+    caplog.set_level('INFO')
+
+    single = scenario_generator.lambda_handler({'bucket_name': 'b'}, None)
+    batch = scenario_generator.batch_handler({'bucket_name': 'b', 'variants': ['a']}, None)
+
+    assert single['statusCode'] == 500 and batch['statusCode'] == 500
+    metrics = invocation_metrics(caplog)
+    assert [(m['handler'], m['succeeded']) for m in metrics] == [('lambda_handler', False), ('batch_handler', False)]
+    assert all(m['duration_ms'] >= 0 for m in metrics)
+
+
+class SlowImportFinder:
+    """
+    指定したモジュールのインポートに時間がかかるようにする（読み込み自体は通常のファインダーに任せる）
+    """
+
+    def __init__(self, name, seconds):
+        self.name = name
+        self.seconds = seconds
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname == self.name:
+            time.sleep(self.seconds)
+        return None
+
+
+def test_module_init_includes_local_module_imports(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'batch_generation', raising=False)
+    monkeypatch.setattr(sys, 'meta_path', [SlowImportFinder('batch_generation', 0.05)] + sys.meta_path)
+    spec = importlib.util.spec_from_file_location('scenario_generator_cold_start', GENERATOR_HANDLER)
+    module = importlib.util.module_from_spec(spec)
+
+    spec.loader.exec_module(module)
+
+    assert module._module_init_ms >= 50
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from scenario_stream import IncrementalScenarioParser, generate_scenario_stream, iter_stream_text
+
+SCENARIO = {
+    'title': 'AZ 障害 {"}" を含む',
+    'steps': [{'action': 'stop', 'targets': ['i-1', 'i-2']}],
+    'duration': 300,
+    'note': 'escaped \\" quote, comma',
+}
+TEXT = '前置きの説明\n```json\n' + json.dumps(SCENARIO, ensure_ascii=False) + '\n```\n以上です。'
+
+
+def chunk_event(payload):
+    return {'chunk': {'bytes': json.dumps(payload, ensure_ascii=False).encode('utf-8')}}
+
+
+def delta_events(text, size):
+    """
+    Bedrock の invoke_model_with_response_stream と同じ形式のイベント列（size 文字ごとの差分）
+    """
+    yield chunk_event({'type': 'message_start', 'message': {'role': 'assistant'}})
+    yield chunk_event({'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}})
+    for i in range(0, len(text), size):
+        yield chunk_event({'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': text[i:i + size]}})
+    yield chunk_event({'type': 'content_block_stop', 'index': 0})
+    yield chunk_event({'type': 'message_stop'})
+
+
+class FakeBedrockStream:
+    def __init__(self, events):
+        self.events = events
+        self.requests = []
+
+    def invoke_model_with_response_stream(self, modelId, body, contentType):
+        self.requests.append({'modelId': modelId, 'body': json.loads(body)})
+        return {'body': iter(self.events)}
+
+
+def feed_all(parser, chunks):
+    fields = []
+    for chunk in chunks:
+        fields.extend(parser.feed(chunk))
+    return fields
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 16])
+def test_feed_with_awkward_chunk_boundaries(size):
+    parser = IncrementalScenarioParser()
+
+    fields = feed_all(parser, [TEXT[i:i + size] for i in range(0, len(TEXT), size)])
+
+    assert parser.complete and parser.error is None
+    assert dict(fields) == SCENARIO
+    assert [key for key, _ in fields] == list(SCENARIO)
+    assert parser.text == TEXT
+
+
+def test_text_is_kept_after_parse_error():
+    parser = IncrementalScenarioParser()
+    text = '{"title": oops, "duration": 300}trailing'
+
+    feed_all(parser, [text[:10], text[10:20], text[20:]])
+
+    assert parser.error is not None
+    assert parser.text == text
+
+
+@pytest.mark.parametrize('size', [1, 5, 13])
+def test_generate_scenario_stream_from_chunk_events(size):
+    client = FakeBedrockStream(list(delta_events(TEXT, size)))
+    received = []
+
+    result = generate_scenario_stream(client, 'model', {'messages': []}, on_field=lambda key, value: received.append(key))
+
+    assert result['generated_text'] == TEXT
+    assert result['scenario'] == SCENARIO
+    assert received == list(SCENARIO) and list(result['field_timings']) == list(SCENARIO)
+    assert result['first_token_ms'] is not None
+    assert client.requests == [{'modelId': 'model', 'body': {'messages': []}}]
+
+
+def test_generate_scenario_stream_returns_no_scenario_for_incomplete_json():
+    text = TEXT[:TEXT.index('"duration"')]
+    client = FakeBedrockStream(list(delta_events(text, 4)))
+
+    result = generate_scenario_stream(client, 'model', {})
+
+    assert result['scenario'] is None
+    assert result['generated_text'] == text
+
+
+def test_iter_stream_text_raises_on_error_event():
+    events = [chunk_event({'type': 'content_block_delta', 'delta': {'text': 'ok'}}), {'throttlingException': {'message': 'slow'}}]
+    stream = iter_stream_text(events)
+
+    assert next(stream) == 'ok'
+    with pytest.raises(RuntimeError, match='throttlingException'):
+        next(stream)
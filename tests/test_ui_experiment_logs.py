@@ -0,0 +1,117 @@
+import pytest
+from botocore.exceptions import ClientError
+
+
+class FakeLogs:
+    """
+    ストリームごとのイベントを保持し、nextForwardToken で続きを返す CloudWatch Logs クライアント
+    """
+
+    def __init__(self, streams=None):
+        self.streams = streams or {}
+        self.requests = []
+        self.missing = False
+
+    def append(self, stream_name, timestamp, message):
+        self.streams.setdefault(stream_name, []).append({'timestamp': timestamp, 'message': message})
+
+    def describe_log_streams(self, logGroupName, orderBy, descending, limit):
+        if self.missing:
+            raise ClientError({'Error': {'Code': 'ResourceNotFoundException', 'Message': 'missing'}}, 'DescribeLogStreams')
+        return {'logStreams': [{'logStreamName': name} for name in self.streams]}
+
+    def get_log_events(self, logGroupName, logStreamName, limit, startFromHead, nextToken=None, startTime=None):
+        self.requests.append({'stream': logStreamName, 'nextToken': nextToken, 'startTime': startTime})
+        events = self.streams[logStreamName]
+        if nextToken is not None:
+            start = int(nextToken.split('/')[-1])
+        else:
+            start = next((i for i, e in enumerate(events) if startTime is None or e['timestamp'] >= startTime), len(events))
+        page = events[start:start + limit]
+        # 新着がない場合も同じトークンを返す
+        return {
+            'events': [dict(event) for event in page],
+            'nextForwardToken': f'f/{logStreamName}/{start + len(page)}'
+        }
+
+
+def messages(result):
+    return [event['message'] for event in result['events']]
+
+
+def test_log_cursor_round_trip(ui_handler):
+    cursor = ui_handler.encode_log_cursor({'a': 'f/a/3', 'b': 'f/b/1'}, 1700000000000)
+
+    assert ui_handler.decode_log_cursor(cursor) == ({'a': 'f/a/3', 'b': 'f/b/1'}, 1700000000000)
+    assert ui_handler.decode_log_cursor(None) == ({}, None)
+    assert ui_handler.decode_log_cursor('not-a-cursor') == ({}, None)
+
+
+def test_first_poll_merges_streams_in_time_order(ui_handler):
+    logs = FakeLogs()
+    logs.append('a', 1000, 'a1')
+    logs.append('b', 1500, 'b1')
+    logs.append('a', 2000, 'a2')
+
+    result = ui_handler.tail_experiment_logs('EXP1', logs_client=logs)
+
+    assert messages(result) == ['a1', 'b1', 'a2']
+    assert result['since'] == 2000
+    assert [event['stream'] for event in result['events']] == ['a', 'b', 'a']
+
+
+def test_resumes_from_per_stream_tokens(ui_handler):
+    logs = FakeLogs()
+    logs.append('a', 1000, 'a1')
+    logs.append('b', 1500, 'b1')
+    first = ui_handler.tail_experiment_logs('EXP1', logs_client=logs)
+    logs.append('a', 3000, 'a2')
+    logs.append('b', 2500, 'b2')
+    logs.append('c', 1200, 'c-old')
+    logs.append('c', 2800, 'c1')
+    logs.requests.clear()
+
+    second = ui_handler.tail_experiment_logs('EXP1', cursor=first['cursor'], logs_client=logs)
+
+    assert messages(second) == ['b2', 'c1', 'a2']
+    requests = {request['stream']: request for request in logs.requests}
+    assert requests['a']['nextToken'] == 'f/a/1' and requests['b']['nextToken'] == 'f/b/1'
+    # カーソルにないストリームは取得済みの最新時刻より後から読む
+    assert requests['c'] == {'stream': 'c', 'nextToken': None, 'startTime': 1501}
+    assert second['since'] == 3000
+
+
+def test_empty_poll_keeps_cursor_position(ui_handler):
+    logs = FakeLogs()
+    logs.append('a', 1000, 'a1')
+    first = ui_handler.tail_experiment_logs('EXP1', logs_client=logs)
+
+    second = ui_handler.tail_experiment_logs('EXP1', cursor=first['cursor'], logs_client=logs)
+    logs.append('a', 2000, 'a2')
+    third = ui_handler.tail_experiment_logs('EXP1', cursor=second['cursor'], logs_client=logs)
+
+    assert second['events'] == [] and second['since'] == 1000
+    assert ui_handler.decode_log_cursor(second['cursor']) == ui_handler.decode_log_cursor(first['cursor'])
+    assert messages(third) == ['a2']
+
+
+def test_missing_log_group_returns_no_events(ui_handler):
+    logs = FakeLogs()
+    logs.missing = True
+    cursor = ui_handler.encode_log_cursor({'a': 'f/a/2'}, 1000)
+
+    result = ui_handler.tail_experiment_logs('EXP1', cursor=cursor, logs_client=logs)
+
+    assert result['events'] == []
+    assert ui_handler.decode_log_cursor(result['cursor']) == ({'a': 'f/a/2'}, 1000)
+
+
+@pytest.mark.parametrize('since', [None, 1200])
+def test_since_overrides_cursor_time_for_new_streams(ui_handler, since):
+    logs = FakeLogs()
+    logs.append('a', 1000, 'a1')
+    logs.append('a', 1300, 'a2')
+
+    result = ui_handler.tail_experiment_logs('EXP1', since=since, logs_client=logs)
+
+    assert messages(result) == (['a1', 'a2'] if since is None else ['a2'])
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeFis:
+    """
+    並び順を保証しない ListExperiments を nextToken でページングして返す FIS クライアント
+    """
+
+    def __init__(self, count):
+        # 作成日時の順序と API の返す順序を一致させない
+        self.experiments = [
+            {
+                'id': f'EXP{i:02d}',
+                'state': {'status': 'completed' if i % 3 else 'failed'},
+                'creationTime': BASE_TIME + timedelta(minutes=(i * 7) % count),
+                'tags': {'Scenario': f's{i % 2}'}
+            }
+            for i in range(count)
+        ]
+
+    def list_experiments(self, maxResults, nextToken=None):
+        start = int(nextToken or 0)
+        response = {'experiments': self.experiments[start:start + maxResults]}
+        if start + maxResults < len(self.experiments):
+            response['nextToken'] = str(start + maxResults)
+        return response
+
+
+def test_pages_cover_all_matching_experiments_in_api_order(ui_handler, monkeypatch):
+    fis = FakeFis(25)
+    monkeypatch.setattr(ui_handler, 'fis_client', fis)
+    monkeypatch.setattr(ui_handler, 'FIS_LIST_PAGE_SIZE', 4)
+
+    ids, cursor = [], None
+    while True:
+        result = ui_handler.get_fis_experiments(limit=3, cursor=cursor, tag='Scenario=s0')
+        assert result['count'] == len(result['experiments']) and 'total' not in result
+        ids.extend(experiment['id'] for experiment in result['experiments'])
+        cursor = result['next_cursor']
+        if not cursor:
+            break
+
+    # ページ内で並べ替えず、API の順序のまま欠落・重複なく返す
+    assert ids == [experiment['id'] for experiment in fis.experiments if experiment['tags']['Scenario'] == 's0']
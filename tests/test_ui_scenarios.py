@@ -0,0 +1,215 @@
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from botocore.exceptions import ClientError, ParamValidationError
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def client_error(code, operation):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, operation)
+
+
+class FakeS3:
+    """
+    シナリオと条件付き書き込みに対応したインデックスを保持する S3 クライアント
+    """
+
+    def __init__(self, count, page_size=3):
+        self.page_size = page_size
+        self.objects = {}
+        self.index = None
+        self.index_version = 0
+        self.gets = []
+        self.get_error = None
+        self.puts = 0
+        self.put_error = None
+        self.lists = 0
+        self.before_put = None
+        for i in range(count):
+            # キーの順序と作成日時の順序を一致させない
+            self.add(f'scenarios/{(i * 7) % count:03d}.json', BASE_TIME + timedelta(minutes=i))
+
+    def add(self, key, last_modified):
+        self.objects[key] = {
+            'Key': key,
+            'ETag': f'"{key}-{last_modified.timestamp()}"',
+            'LastModified': last_modified,
+            'Size': 10,
+            'Body': json.dumps({'name': key, 'description': '', 'type': 'ec2'}).encode('utf-8')
+        }
+
+    def remove(self, key):
+        del self.objects[key]
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        if ContinuationToken is None:
+            self.lists += 1
+        keys = sorted(key for key in self.objects if key.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + self.page_size]
+        response = {'Contents': [self.objects[key] for key in page], 'IsTruncated': start + self.page_size < len(keys)}
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(start + self.page_size)
+        return response
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        if Key == 'index/scenarios.json':
+            if self.get_error:
+                raise client_error(self.get_error, 'GetObject')
+            if self.index is None:
+                raise client_error('NoSuchKey', 'GetObject')
+            etag = f'"index-{self.index_version}"'
+            if IfNoneMatch == etag:
+                raise client_error('304', 'GetObject')
+            return {'Body': io.BytesIO(json.dumps(self.index).encode('utf-8')), 'ETag': etag}
+        self.gets.append(Key)
+        obj = self.objects[Key]
+        return {
+            'Body': io.BytesIO(obj['Body']),
+            'ETag': obj['ETag'],
+            'LastModified': obj['LastModified'],
+            'ContentLength': obj['Size']
+        }
+
+    def put_object(self, Bucket, Key, Body, ContentType, IfMatch=None, IfNoneMatch=None):
+        self.puts += 1
+        if self.put_error:
+            raise self.put_error
+        if self.before_put:
+            hook, self.before_put = self.before_put, None
+            hook()
+        current = f'"index-{self.index_version}"' if self.index is not None else None
+        if (IfMatch is not None and IfMatch != current) or (IfNoneMatch == '*' and current is not None):
+            raise client_error('PreconditionFailed', 'PutObject')
+        self.index = json.loads(Body)
+        self.index_version += 1
+        return {'ETag': f'"index-{self.index_version}"'}
+
+
+@pytest.fixture
+def scenarios(ui_handler, monkeypatch):
+    def setup(count):
+        s3 = FakeS3(count)
+        monkeypatch.setattr(ui_handler, 's3_client', s3)
+        reset_container(ui_handler, monkeypatch)
+        return s3
+    return setup
+
+
+def reset_container(ui_handler, monkeypatch):
+    # 新しいコンテナのコールドスタート
+    monkeypatch.setattr(ui_handler, '_scenario_index', {'etag': None, 'entries': {}, 'scanned_at': None, 'sorted': None})
+
+
+def s3_event(event_name, *keys):
+    return {'Records': [
+        {'eventSource': 'aws:s3', 'eventName': event_name, 's3': {'object': {'key': key}}} for key in keys
+    ]}
+
+
+def test_pages_are_globally_ordered_by_created_at(ui_handler, scenarios):
+    scenarios(10)
+
+    pages, cursor = [], None
+    while True:
+        result = ui_handler.get_scenarios(limit=4, cursor=cursor)
+        assert result['total'] == 10
+        pages.append(result['scenarios'])
+        cursor = result['next_cursor']
+        if not cursor:
+            break
+
+    created = [scenario['created_at'] for page in pages for scenario in page]
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert created == sorted(created, reverse=True)
+    assert len({scenario['id'] for page in pages for scenario in page}) == 10
+
+
+def test_cursor_is_stable_when_scenarios_are_added(ui_handler, scenarios):
+    s3 = scenarios(6)
+    first = ui_handler.get_scenarios(limit=3)
+    s3.add('scenarios/new.json', BASE_TIME + timedelta(days=1))
+    ui_handler.handle_s3_event(s3_event('ObjectCreated:Put', 'scenarios/new.json'))
+
+    second = ui_handler.get_scenarios(limit=3, cursor=first['next_cursor'])
+
+    ids = [s['id'] for s in first['scenarios'] + second['scenarios']]
+    assert len(ids) == len(set(ids)) == 6
+    assert 'new' not in ids and second['total'] == 7
+    assert s3.lists == 1
+    assert ui_handler.get_scenarios(limit=1)['scenarios'][0]['id'] == 'new'
+
+
+def test_pages_are_served_from_index_until_rescan(ui_handler, scenarios, monkeypatch):
+    s3 = scenarios(5)
+    first = ui_handler.get_scenarios(limit=2)
+    s3.gets.clear()
+
+    # 別のコンテナは保存済みのインデックスから一覧を返す
+    reset_container(ui_handler, monkeypatch)
+    second = ui_handler.get_scenarios(limit=2)
+
+    assert second == first
+    assert s3.lists == 1 and s3.gets == []
+
+    # 通知を取りこぼした削除も、走査の間隔を過ぎると一覧から除かれる
+    s3.remove('scenarios/000.json')
+    ui_handler._scenario_index['scanned_at'] -= ui_handler.SCENARIO_INDEX_RESCAN_SECONDS + 1
+    third = ui_handler.get_scenarios(limit=10)
+
+    assert s3.lists == 2 and third['total'] == 4
+    assert 'scenarios/000.json' not in s3.index['entries']
+
+
+def test_listing_continues_when_index_cannot_be_saved(ui_handler, scenarios):
+    s3 = scenarios(4)
+    # 条件付き書き込みに対応していない SDK
+    s3.put_error = ParamValidationError(report='Unknown parameter in input: "IfMatch"')
+
+    first = ui_handler.get_scenarios(limit=3)
+    second = ui_handler.get_scenarios(limit=3, cursor=first['next_cursor'])
+
+    assert 'error' not in first and first['total'] == 4
+    assert [len(first['scenarios']), len(second['scenarios'])] == [3, 1]
+    assert s3.index is None
+    # 保存できなかった走査結果をコンテナ内で使い続ける
+    assert s3.lists == 1 and len(s3.gets) == 4
+
+
+def test_index_is_merged_on_concurrent_update_and_pruned(ui_handler, scenarios):
+    s3 = scenarios(4)
+    ui_handler.get_scenarios(limit=2)
+    s3.remove('scenarios/001.json')
+
+    def concurrent_update():
+        # 読み込みから書き込みまでの間に、他のコンテナがインデックスを更新した
+        s3.objects['scenarios/other.json'] = dict(s3.objects['scenarios/000.json'], Key='scenarios/other.json')
+        s3.index['entries']['scenarios/other.json'] = {
+            'etag': s3.objects['scenarios/other.json']['ETag'], 'last_modified': BASE_TIME.isoformat(), 'size': 10,
+            'name': 'other', 'description': '', 'type': 'ec2'
+        }
+        s3.index_version += 1
+    s3.before_put = concurrent_update
+    s3.puts = 0
+
+    ui_handler.handle_s3_event(s3_event('ObjectRemoved:Delete', 'scenarios/001.json'))
+    result = ui_handler.get_scenarios(limit=10)
+
+    assert s3.puts == 2
+    assert result['total'] == 4
+    # 削除されたシナリオは除かれ、他のコンテナが追加したエントリは残る
+    assert set(s3.index['entries']) == set(s3.objects)
+    assert 'scenarios/other.json' not in s3.gets
+
+
+def test_index_access_errors_are_not_treated_as_empty(ui_handler, scenarios):
+    s3 = scenarios(2)
+    s3.get_error = 'AccessDenied'
+
+    result = ui_handler.get_scenarios()
+
+    assert result['scenarios'] == [] and 'AccessDenied' in result['error']
+    assert s3.index is None